@@ -0,0 +1,782 @@
+"""In-process columnar copy of the ball-by-ball tables for the dashboard's aggregate questions.
+
+matches, batting, bowling, dismissals, match_players and players are pulled once per process through the
+COPY fetch path (columnar.py) into compact NumPy arrays: players, teams, venues and dismissal
+kinds arrive as their integer codes in the schema (name_codes.py) and are mapped to dense int32
+codes, with names fetched once per dictionary and decoded only for the rows a query returns, matches are ordered by (season, match_id)
+and every delivery array is grouped by match, so a season is one contiguous slice of each array.
+Leaderboards are bincount/argsort kernels over those slices, per-match questions are lookups
+in batting/bowling cards built once per snapshot (the in-process side of scorecards.py), and
+venue and toss questions are roll-ups of a win/loss cube (match_cube.py) kept alongside, and
+batsman-vs-bowler questions read a head-to-head index (head_to_head.py) built on first use,
+appearance questions read per-player bitsets over the line-ups (participation.py), and
+per-phase strike rates, economies, dot-ball and boundary rates come from (season, phase,
+player) counts built in one pass over the deliveries (phase_metrics.py).
+
+Postgres stays the source of truth.  When the shared data version (query_cache.invalidate)
+moves, only matches that are not loaded yet are fetched and appended; if a loaded match has
+disappeared the whole copy is rebuilt.
+
+    engine = Engine(pool.connection)
+    engine.run("top_batsmen_season", {"season": 2022})   # same rows as the SQL query
+"""
+import ast
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import columnar
+import head_to_head
+import match_catalog
+import match_cube
+import participation
+import phase_metrics
+import player_directory
+import player_roles
+import query_cache
+from queries import NON_BOWLER_DISMISSALS, NamedQuery
+
+_EXCLUDED_KINDS = set(ast.literal_eval(NON_BOWLER_DISMISSALS))
+
+# the source queries; match_ids selects what to fetch, so a refresh reads only new matches.
+# Name columns come as schema codes (NULL as -1) and the names through the dictionary queries.
+MATCH_IDS = NamedQuery("engine_match_ids", "SELECT match_id FROM matches")
+NAMES = {
+    "players": NamedQuery("engine_players", "SELECT player_id, player_name FROM players"),
+    "teams": NamedQuery("engine_teams", "SELECT team_id, team_name FROM teams"),
+    "venues": NamedQuery("engine_venues", "SELECT venue_id, venue_name FROM venues"),
+    "kinds": NamedQuery("engine_kinds", "SELECT kind_id, kind_name FROM dismissal_kinds"),
+}
+MATCHES = NamedQuery("engine_matches", """
+    SELECT m.match_id, m.match_date, m.season, COALESCE(m.venue_id, -1) AS venue_id,
+           COALESCE(m.team1_id, -1) AS team1_id, COALESCE(m.team2_id, -1) AS team2_id,
+           COALESCE(m.winner_id, -1) AS winner_id, m.match_result,
+           COALESCE(t.toss_winner_id, -1) AS toss_winner_id, t.toss_decision
+    FROM matches m LEFT JOIN toss t ON t.match_id = m.match_id
+    WHERE m.match_id = ANY(%(match_ids)s)
+""", match_ids="integer[]")
+BATTING = NamedQuery("engine_batting", """
+    SELECT delivery_no, match_id, player_id, runs_scored, dismissal_kind, over_number, ball_number
+    FROM batting WHERE match_id = ANY(%(match_ids)s) ORDER BY match_id, delivery_no
+""", match_ids="integer[]")
+BOWLING = NamedQuery("engine_bowling", """
+    SELECT delivery_no, match_id, player_id, wicket_delivery, dismissal_kind, over_number, ball_number
+    FROM bowling WHERE match_id = ANY(%(match_ids)s) ORDER BY match_id, delivery_no
+""", match_ids="integer[]")
+DISMISSALS = NamedQuery("engine_dismissals", """
+    SELECT match_id, COALESCE(batsman_id, -1) AS batsman_id, COALESCE(bowler_id, -1) AS bowler_id,
+           COALESCE(kind_id, -1) AS kind_id, COALESCE(fielder_id, -1) AS fielder_id
+    FROM dismissals WHERE match_id = ANY(%(match_ids)s) ORDER BY dismissal_id
+""", match_ids="integer[]")
+MATCH_PLAYERS = NamedQuery("engine_match_players", """
+    SELECT match_id, player_id, team
+    FROM match_players WHERE match_id = ANY(%(match_ids)s) ORDER BY match_id, team, position
+""", match_ids="integer[]")
+
+
+class Dictionary:
+    """Dense int32 codes for the distinct values of a column; codes never change once assigned."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, column):
+        """Codes for a column of values; missing values (None/NaN) become -1."""
+        inverse, uniques = pd.factorize(np.asarray(column, dtype=object))
+        lookup = np.array([self.code(value) for value in uniques] + [-1], dtype=np.int32)
+        return lookup[inverse]
+
+    def decode(self, codes):
+        return np.array(self.values + [None], dtype=object)[codes]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class Snapshot:
+    """Immutable, indexed view of everything loaded so far; queries read one snapshot throughout."""
+
+    def __init__(self, raw, cube, dictionaries, excluded_kinds):
+        self.cube = cube
+        # players, teams, venues, kinds, results
+        for name, dictionary in dictionaries.items():
+            setattr(self, name, dictionary)
+        players, kinds = self.players, self.kinds
+        self.n_players = len(players)
+        self._cards = None
+        self._head_to_head = None
+        self._catalog = None
+        self._directory = None
+        self._participation = None
+        self._pairs = None
+        self.unpaired = None            # {"batting": rows, "bowling": rows} without a partner, once paired
+        self._phase_metrics = None
+
+        m = raw["matches"]
+        order = np.lexsort((m["match_id"], m["season"]))
+        for column, values in m.items():
+            setattr(self, column, values[order])
+        self.n_matches = len(self.match_id)
+
+        # season index: matches of season s are rows season_start[i]:season_start[i + 1]
+        self.seasons, first = np.unique(self.season, return_index=True)
+        self.season_start = np.append(first, self.n_matches)
+
+        by_id = np.argsort(self.match_id)
+        self._id_sorted = self.match_id[by_id]
+        self._row_by_id = by_id
+
+        def group(table, prefix):
+            t = raw[table]
+            rows = self.row_of(t["match_id"])
+            order = np.argsort(rows, kind="stable")
+            setattr(self, prefix + "match", rows[order].astype(np.int32))
+            for column, values in t.items():
+                if column != "match_id":
+                    setattr(self, prefix + column, values[order])
+            # deliveries of match row r are [start[r], start[r + 1])
+            setattr(self, prefix + "start", np.searchsorted(rows[order], np.arange(self.n_matches + 1)))
+
+        group("batting", "bat_")
+        group("bowling", "bowl_")
+        group("dismissals", "dis_")
+        group("lineups", "lin_")
+
+        # bowler-credited wicket per delivery, as in player_season_bowling
+        credited = np.array([kind not in excluded_kinds for kind in kinds.values] + [False])
+        self.bowl_credited_kind = credited[self.bowl_kind]
+        self.bowl_credited = self.bowl_wicket.astype(np.int32) * self.bowl_credited_kind
+
+    def row_of(self, match_ids):
+        return self._row_by_id[np.searchsorted(self._id_sorted, match_ids)]
+
+    def season_rows(self, season=None):
+        """Match rows of `season` (all seasons when None) as a slice."""
+        if season is None:
+            return slice(0, self.n_matches)
+        i = np.searchsorted(self.seasons, int(season))
+        if i == len(self.seasons) or self.seasons[i] != int(season):
+            return slice(0, 0)
+        return slice(self.season_start[i], self.season_start[i + 1])
+
+    def deliveries(self, prefix, rows):
+        start = getattr(self, prefix + "start")
+        return slice(start[rows.start], start[rows.stop])
+
+    def match_row(self, match_id):
+        i = np.searchsorted(self._id_sorted, int(match_id))
+        if i == len(self._id_sorted) or self._id_sorted[i] != int(match_id):
+            raise KeyError(match_id)
+        return self._row_by_id[i]
+
+    def cards(self):
+        """Batting and bowling cards of every match, built on first use."""
+        if self._cards is None:
+            self._cards = Cards(self)
+        return self._cards
+
+    def catalog(self):
+        """Match catalog for the selectors, built on first use."""
+        if self._catalog is None:
+            self._catalog = match_catalog.MatchCatalog(
+                self.match_id, self.date, self.season, self.team1, self.team2, self.venue, self.winner, self.result,
+                np.diff(self.bat_start) > 0, self.teams.values, self.venues.values, self.results.values)
+        return self._catalog
+
+    def player_directory(self):
+        """Player-name search index, built on first use; ranks by balls faced plus balls bowled."""
+        if self._directory is None:
+            faced = np.bincount(self.bat_player[self.bat_player >= 0], minlength=self.n_players)
+            bowled = np.bincount(self.bowl_player[self.bowl_player >= 0], minlength=self.n_players)
+            self._directory = player_directory.PlayerDirectory(
+                self.players.values[:self.n_players], weights=(faced + bowled).tolist(),
+                roles={"batting": np.flatnonzero(faced).tolist(), "bowling": np.flatnonzero(bowled).tolist()})
+        return self._directory
+
+    def match_mask(self, season=None, venue=None):
+        """Boolean mask over match rows for a season and/or a venue code."""
+        rows = np.zeros(self.n_matches, dtype=bool)
+        rows[self.season_rows(season)] = True
+        if venue is not None:
+            rows &= self.venue == venue
+        return rows
+
+    def participation(self):
+        """Per-player bitsets over match sides, built on first use."""
+        if self._participation is None:
+            self._participation = participation.Participation(
+                self.lin_match, self.lin_side, self.lin_player, self.n_players, self.n_matches)
+        return self._participation
+
+    def head_to_head(self):
+        """Batsman-vs-bowler index, built on first use."""
+        if self._head_to_head is None:
+            self._head_to_head = self._build_head_to_head()
+        return self._head_to_head
+
+    def delivery_pairs(self):
+        """(batting rows, bowling rows) of the same deliveries, found on first use.
+
+        A delivery is (match, delivery_no) in both tables.  Rows with no partner (or a partner in
+        another over or ball) are left out and counted in self.unpaired (see Engine.stats).
+        """
+        if self._pairs is None:
+            paired = bowl_row = np.empty(0, dtype=np.intp)
+            if len(self.bowl_delivery):
+                bat_key = self.bat_match.astype(np.int64) << 16 | self.bat_delivery.astype(np.int64)
+                bowl_key = self.bowl_match.astype(np.int64) << 16 | self.bowl_delivery.astype(np.int64)
+                by_key = np.argsort(bowl_key, kind="stable")
+                candidate = by_key[np.minimum(np.searchsorted(bowl_key[by_key], bat_key), len(by_key) - 1)]
+                paired = np.flatnonzero((bowl_key[candidate] == bat_key)
+                                        & (self.bowl_over[candidate] == self.bat_over)
+                                        & (self.bowl_ball[candidate] == self.bat_ball))
+                bowl_row = candidate[paired]
+            self._pairs = paired, bowl_row
+            self.unpaired = {"batting": len(self.bat_player) - len(paired),
+                             "bowling": len(self.bowl_player) - len(np.unique(bowl_row))}
+        return self._pairs
+
+    def phase_metrics(self):
+        """Per-(season, phase, player) batting and bowling counts, built on first use."""
+        if self._phase_metrics is None:
+            season_of_row = np.searchsorted(self.seasons, self.season)
+            paired, bowl_row = self.delivery_pairs()
+            # the bowler's side counts only deliveries with a batting row: the runs conceded come
+            # from it, and an unpaired row would otherwise pass for a dot ball
+            conceded = np.zeros(len(self.bowl_player), dtype=np.int16)
+            conceded[bowl_row] = self.bat_runs[paired]
+            bowl_row = np.unique(bowl_row)
+            self._phase_metrics = phase_metrics.PhaseMetrics(
+                {"season": season_of_row[self.bat_match], "over": self.bat_over, "player": self.bat_player,
+                 "runs": self.bat_runs},
+                {"season": season_of_row[self.bowl_match[bowl_row]], "over": self.bowl_over[bowl_row],
+                 "player": self.bowl_player[bowl_row], "runs": conceded[bowl_row],
+                 "wicket": self.bowl_credited[bowl_row]},
+                self.n_players, self.seasons, unpaired_bowling=self.unpaired["bowling"])
+        return self._phase_metrics
+
+    def _build_head_to_head(self):
+        paired, bowl_row = self.delivery_pairs()
+        season_of_row = np.searchsorted(self.seasons, self.season)
+        batsman = self.bat_player[paired]
+        bowler = self.bowl_player[bowl_row]
+        known = (batsman >= 0) & (bowler >= 0)
+        out_known = (self.dis_batsman >= 0) & (self.dis_bowler >= 0)
+        return head_to_head.HeadToHead(
+            batsman[known], bowler[known], self.bat_runs[paired][known], season_of_row[self.bat_match[paired][known]],
+            self.dis_batsman[out_known], self.dis_bowler[out_known], season_of_row[self.dis_match[out_known]],
+            self.n_players, self.seasons)
+
+
+def _card_rows(match, player, n_players):
+    """Group deliveries into one card row per (match, player), in order of first appearance.
+
+    Returns the card rows' match and player codes and, for every delivery, the index of its card row.
+    """
+    keys, first, inverse = np.unique(match.astype(np.int64) * n_players + player,
+                                     return_index=True, return_inverse=True)
+    card_match = keys // n_players
+    order = np.lexsort((first, card_match))
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+    return card_match[order], (keys % n_players)[order], rank[inverse.reshape(-1)]
+
+
+class Cards:
+    """Per-match batting and bowling cards; the rows of match row r are start[r]:start[r + 1]."""
+
+    def __init__(self, snap):
+        n = snap.n_players
+        self.bat_match, self.bat_player, card = _card_rows(snap.bat_match, snap.bat_player, n)
+        rows = len(self.bat_match)
+        runs = snap.bat_runs
+        self.bat_runs = np.bincount(card, weights=runs, minlength=rows).astype(np.int64)
+        self.bat_balls = np.bincount(card, minlength=rows)
+        self.bat_fours = np.bincount(card, weights=runs == 4, minlength=rows).astype(np.int64)
+        self.bat_sixes = np.bincount(card, weights=runs == 6, minlength=rows).astype(np.int64)
+        # how out: the kind on the batsman's last delivery that has one
+        out = np.flatnonzero(snap.bat_kind >= 0)
+        last = np.full(rows, -1, dtype=np.intp)
+        np.maximum.at(last, card[out], out)
+        self.bat_kind = np.where(last >= 0, snap.bat_kind[last], -1)
+        best = np.zeros(snap.n_matches, dtype=np.int64)
+        np.maximum.at(best, self.bat_match, self.bat_runs)
+        self.bat_top = self.bat_runs == best[self.bat_match]
+        self.bat_start = np.searchsorted(self.bat_match, np.arange(snap.n_matches + 1))
+
+        self.bowl_match, self.bowl_player, card = _card_rows(snap.bowl_match, snap.bowl_player, n)
+        rows = len(self.bowl_match)
+        self.bowl_balls = np.bincount(card, minlength=rows)
+        self.bowl_wickets = np.bincount(card, weights=snap.bowl_credited, minlength=rows).astype(np.int64)
+        self.bowl_start = np.searchsorted(self.bowl_match, np.arange(snap.n_matches + 1))
+
+
+def _ranked(names, values, positive=False, limit=None):
+    """(name, value) rows ordered by value desc, name asc, like ORDER BY value DESC, player_name."""
+    keep = np.flatnonzero(values > 0 if positive else values >= 0)
+    names_kept = names[keep]
+    order = np.lexsort((names_kept, -values[keep]))
+    if limit is not None:
+        order = order[:limit]
+    return keep[order]
+
+
+def _pairs(match, player, n_players):
+    """Distinct (match, player) pairs as one int64 key each."""
+    return np.unique(match.astype(np.int64) * n_players + player)
+
+
+class Engine:
+    # dashboard query name -> method answering it with the same rows as the SQL
+    QUERIES = {
+        "batting_records_all": "batting_records",
+        "batting_records_season": "batting_records",
+        "bowling_records_all": "bowling_records",
+        "bowling_records_season": "bowling_records",
+        "top_batsmen_season": "top_batsmen",
+        "top_bowlers_season": "top_bowlers",
+        "best_batsman_per_match": "best_batsman_per_match",
+        "bowlers_as_batsmen": "bowlers_as_batsmen",
+        "runs_by_batsmen": "runs_by_batsmen",
+        "wickets_by_bowler": "wickets_by_bowler",
+        "team_winning_venues": "team_winning_venues",
+        "team_winning_venues_season": "team_winning_venues",
+        "toss_wins": "toss_wins",
+        "toss_wins_season": "toss_wins",
+        "toss_losses": "toss_losses",
+        "toss_losses_season": "toss_losses",
+        "batsman_dismissals": "batsman_dismissals",
+        "batsman_dismissals_season": "batsman_dismissals",
+    }
+
+    def __init__(self, connection=None, cache_dir=query_cache.DEFAULT_CACHE_DIR, check_interval=1.0):
+        self.connection = connection      # context manager factory, e.g. pool.connection
+        self.cache_dir = cache_dir
+        self.check_interval = check_interval
+
+        self.players = Dictionary()
+        self.teams = Dictionary()
+        self.venues = Dictionary()
+        self.kinds = Dictionary()
+        self.results = Dictionary()
+        # schema code (player_id, team_id, ...) -> code in the dictionary of the same name
+        self._schema_codes = {name: {} for name in NAMES}
+        self._raw = None
+        self._cube = match_cube.MatchCube()
+        self._snapshot = None
+        self._version = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.loads = []                   # (seconds, matches fetched) per refresh
+
+    # ---- loading -----------------------------------------------------------
+
+    def _learn(self, names):
+        # names: {dictionary: DataFrame of (schema code, name)}
+        for dictionary, frame in names.items():
+            codes, values = self._schema_codes[dictionary], getattr(self, dictionary)
+            for schema_code, name in zip(frame.iloc[:, 0].tolist(), frame.iloc[:, 1].tolist()):
+                if schema_code not in codes:
+                    codes[schema_code] = values.code(name)
+
+    def _codes(self, dictionary, column):
+        """Dictionary codes for a column of schema codes; unknown codes (and -1) become -1."""
+        ids, inverse = np.unique(column.to_numpy(np.int64), return_inverse=True)
+        codes = self._schema_codes[dictionary]
+        lookup = np.array([codes.get(i, -1) for i in ids.tolist()] + [-1], dtype=np.int32)
+        return lookup[inverse.reshape(-1)] if len(ids) else np.empty(0, dtype=np.int32)
+
+    def _encode(self, frames):
+        m, bat, bowl, dis = frames["matches"], frames["batting"], frames["bowling"], frames["dismissals"]
+        lineups = frames["match_players"]
+        dis_kind = self._codes("kinds", dis["kind_id"])
+        return {
+            "matches": {
+                "match_id": m["match_id"].to_numpy(np.int64),
+                "season": m["season"].to_numpy(np.int16),
+                "date": pd.to_datetime(m["match_date"]).to_numpy("datetime64[D]"),
+                "result": self.results.encode(m["match_result"]),
+                "venue": self._codes("venues", m["venue_id"]),
+                "team1": self._codes("teams", m["team1_id"]),
+                "team2": self._codes("teams", m["team2_id"]),
+                "winner": self._codes("teams", m["winner_id"]),
+                "toss_winner": self._codes("teams", m["toss_winner_id"]),
+                "decision": np.select([m["toss_decision"] == "bat", m["toss_decision"] == "field"], [0, 1], 2)
+                              .astype(np.int8),
+            },
+            "batting": {
+                "delivery": bat["delivery_no"].to_numpy(np.int16),
+                "match_id": bat["match_id"].to_numpy(np.int64),
+                "player": self._codes("players", bat["player_id"]),
+                "runs": bat["runs_scored"].to_numpy(np.int16),
+                "kind": self.kinds.encode(bat["dismissal_kind"]),
+                "over": bat["over_number"].to_numpy(np.int8),
+                "ball": bat["ball_number"].to_numpy(np.int8),
+            },
+            "bowling": {
+                "delivery": bowl["delivery_no"].to_numpy(np.int16),
+                "match_id": bowl["match_id"].to_numpy(np.int64),
+                "player": self._codes("players", bowl["player_id"]),
+                "wicket": bowl["wicket_delivery"].to_numpy(np.int8),
+                "kind": self.kinds.encode(bowl["dismissal_kind"]),
+                "over": bowl["over_number"].to_numpy(np.int8),
+                "ball": bowl["ball_number"].to_numpy(np.int8),
+            },
+            "dismissals": {
+                "match_id": dis["match_id"].to_numpy(np.int64),
+                "batsman": self._codes("players", dis["batsman_id"]),
+                "bowler": self._codes("players", dis["bowler_id"]),
+                "kind": dis_kind,
+                # the keeper credited with a stumping, for the player roles
+                "keeper": np.where(dis_kind == self.kinds.codes.get("stumped", -2),
+                                   self._codes("players", dis["fielder_id"]), -1).astype(np.int32),
+            },
+            "lineups": {
+                "match_id": lineups["match_id"].to_numpy(np.int64),
+                "player": self._codes("players", lineups["player_id"]),
+                "side": (lineups["team"].to_numpy(np.int8) - 1),
+            },
+        }
+
+    def append(self, frames, names=None):
+        """Add freshly fetched matches (DataFrames keyed by table name) and reindex; `names` holds
+        the (schema code, name) frames of any dictionary entries they use for the first time."""
+        with self._lock:
+            if names is not None:
+                self._learn(names)
+            new = self._encode(frames)
+            # the cube only needs the new matches added; the delivery arrays are reindexed as a whole
+            self._cube = self._cube.added(new["matches"])
+            raw = new
+            if self._raw is not None:
+                raw = {table: {column: np.concatenate([self._raw[table][column], values])
+                               for column, values in columns.items()}
+                       for table, columns in new.items()}
+            self._raw = raw
+            self._snapshot = Snapshot(raw, self._cube, self._dictionaries(), _EXCLUDED_KINDS)
+
+    def _dictionaries(self):
+        return {"players": self.players, "teams": self.teams, "venues": self.venues, "kinds": self.kinds,
+                "results": self.results}
+
+    def reset(self):
+        with self._lock:
+            self._raw = self._snapshot = None
+            self._cube = match_cube.MatchCube()
+
+    def refresh(self):
+        """Fetch matches the copy does not have yet; rebuild from scratch if any loaded one is gone."""
+        started = time.perf_counter()
+        version = query_cache.read_data_version(self.cache_dir) if self.cache_dir else 0
+        with self.connection() as conn:
+            current = columnar.fetch_frame(conn, MATCH_IDS)["match_id"].to_numpy(np.int64)
+            loaded = self._raw["matches"]["match_id"] if self._raw is not None else np.empty(0, np.int64)
+            if not np.isin(loaded, current).all():
+                self.reset()
+                loaded = np.empty(0, np.int64)
+            new = current[~np.isin(current, loaded)]
+            if len(new) or self._raw is None:
+                params = {"match_ids": new.tolist()}
+                frames = {name: columnar.fetch_frame(conn, query, params)
+                          for name, query in (("matches", MATCHES), ("batting", BATTING),
+                                              ("bowling", BOWLING), ("dismissals", DISMISSALS),
+                                              ("match_players", MATCH_PLAYERS))}
+                self.append(frames, names={name: columnar.fetch_frame(conn, query) for name, query in NAMES.items()})
+        self._version = version
+        self.loads.append((time.perf_counter() - started, len(new)))
+        return len(new)
+
+    def snapshot(self):
+        """Current snapshot, refreshed first when the data version has moved since the last look."""
+        if self.connection is not None and (self._snapshot is None
+                                            or time.monotonic() - self._checked >= self.check_interval):
+            with self._refresh_lock:
+                self._checked = time.monotonic()
+                version = query_cache.read_data_version(self.cache_dir) if self.cache_dir else 0
+                if self._snapshot is None or version != self._version:
+                    self.refresh()
+        return self._snapshot
+
+    # ---- dispatch ----------------------------------------------------------
+
+    def _split(self, name):
+        # <name>_page / <name>_count variants of pageable queries are answered from the full result
+        for suffix in ("_page", "_count"):
+            if name.endswith(suffix) and name[:-len(suffix)] in self.QUERIES:
+                return name[:-len(suffix)], suffix
+        return name, None
+
+    def supports(self, name):
+        return self._split(name)[0] in self.QUERIES
+
+    def run(self, name, params=None):
+        """Rows for a registered dashboard query, in the shape its SQL returns."""
+        base, variant = self._split(name)
+        params = dict(params or {})
+        limit, offset = params.pop("page_limit", None), params.pop("page_offset", 0)
+        rows = getattr(self, self.QUERIES[base])(self.snapshot(), **params)
+        if variant == "_count":
+            return [(len(rows),)]
+        if variant == "_page":
+            return rows[offset:offset + limit]
+        return rows
+
+    # ---- kernels -----------------------------------------------------------
+
+    def _batting_totals(self, snap, season=None):
+        d = snap.deliveries("bat_", snap.season_rows(season))
+        player = snap.bat_player[d]
+        runs = np.bincount(player, weights=snap.bat_runs[d], minlength=snap.n_players).astype(np.int64)
+        balls = np.bincount(player, minlength=snap.n_players)
+        pairs = _pairs(snap.bat_match[d], player, snap.n_players)
+        matches = np.bincount((pairs % snap.n_players).astype(np.int64), minlength=snap.n_players)
+        return runs, balls, matches
+
+    def _bowling_totals(self, snap, season=None):
+        d = snap.deliveries("bowl_", snap.season_rows(season))
+        player = snap.bowl_player[d]
+        wickets = np.bincount(player, weights=snap.bowl_credited[d], minlength=snap.n_players).astype(np.int64)
+        balls = np.bincount(player, minlength=snap.n_players)
+        return wickets, balls
+
+    def batting_records(self, snap, season=None):
+        runs, balls, _ = self._batting_totals(snap, season)
+        names = snap.players.decode(np.arange(snap.n_players))
+        # players who batted at all, including those still on 0
+        order = _ranked(names, np.where(balls > 0, runs, -1))
+        return list(zip(names[order].tolist(), runs[order].tolist()))
+
+    def bowling_records(self, snap, season=None):
+        wickets, _ = self._bowling_totals(snap, season)
+        names = snap.players.decode(np.arange(snap.n_players))
+        order = _ranked(names, wickets, positive=True)
+        return list(zip(names[order].tolist(), wickets[order].tolist()))
+
+    def top_batsmen(self, snap, season, limit=10):
+        runs, balls, matches = self._batting_totals(snap, season)
+        # matches played counts every appearance in a line-up, as in player_season_batting
+        part = snap.participation()
+        matches = np.maximum(matches, part.matches_played(part.mask(snap.match_mask(season))))
+        names = snap.players.decode(np.arange(snap.n_players))
+        order = _ranked(names, np.where(balls > 0, runs, -1), limit=limit)
+        return list(zip(names[order].tolist(), runs[order].tolist(), matches[order].tolist()))
+
+    def top_bowlers(self, snap, season, limit=10):
+        wickets, _ = self._bowling_totals(snap, season)
+        names = snap.players.decode(np.arange(snap.n_players))
+        order = _ranked(names, wickets, positive=True, limit=limit)
+        return list(zip(names[order].tolist(), wickets[order].tolist()))
+
+    def best_batsman_per_match(self, snap, season):
+        cards = snap.cards()
+        rows = snap.season_rows(season)
+        top = np.arange(cards.bat_start[rows.start], cards.bat_start[rows.stop])
+        top = top[cards.bat_top[top]]
+        match_ids = snap.match_id[cards.bat_match[top]]
+        names = snap.players.decode(cards.bat_player[top])
+        order = np.lexsort((names, match_ids))
+        return list(zip(match_ids[order].tolist(), names[order].tolist(), cards.bat_runs[top][order].tolist()))
+
+    def _roles(self, snap, season, bowled, balls):
+        """Index into player_roles.ROLES per player for one season, as in player_season_role."""
+        d = snap.deliveries("dis_", snap.season_rows(season))
+        keeper = snap.dis_keeper[d]
+        stumpings = np.bincount(keeper[keeper >= 0], minlength=snap.n_players)
+        bowler = bowled >= player_roles.BOWLER_MIN_BALLS
+        return np.select([stumpings >= player_roles.KEEPER_MIN_STUMPINGS,
+                          bowler & (balls >= player_roles.BATTER_MIN_BALLS), bowler],
+                         [player_roles.ROLES.index(role) for role in ("keeper", "all-rounder", "bowler")],
+                         player_roles.ROLES.index("batter"))
+
+    def bowlers_as_batsmen(self, snap, season, limit=5):
+        _, bowled = self._bowling_totals(snap, season)
+        runs, balls, _ = self._batting_totals(snap, season)
+        roles = self._roles(snap, season, bowled, balls)
+        eligible = (roles == player_roles.ROLES.index("bowler")) & (balls > 0)
+        names = snap.players.decode(np.arange(snap.n_players))
+        order = _ranked(names, np.where(eligible, runs, -1), limit=limit)
+        return list(zip(names[order].tolist(), runs[order].tolist(), balls[order].tolist()))
+
+    def runs_by_batsmen(self, snap, match_id):
+        cards, row = snap.cards(), snap.match_row(match_id)
+        card = np.arange(cards.bat_start[row], cards.bat_start[row + 1])
+        card = card[cards.bat_kind[card] >= 0]
+        return list(zip(snap.players.decode(cards.bat_player[card]).tolist(), cards.bat_runs[card].tolist(),
+                        snap.kinds.decode(cards.bat_kind[card]).tolist()))
+
+    def wickets_by_bowler(self, snap, match_id):
+        cards, row = snap.cards(), snap.match_row(match_id)
+        card = np.arange(cards.bowl_start[row], cards.bowl_start[row + 1])
+        card = card[cards.bowl_wickets[card] > 0]
+        return list(zip(snap.players.decode(cards.bowl_player[card]).tolist(), cards.bowl_wickets[card].tolist()))
+
+    def team_winning_venues(self, snap, season=None):
+        """Each team's venue with the most wins (ties to the first venue by name), by team name."""
+        wins = snap.cube.rollup(by=("team", "venue"), season=season, outcome=match_cube.WON)
+        if wins.size == 0:
+            return []
+        venues = snap.venues.decode(np.arange(wins.shape[1]))
+        by_name = np.argsort(venues.astype(str), kind="stable")
+        best = by_name[np.argmax(wins[:, by_name], axis=1)]
+        teams = np.flatnonzero(wins.max(axis=1) > 0)
+        names = snap.teams.decode(teams)
+        order = np.argsort(names.astype(str), kind="stable")
+        teams = teams[order]
+        return list(zip(names[order].tolist(), venues[best[teams]].tolist(), wins[teams, best[teams]].tolist()))
+
+    def toss_wins(self, snap, season=None):
+        """Matches won by the toss winner."""
+        return [(int(snap.cube.rollup(season=season, toss=1, outcome=match_cube.WON)),)]
+
+    def toss_losses(self, snap, season=None):
+        """Matches the toss winner did not win (a no result counts, as winning_team <> toss_winner)."""
+        return [(int(snap.cube.rollup(season=season, toss=1, outcome=[match_cube.LOST, match_cube.NO_RESULT])),)]
+
+    def catalog(self):
+        """Match catalog (match_catalog.MatchCatalog) of everything loaded."""
+        return self.snapshot().catalog()
+
+    def player_directory(self):
+        """Player-name search (player_directory.PlayerDirectory) over everyone loaded."""
+        return self.snapshot().player_directory()
+
+    def batsman_dismissals(self, snap, batsman_name, season=None, limit=3):
+        """Bowlers who dismissed the batsman most often: [(bowler name, dismissals)]."""
+        batsman = snap.players.codes.get(batsman_name)
+        if batsman is None or batsman >= snap.n_players:
+            return []
+        top = snap.head_to_head().top(batsman=batsman, by="outs", k=limit, season=season)
+        return [(snap.players.values[bowler], outs) for bowler, _, _, outs in top]
+
+    def head_to_head(self, batsman=None, bowler=None, by="outs", k=10, season=None):
+        """Top-k head-to-head rows for a batsman (against bowlers) or a bowler (against batsmen), by name."""
+        snap = self.snapshot()
+        codes = {role: snap.players.codes.get(name) for role, name in (("batsman", batsman), ("bowler", bowler))
+                 if name is not None}
+        if any(code is None or code >= snap.n_players for code in codes.values()):
+            return []
+        top = snap.head_to_head().top(by=by, k=k, season=season, **codes)
+        return [(snap.players.values[opponent], balls, runs, outs) for opponent, balls, runs, outs in top]
+
+    def _appearances(self, snap, season=None, venue=None):
+        # participation index plus the side mask of a season and/or venue (by name)
+        venue_code = None if venue is None else snap.venues.codes.get(venue, -1)
+        part = snap.participation()
+        return part, part.mask(snap.match_mask(season, venue_code))
+
+    def _player(self, snap, name):
+        code = snap.players.codes.get(name)
+        return None if code is None or code >= snap.n_players else code
+
+    def matches_played(self, player, season=None, venue=None):
+        """Line-ups the player (by name) was part of, optionally in one season and/or at one venue."""
+        snap = self.snapshot()
+        code = self._player(snap, player)
+        if code is None:
+            return 0
+        part, mask = self._appearances(snap, season, venue)
+        return int(part.matches_played(mask)[code])
+
+    def played_together(self, a, b, season=None, venue=None):
+        """{'together': matches on the same side, 'against': matches on opposite sides} for two players."""
+        snap = self.snapshot()
+        codes = self._player(snap, a), self._player(snap, b)
+        if None in codes:
+            return {"together": 0, "against": 0}
+        part, mask = self._appearances(snap, season, venue)
+        return {"together": part.together(*codes, mask), "against": part.against(*codes, mask)}
+
+    def teammates(self, player, k=10, season=None, venue=None, opponents=False):
+        """Players who shared the most matches with `player`, on the same side (or the other): [(name, matches)]."""
+        snap = self.snapshot()
+        code = self._player(snap, player)
+        if code is None:
+            return []
+        part, mask = self._appearances(snap, season, venue)
+        counts = part.teammates(code, mask, opponents=opponents)
+        names = snap.players.decode(np.arange(snap.n_players))
+        order = _ranked(names, counts, positive=True, limit=k)
+        return list(zip(names[order].tolist(), counts[order].tolist()))
+
+    def phase_leaders(self, side, metric, season=None, phase=None, min_balls=30, k=10):
+        """Top-k players of one side by a phase_metrics metric, for a season and/or phase (all when
+        None), among those with at least `min_balls` balls there:
+        [(name, *phase_metrics.COLUMNS[side])], rates rounded to two decimals."""
+        snap = self.snapshot()
+        names = snap.players.decode(np.arange(snap.n_players))
+        codes, values = snap.phase_metrics().leaderboard(side, metric, season=season, phase=phase,
+                                                         min_balls=min_balls, k=k, names=names)
+        columns = [np.round(values[c], 2) if values[c].dtype.kind == "f" else values[c] for c in values]
+        return list(zip(names[codes].tolist(), *(column.tolist() for column in columns)))
+
+    def rollup(self, by, **filters):
+        """Cube roll-up as a DataFrame with one column per name in `by` plus a `matches` count.
+
+        Team and venue filters take names; season filters take years; toss, decision and outcome
+        take the codes in match_cube.  Cells with no matches are left out.
+        """
+        snap = self.snapshot()
+        cube = snap.cube
+        for axis, (dim, dictionary) in enumerate((("team", snap.teams), ("venue", snap.venues))):
+            if filters.get(dim) is not None:
+                codes = [dictionary.codes.get(name, -1) for name in np.atleast_1d(filters[dim]).tolist()]
+                filters[dim] = [code for code in codes if 0 <= code < cube.counts.shape[axis]]
+        counts = cube.rollup(by, **filters)
+        labels = {
+            "team": snap.teams.values,
+            "venue": snap.venues.values,
+            "season": cube.seasons,
+            "toss": match_cube.TOSS,
+            "decision": match_cube.DECISIONS,
+            "outcome": match_cube.OUTCOMES,
+        }
+        cells = np.argwhere(counts > 0)
+        frame = pd.DataFrame({dim: np.array(labels[dim], dtype=object)[cells[:, k]] for k, dim in enumerate(by)})
+        frame["matches"] = counts[tuple(cells.T)]
+        return frame.sort_values(list(by)).reset_index(drop=True)
+
+    def scorecard(self, match_id):
+        """{'batting': [(name, runs, balls, fours, sixes, how out)], 'bowling': [(name, balls, wickets)]}."""
+        snap = self.snapshot()
+        cards, row = snap.cards(), snap.match_row(match_id)
+        b = slice(cards.bat_start[row], cards.bat_start[row + 1])
+        batting = list(zip(snap.players.decode(cards.bat_player[b]).tolist(), cards.bat_runs[b].tolist(),
+                           cards.bat_balls[b].tolist(), cards.bat_fours[b].tolist(), cards.bat_sixes[b].tolist(),
+                           [kind or "not out" for kind in snap.kinds.decode(cards.bat_kind[b]).tolist()]))
+        w = slice(cards.bowl_start[row], cards.bowl_start[row + 1])
+        bowling = list(zip(snap.players.decode(cards.bowl_player[w]).tolist(), cards.bowl_balls[w].tolist(),
+                           cards.bowl_wickets[w].tolist()))
+        return {"batting": batting, "bowling": bowling}
+
+    def stats(self):
+        snap = self._snapshot
+        if snap is None:
+            return {"loaded": False}
+        snap.delivery_pairs()
+        nbytes = sum(v.nbytes for table in self._raw.values() for v in table.values())
+        return {
+            "loaded": True,
+            "matches": snap.n_matches,
+            "deliveries": len(snap.bat_player),
+            "players": snap.n_players,
+            "seasons": len(snap.seasons),
+            "array_bytes": nbytes,
+            "data_version": self._version,
+            "last_refresh_seconds": self.loads[-1][0] if self.loads else None,
+            # deliveries whose batting and bowling rows did not pair up; head-to-heads and phase
+            # bowling figures leave them out, so anything but 0 means those numbers are short
+            "unpaired_batting_rows": snap.unpaired["batting"],
+            "unpaired_bowling_rows": snap.unpaired["bowling"],
+            "phase_metrics_seconds": snap._phase_metrics.build_seconds if snap._phase_metrics else None,
+        }
@@ -0,0 +1,351 @@
+"""Per-question latency benchmark on synthetic IPL-shaped data.
+
+    python benchmark.py generate --scale 10 --dsn "dbname=ipl_bench_10x"   # build a 10x database
+    python benchmark.py run --dsn "dbname=ipl_bench_10x" --output bench-10x.json --baseline bench-old.json
+
+`generate` restores the schema from the IPL_data dump (pg_restore --schema-only),
+writes synthetic match and ball-by-ball CSVs with the shapes of 2008-2022 (22 players
+per match, ~120 deliveries per innings, the real dismissal-kind mix) and loads them
+through ingest.py.  Scale multiplies the matches per season, so the 15 selectable
+seasons stay the same while every season gets heavier.
+
+`run` executes every registered dashboard query and records p50/p95/p99 latency, rows
+scanned (from EXPLAIN ANALYZE) and peak client memory into a JSON report, then times the
+same query through QueryService.run_query (analytics engine plus result cache, as the
+dashboard calls it); with --baseline it also lists the queries whose p95 got slower than
+--tolerance allows.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+import psycopg2
+
+import ingest
+import queries
+import schema_migrations
+from analytics_engine import Engine
+from db_pool import ConnectionPool, PooledConnection, dsn_from_env
+from query_cache import QueryCache
+from query_service import QueryService
+
+DUMP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "IPL_data")
+
+SEASONS = list(range(2008, 2023))
+MATCHES_PER_SEASON = 63
+
+TEAMS = ["Chennai Super Kings", "Mumbai Indians", "Kolkata Knight Riders", "Royal Challengers Bangalore",
+         "Delhi Capitals", "Punjab Kings", "Rajasthan Royals", "Sunrisers Hyderabad", "Gujarat Titans",
+         "Lucknow Super Giants"]
+VENUES = ["Wankhede Stadium", "Eden Gardens", "M Chinnaswamy Stadium", "MA Chidambaram Stadium",
+          "Arun Jaitley Stadium", "Rajiv Gandhi International Stadium", "Sawai Mansingh Stadium",
+          "Punjab Cricket Association Stadium", "Narendra Modi Stadium(Motera)", "Dr DY Patil Sports Academy"]
+
+# batsman runs off a delivery and how often each occurs in 2008-2022
+RUNS = np.array([0, 1, 2, 3, 4, 5, 6])
+RUNS_P = np.array([90778, 83928, 14313, 708, 25500, 61, 10666]) / 225954
+
+WICKET_P = 11151 / 225954
+DISMISSAL_KINDS = ["caught", "bowled", "run out", "lbw", "stumped", "caught and bowled", "hit wicket",
+                   "retired hurt", "obstructing the field", "retired out"]
+DISMISSAL_P = np.array([6837, 1944, 1007, 685, 325, 323, 14, 13, 2, 1]) / 11151
+EXTRA_BALL_P = 0.05     # wides / no-balls add a ball_number past 6
+
+MATCH_HEADER = ["ID", "City", "Date", "Season", "MatchNumber", "Team1", "Team2", "Venue", "TossWinner",
+                "TossDecision", "SuperOver", "WinningTeam", "WonBy", "Margin", "method", "Player_of_Match",
+                "Team1Players", "Team2Players", "Umpire1", "Umpire2"]
+BALL_HEADER = ["ID", "innings", "overs", "ballnumber", "batter", "bowler", "non-striker", "extra_type",
+               "batsman_run", "extras_run", "total_run", "non_boundary", "isWicketDelivery", "player_out",
+               "kind", "fielders_involved", "BattingTeam"]
+
+SCAN_NODES = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+
+# ---- synthetic data ----------------------------------------------------------
+
+def _innings(rng, match_id, innings, batting, bowling, team, writer):
+    order = list(batting)
+    striker, non_striker, next_in = order[0], order[1], 2
+    bowlers = bowling[-6:]
+    # draw the whole innings up front; the loop below only walks the arrays
+    length = int(np.clip(rng.normal(118, 8), 60, 126))
+    extras = rng.random(length) < EXTRA_BALL_P
+    runs = np.where(extras, 0, rng.choice(RUNS, size=length, p=RUNS_P))
+    wickets = ~extras & (rng.random(length) < WICKET_P)
+    kinds = rng.choice(len(DISMISSAL_KINDS), size=length, p=DISMISSAL_P)
+    fielders = rng.integers(len(bowling), size=length)
+    runs_total = fallen = 0
+    over = ball = legal = 0
+    for i in range(length):
+        if over >= 20 or fallen >= 10:
+            break
+        ball += 1
+        bowler = bowlers[over % len(bowlers)]
+        extra, run, wicket = bool(extras[i]), int(runs[i]), bool(wickets[i])
+        kind = out = fielder = "NA"
+        if wicket:
+            kind = DISMISSAL_KINDS[kinds[i]]
+            out = striker
+            if kind in ("caught", "run out", "stumped"):
+                fielder = bowling[fielders[i]]
+        writer.writerow([match_id, innings, over, ball, striker, bowler, non_striker,
+                         "wides" if extra else "NA", run, int(extra), run + int(extra), 0,
+                         int(wicket), out, kind, fielder, team])
+        runs_total += run + int(extra)
+        if wicket:
+            fallen += 1
+            if next_in < len(order):
+                striker, next_in = order[next_in], next_in + 1
+        elif run % 2:
+            striker, non_striker = non_striker, striker
+        if not extra:
+            legal += 1
+            if legal == 6:
+                over, ball, legal = over + 1, 0, 0
+                striker, non_striker = non_striker, striker
+    return runs_total
+
+
+def generate_csvs(directory, scale=1, seed=2008):
+    """Write synthetic matches/ball-by-ball CSVs for `scale` x the real volume; returns their paths."""
+    rng = np.random.default_rng(seed)
+    squad_size = 25 * max(1, int(np.sqrt(scale)))
+    squads = {team: [f"{team.split()[0][:3]} Player {i}" for i in range(squad_size)] for team in TEAMS}
+    matches_path = os.path.join(directory, "matches.csv")
+    balls_path = os.path.join(directory, "ball_by_ball.csv")
+    match_id = 1
+    with open(matches_path, "w", newline="") as mfh, open(balls_path, "w", newline="") as bfh:
+        mw, bw = csv.writer(mfh), csv.writer(bfh)
+        mw.writerow(MATCH_HEADER)
+        bw.writerow(BALL_HEADER)
+        for season in SEASONS:
+            n = MATCHES_PER_SEASON * scale
+            start = date(season, 4, 1)
+            for k in range(n):
+                team1, team2 = rng.choice(TEAMS, size=2, replace=False)
+                xi1 = list(rng.choice(squads[team1], size=11, replace=False))
+                xi2 = list(rng.choice(squads[team2], size=11, replace=False))
+                toss_winner = team1 if rng.random() < 0.5 else team2
+                decision = "field" if rng.random() < 0.63 else "bat"
+                bat_first = toss_winner if decision == "bat" else (team2 if toss_winner == team1 else team1)
+                first, second = (xi1, xi2) if bat_first == team1 else (xi2, xi1)
+                target = _innings(rng, match_id, 1, first, second, bat_first, bw)
+                chaser = team2 if bat_first == team1 else team1
+                chased = _innings(rng, match_id, 2, second, first, chaser, bw)
+                winner = chaser if chased > target else bat_first
+                won_by, margin = ("Wickets", int(rng.integers(1, 10))) if winner == chaser \
+                    else ("Runs", max(1, target - chased))
+                mw.writerow([match_id, "City", (start + timedelta(days=k * 55 // n)).isoformat(), season, k + 1,
+                             team1, team2, str(rng.choice(VENUES)), toss_winner, decision, "N", winner,
+                             won_by, margin, "NA", str(rng.choice(xi1 + xi2)), repr([str(p) for p in xi1]),
+                             repr([str(p) for p in xi2]), "Umpire A", "Umpire B"])
+                match_id += 1
+    return matches_path, balls_path
+
+
+def generate(dsn, scale, seed=2008, batch_rows=200000):
+    subprocess.run(["pg_restore", "--schema-only", "--no-owner", "--no-privileges", "-d", dsn, DUMP_PATH],
+                   check=True)
+    conn = psycopg2.connect(dsn)
+    try:
+        schema_migrations.migrate(conn)
+        with tempfile.TemporaryDirectory() as tmp:
+            matches_path, balls_path = generate_csvs(tmp, scale, seed)
+            loaded = ingest.load(conn, matches_path, balls_path, batch_rows=batch_rows)
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("VACUUM ANALYZE")
+    finally:
+        conn.close()
+    return len(loaded)
+
+
+# ---- measuring ----------------------------------------------------------------
+
+def _rows_scanned(plan):
+    rows = 0
+    if plan.get("Node Type") in SCAN_NODES:
+        loops = plan.get("Actual Loops", 1)
+        rows += (plan.get("Actual Rows", 0) + plan.get("Rows Removed by Filter", 0)) * loops
+    for child in plan.get("Plans", []):
+        rows += _rows_scanned(child)
+    return rows
+
+
+def percentile(samples, p):
+    return float(np.percentile(np.asarray(samples), p)) if samples else None
+
+
+def measure(conn, query, params, iterations=30, warmup=3, memory_runs=3):
+    import pandas as pd
+
+    def fetch():
+        query.execute(cur, params)
+        rows = cur.fetchall()
+        pd.DataFrame(rows)
+        return rows
+
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query.sql, params)
+        plan = cur.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        rows_scanned = _rows_scanned(plan[0]["Plan"])
+
+        timings = []
+        rows_returned = 0
+        for i in range(warmup + iterations):
+            started = time.perf_counter()
+            rows = fetch()
+            elapsed = time.perf_counter() - started
+            rows_returned = len(rows)
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+
+        # tracemalloc slows every allocation, so memory gets its own untimed runs
+        peak = 0
+        for _ in range(memory_runs):
+            tracemalloc.start()
+            fetch()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    conn.rollback()
+    return {
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+        "p99_ms": percentile(timings, 99),
+        "rows_scanned": rows_scanned,
+        "rows_returned": rows_returned,
+        "peak_memory_bytes": peak,
+        "iterations": iterations,
+    }
+
+
+def measure_service(service, name, params, iterations=30):
+    """run_query latency through the service: the first (uncached) call, then repeats answered from cache."""
+    started = time.perf_counter()
+    service.run_query(name, params)
+    cold = time.perf_counter() - started
+    source, size = service.last_lookup()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        service.run_query(name, params)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "engine": service.engine.supports(name),
+        "cold_ms": cold * 1000,
+        "cold_source": source,
+        "payload_bytes": size,
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+        "p99_ms": percentile(timings, 99),
+    }
+
+
+def run(dsn, iterations=30, names=None):
+    # same connection class as the pool, so queries run through PREPARE/EXECUTE like in the dashboard
+    conn = psycopg2.connect(dsn, connection_factory=PooledConnection)
+    try:
+        params = schema_migrations.sample_params(conn)
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            server_version = cur.fetchone()[0]
+            cur.execute("SELECT COUNT(*) FROM matches")
+            match_count = cur.fetchone()[0]
+            cur.execute("SELECT COUNT(*) FROM batting")
+            delivery_count = cur.fetchone()[0]
+        results = {}
+        for name, query in queries.REGISTRY.items():
+            if names and name not in names:
+                continue
+            results[name] = measure(conn, query, params, iterations)
+    finally:
+        conn.close()
+
+    # the dashboard's path: a memory-only cache (the shared disk tier is left alone) and a built engine
+    pool = ConnectionPool(minconn=1, maxconn=2, dsn=dsn)
+    try:
+        service = QueryService(pool, QueryCache(cache_dir=None), Engine(pool.connection, cache_dir=None))
+        started = time.perf_counter()
+        service.engine.snapshot()
+        engine_build = time.perf_counter() - started
+        for name in results:
+            query = queries.REGISTRY[name]
+            results[name]["service"] = measure_service(
+                service, name, {key: params[key] for key in query.param_names}, iterations)
+    finally:
+        pool.close()
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "postgres": server_version,
+        "matches": match_count,
+        "deliveries": delivery_count,
+        "engine_build_seconds": engine_build,
+        "params": {k: str(v) for k, v in params.items()},
+        "queries": results,
+    }
+
+
+def regressions(report, baseline, tolerance=0.2):
+    """Queries whose p95 is more than `tolerance` slower than in `baseline`."""
+    slower = {}
+    for name, result in report["queries"].items():
+        before = baseline.get("queries", {}).get(name)
+        if not before or not before.get("p95_ms"):
+            continue
+        ratio = result["p95_ms"] / before["p95_ms"]
+        if ratio > 1 + tolerance:
+            slower[name] = {"before_p95_ms": before["p95_ms"], "after_p95_ms": result["p95_ms"],
+                            "ratio": round(ratio, 2)}
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="create and load a synthetic database")
+    gen.add_argument("--scale", type=int, choices=[1, 10, 100], default=1)
+    gen.add_argument("--seed", type=int, default=2008)
+    gen.add_argument("--dsn", required=True, help="empty database to load (never the real IPLdata)")
+    bench = sub.add_parser("run", help="time every dashboard query")
+    bench.add_argument("--dsn", default=dsn_from_env())
+    bench.add_argument("--iterations", type=int, default=30)
+    bench.add_argument("--query", action="append", help="only this registered query (repeatable)")
+    bench.add_argument("--output", default="benchmark_report.json")
+    bench.add_argument("--baseline", help="earlier report to compare p95 latencies against")
+    bench.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        loaded = generate(args.dsn, args.scale, args.seed)
+        print(f"loaded {loaded} synthetic matches ({args.scale}x)")
+        return 0
+
+    report = run(args.dsn, args.iterations, args.query)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            report["regressions"] = regressions(report, json.load(fh), args.tolerance)
+    with open(args.output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    for name, result in report["queries"].items():
+        print(f"{name:28s} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+              f"p99 {result['p99_ms']:8.2f} ms  scanned {result['rows_scanned']:>10,}  "
+              f"service cold {result['service']['cold_ms']:8.2f} ms  p95 {result['service']['p95_ms']:6.3f} ms")
+    for name, slower in report.get("regressions", {}).items():
+        print(f"REGRESSION {name}: p95 {slower['before_p95_ms']:.2f} -> {slower['after_p95_ms']:.2f} ms")
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Cache of rendered charts, so a rerun with an unchanged selection does not rebuild its figure.
+
+Plotly figures are kept as their JSON spec and Matplotlib figures as PNG bytes, keyed by the
+caller's (chart, params) plus the shared data version, in a byte-bounded LRU.  A Matplotlib
+figure is rendered and closed as soon as it is built, so no figure outlives the call that made
+it and a long-running server keeps flat memory.  Plotly and Matplotlib are imported on first use.
+
+    fig, hit = figures.get_or_build(("toss_pie", season, version), build)            # Plotly figure
+    png, hit = figures.get_or_build(("batting_card", match_id, version), build, "pyplot")  # PNG bytes
+"""
+import io
+import threading
+from collections import OrderedDict
+
+
+def _png(fig):
+    """PNG bytes of a Matplotlib figure, which is closed afterwards whatever happens."""
+    import matplotlib.pyplot as plt
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+class FigureCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()     # key -> (kind, payload), most recently used last
+        self._bytes = 0
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._metrics["hits"] += 1
+            else:
+                self._metrics["misses"] += 1
+            return entry
+
+    def _put(self, key, kind, payload):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            if len(payload) > self.max_bytes:
+                return
+            self._entries[key] = (kind, payload)
+            self._bytes += len(payload)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._metrics["evictions"] += 1
+
+    def get_or_build(self, key, build, kind="plotly"):
+        """(figure, cache hit): a fresh Plotly figure from the cached spec, or the PNG bytes of a
+        Matplotlib figure; `build()` makes the figure on a miss."""
+        entry = self._get(key)
+        hit = entry is not None
+        if hit:
+            payload = entry[1]
+        else:
+            fig = build()
+            payload = _png(fig) if kind == "pyplot" else fig.to_json()
+            self._put(key, kind, payload)
+        if kind == "pyplot":
+            return payload, hit
+        import plotly.io as pio
+        return pio.from_json(payload), hit
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(self._metrics, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
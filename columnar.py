@@ -0,0 +1,38 @@
+"""Columnar fetch path: COPY a query result out as CSV and parse it straight into typed columns.
+
+The row path (fetchall -> list of tuples -> DataFrame) allocates every value as a Python object
+twice.  Here Postgres streams `COPY (query) TO STDOUT` and pandas' C parser (pyarrow's when it is
+installed) decodes the bytes directly into int64/float64 NumPy arrays; only text columns end up
+as Python objects.  Use it for bulk pulls through run_query(name, params, columnar=True).
+"""
+import importlib.util
+import io
+
+import pandas as pd
+
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+# unquoted marker for NULL, so a real empty string or the text "NA" is not read as missing
+NULL = "\\N"
+
+
+def copy_sql(cur, query, params=None):
+    """COPY statement for a registered query; COPY cannot EXECUTE, so values are bound client-side."""
+    values = query.bind(params)
+    select = cur.mogrify(query.sql, dict(zip(query.param_names, values)))
+    return b"COPY (" + select + b") TO STDOUT WITH (FORMAT csv, HEADER true, NULL '\\N')"
+
+
+def fetch_frame(conn, query, params=None, dtypes=None):
+    """Run `query` through COPY and return the result as a DataFrame of typed columns."""
+    buf = io.BytesIO()
+    with conn.cursor() as cur:
+        cur.copy_expert(copy_sql(cur, query, params), buf)
+    buf.seek(0)
+    return pd.read_csv(buf, engine=CSV_ENGINE, dtype=dtypes, na_values=[NULL], keep_default_na=False)
+
+
+def fetch_arrays(conn, query, params=None, dtypes=None):
+    """Same as fetch_frame, as {column name: NumPy array}."""
+    frame = fetch_frame(conn, query, params, dtypes)
+    return {column: frame[column].to_numpy() for column in frame.columns}
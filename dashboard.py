@@ -0,0 +1,245 @@
+"""Shared helpers of the logged-in dashboard: query, table, picker and chart helpers and the admin
+Performance view.
+
+Imported by pg_connect.py after login and by the question page modules (question_pages/), so
+pandas, the analytics engine and the connection pool are loaded by the first logged-in render
+rather than by the login page.
+"""
+import pandas as pd
+import streamlit as st
+
+import queries
+import query_cache
+import resources
+import startup
+from query_service import QueryClient
+
+metrics = resources.init_metrics()
+service = resources.init_service()
+# against a shared query service this process keeps no pool, result cache or engine of its own;
+# `engine` then forwards the pages' calls to the service's engine
+remote = isinstance(service, QueryClient)
+pool = None if remote else resources.init_pool()
+cache = None if remote else resources.init_cache()
+engine = resources.init_engine()
+executor = resources.init_executor()
+warmer = resources.init_warmer()
+figures = resources.init_figures()
+
+# Perform query.
+# `name` is a query registered in queries.REGISTRY; results are cached under (name, params),
+# identical requests in flight share one answer, and only a miss reaches Postgres, as an
+# EXECUTE of the prepared statement.
+# With `limit`, a pageable query runs as its <name>_page variant so only that page leaves the server.
+# With `columnar=True` the result comes back through COPY as a DataFrame of typed columns instead of
+# a list of tuples (see columnar.py); use it for bulk pulls and don't modify the returned frame.
+def run_query(name, params=None, limit=None, offset=0, columnar=False):
+    with metrics.span("query") as span:
+        rows = service.run_query(name, params, limit=limit, offset=offset, columnar=columnar)
+        source, span["bytes"] = service.last_lookup()
+        span["cache_hit"] = source != "query"
+        span["rows"] = len(rows)
+    return rows
+
+# Run several queries at once: `panels` maps a label to (query name, params).
+# Returns the executor's batch; batch.result(label) waits for one panel (raises QueryTimeout /
+# QueryCancelled). `page` keys the batch per session, so a rerun with a new selection cancels
+# the queries of the old one.
+def run_parallel(page, panels, timeout=None):
+    tasks = {label: (run_query, name, params) for label, (name, params) in panels.items()}
+    return executor.submit(tasks, key=(st.session_state.session_id, page), timeout=timeout)
+
+# Function to fetch and display data
+# `limit` is the page size; pageable queries fetch just the selected page from Postgres.
+def display_data(query_name, column_titles, subheading, limit=None, params=None):
+    st.subheader(subheading)
+    query = queries.REGISTRY[query_name]
+    if limit and query.page is not None:
+        total = run_query(query.count.name, params)[0][0]
+        pages = max(1, -(-total // limit))
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1,
+                                   key=f"page_{query_name}_{limit}_{params}")
+        offset = (page - 1) * limit
+        rows = run_query(query_name, params, limit=limit, offset=offset)
+        if total:
+            st.caption(f"Showing {offset + 1}-{offset + len(rows)} of {total}")
+    else:
+        rows = run_query(query_name, params)
+        if limit:
+            rows = rows[:limit]
+    with metrics.span("dataframe") as span:
+        data = pd.DataFrame(rows, columns=column_titles)
+        span["rows"] = len(data)
+    
+    with metrics.span("table_render"):
+        st.dataframe(data.style.set_properties(**{'font-size': '16px', 'font-weight': 'bold'}), use_container_width=True)
+
+# Match picker for the per-match questions: filters and a page of the in-memory match catalog
+# instead of a selectbox over every match id.
+MATCH_PAGE_SIZE = 25
+
+def select_match(key):
+    catalog = engine.catalog()
+    options = catalog.options()
+    col1, col2, col3 = st.columns(3)
+    season = col1.selectbox("Season", ["All"] + options["seasons"], key=f"{key}_season")
+    team = col2.selectbox("Team", ["All"] + options["teams"], key=f"{key}_team")
+    venue = col3.selectbox("Venue", ["All"] + options["venues"], key=f"{key}_venue")
+    text = st.text_input("Search by match ID, team or venue", key=f"{key}_text")
+    filters = {"season": None if season == "All" else season, "team": None if team == "All" else team,
+               "venue": None if venue == "All" else venue, "text": text or None}
+    _, total = catalog.search(**filters, limit=0)
+    if total == 0:
+        st.write("No matches found.")
+        return None
+    pages = -(-total // MATCH_PAGE_SIZE)
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1,
+                               key=f"{key}_page_{season}_{team}_{venue}_{text}")
+    matches, _ = catalog.search(**filters, offset=(page - 1) * MATCH_PAGE_SIZE, limit=MATCH_PAGE_SIZE)
+    return st.selectbox("Select Match:", matches["match_id"].tolist(), format_func=catalog.label, key=f"{key}_match")
+
+# Player picker shared by the player questions: a search box over the in-memory player
+# directory and a short list of the best matches. role is "batting", "bowling" or None.
+PLAYER_RESULTS = 20
+
+def select_player(label, key, role=None):
+    directory = engine.player_directory()
+    query = st.text_input(f"Search {label.lower()} (e.g. Kohli, HH Pandya)", key=f"{key}_search")
+    names = directory.search(query, limit=PLAYER_RESULTS, role=role)
+    if not names:
+        st.write(f"No player matches '{query}'.")
+        return None
+    return st.selectbox(label, names, key=f"{key}_player")
+
+# Chart helpers: time figure construction and rendering separately.
+# `build()` makes the figure on a cache miss; `key` names the chart and the selection it shows.
+# Matplotlib builders draw on their own figure, which is closed once rendered to PNG.
+def build_chart(key, build, kind="plotly"):
+    with metrics.span("chart_build") as span:
+        version = query_cache.read_data_version()
+        fig, span["cache_hit"] = figures.get_or_build((key, version), build, kind)
+    return fig
+
+def show_chart(fig, kind="plotly"):
+    with metrics.span("chart_render"):
+        if kind == "pyplot":
+            st.image(fig)
+        else:
+            st.plotly_chart(fig)
+
+# Process-wide numbers exported next to the per-question timings
+def process_gauges():
+    gauges = {}
+    for stage in startup.breakdown():
+        gauges[f"ipl_startup_{stage['stage'].replace(' ', '_')}_ms"] = stage["ms"]
+    if not remote:
+        gauges.update({f"ipl_pool_{key}": value for key, value in pool.stats().items()})
+        cache_stats = cache.stats()
+        for key in ("entries", "bytes", "max_bytes", "evictions", "hits", "disk_hits", "misses", "data_version"):
+            gauges[f"ipl_cache_{key}"] = cache_stats[key]
+    for key, value in executor.stats().items():
+        gauges[f"ipl_executor_{key}"] = value
+    if warmer is not None:
+        warmup = warmer.stats()
+        for key in ("done", "total", "errors", "runs"):
+            gauges[f"ipl_warmup_{key}"] = warmup[key]
+    return gauges
+
+# Admin-only performance view
+def performance_view():
+    st.subheader("Startup")
+    st.dataframe(pd.DataFrame(startup.breakdown()), use_container_width=True)
+
+    st.subheader("Query and Render Timings")
+    series = pd.DataFrame(metrics.series())
+    if series.empty:
+        st.write("No measurements yet.")
+    else:
+        series["avg_ms"] = series["seconds"] / series["calls"] * 1000
+        series["max_ms"] = series["max_seconds"] * 1000
+        st.dataframe(series[["question", "stage", "calls", "avg_ms", "max_ms", "rows", "bytes",
+                             "cache_hits", "cache_misses"]], use_container_width=True)
+
+    st.subheader("Per Session")
+    sessions = pd.DataFrame(metrics.sessions())
+    if not sessions.empty:
+        sessions["avg_ms"] = sessions["seconds"] / sessions["calls"] * 1000
+        st.dataframe(sessions[["session", "question", "stage", "calls", "avg_ms", "rows", "cache_hits",
+                               "cache_misses"]], use_container_width=True)
+
+    st.subheader("Result Cache")
+    if remote:
+        st.write("Kept by the query service (see Query Service below).")
+    else:
+        cache_stats = cache.stats()
+        st.write({key: value for key, value in cache_stats.items() if key != "per_entry"})
+        if cache_stats["per_entry"]:
+            st.dataframe(pd.DataFrame(cache_stats["per_entry"].values()), use_container_width=True)
+
+    st.subheader("Chart Cache")
+    st.write(figures.stats())
+
+    st.subheader("Connection Pool")
+    st.write("Kept by the query service (see Query Service below)." if remote else pool.stats())
+
+    st.subheader("Query Service")
+    st.write(service.stats() if remote else {**service.stats(), "mode": "in-process"})
+
+    st.subheader("Cache Warm-up")
+    if warmer is None:
+        st.write("Warmed by the query service.")
+    else:
+        warmup = warmer.stats()
+        if warmup["total"]:
+            st.progress(warmup["done"] / warmup["total"])
+            st.caption(f"{warmup['done']} of {warmup['total']} results warmed ({warmup['state']})")
+        st.write(warmup)
+
+    st.subheader("Query Executor")
+    st.write(executor.stats())
+
+    st.subheader("Analytics Engine")
+    st.write(engine.stats())
+
+    st.subheader("Prepared Statements")
+    st.dataframe(pd.DataFrame.from_dict(queries.plan_reuse(), orient="index"), use_container_width=True)
+
+    st.download_button("Download Prometheus metrics", metrics.prometheus_text(process_gauges()),
+                       file_name="metrics.prom", mime="text/plain")
+
+# Function to get years for dropdown
+def get_years():
+    years = run_query("years")
+    years = [str(year[0]) for year in years]
+    years.insert(0, "All Years")
+    return years
+
+# Seasons without the "All Years" entry
+def get_years1():
+    years1 = run_query("years")
+    years1 = [str(year[0]) for year in years1]
+    return years1
+
+# Venue wins bar chart, used by question 1 and the season overview
+def draw_plot(data, year):
+    # Create a bar plot using Plotly Express
+    def chart():
+        import plotly.express as px
+        fig = px.bar(data, x='Stadium Name', y='Matches Won', color='Team Name',
+                     labels={'Stadium Name': 'Stadium Name', 'Matches Won': 'Matches Won'},
+                     title='Stadiums Where Each Team Has Won the Maximum Matches')
+        # Customize layout
+        fig.update_layout(xaxis_title='Stadium Name', yaxis_title='Matches Won')
+        fig.update_xaxes(tickangle=90)  # Rotate x-axis labels
+        return fig
+
+    # Display the bar plot in Streamlit
+    show_chart(build_chart(("team_winning_venues", year), chart))
+
+# Export the timings for offline Prometheus scraping (at most every 15 seconds)
+def export_metrics():
+    metrics.maybe_export(extra_gauges=process_gauges)
@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+
+# same database the dashboard's st.secrets["postgres"] points at; overridable for scripts
+DEFAULT_DSN = "dbname=IPLdata user=postgres password=postgres host=localhost"
+
+
+def dsn_from_env():
+    """Connection string for command-line tools that run outside Streamlit."""
+    return os.environ.get("IPL_DSN", DEFAULT_DSN)
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers the server-side prepared statements it holds."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool shared by every Streamlit session.
+
+    Connections are health-checked when they have been idle for a while,
+    recycled after `max_lifetime` seconds and thrown away as soon as they
+    look broken, so a restarted Postgres never leaves dead sockets behind.
+    """
+
+    def __init__(self, minconn=1, maxconn=10, timeout=10.0, health_check_interval=30.0,
+                 max_lifetime=3600.0, **connect_kwargs):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("need 0 <= minconn <= maxconn and maxconn >= 1")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        self.connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition()
+        self._idle = []          # [(conn, created_at, last_used)] - most recently used last
+        self._in_use = {}        # id(conn) -> (conn, created_at)
+        self._opening = 0        # slots reserved by threads connecting/health-checking
+        self._closed = False
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "connections_discarded": 0,
+            "health_check_failures": 0,
+        }
+
+        for _ in range(minconn):
+            self._idle.append(self._new_connection())
+
+    def _new_connection(self):
+        conn = psycopg2.connect(connection_factory=PooledConnection, **self.connect_kwargs)
+        now = time.monotonic()
+        with self._cond:
+            self._metrics["connections_created"] += 1
+        return conn, now, now
+
+    def _size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _discard(self, conn):
+        with self._cond:
+            self._metrics["connections_discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, created_at, last_used):
+        now = time.monotonic()
+        if conn.closed:
+            return False
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if now - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            with self._cond:
+                self._metrics["health_check_failures"] += 1
+            return False
+
+    def getconn(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("connection pool is closed")
+                    if self._idle:
+                        conn, created_at, last_used = self._idle.pop()
+                        self._opening += 1
+                        break
+                    if self._size() < self.maxconn:
+                        conn = None
+                        self._opening += 1
+                        break
+                    remaining = timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        self._metrics["timeouts"] += 1
+                        raise PoolTimeout(f"no database connection free after {timeout:.1f}s "
+                                          f"(maxconn={self.maxconn})")
+                    waited = True
+                    self._cond.wait(remaining)
+
+            # connecting and health checks happen outside the lock; the slot is held by _opening
+            try:
+                if conn is None:
+                    conn, created_at, _ = self._new_connection()
+                elif not self._is_healthy(conn, created_at, last_used):
+                    self._discard(conn)
+                    conn = None
+            except BaseException:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                raise
+
+            with self._cond:
+                self._opening -= 1
+                if conn is None:
+                    self._cond.notify()
+                    continue
+                self._in_use[id(conn)] = (conn, created_at)
+                wait = time.monotonic() - started
+                self._metrics["checkouts"] += 1
+                if waited:
+                    self._metrics["waits"] += 1
+                self._metrics["wait_seconds_total"] += wait
+                self._metrics["wait_seconds_max"] = max(self._metrics["wait_seconds_max"], wait)
+                return conn
+
+    def putconn(self, conn, broken=False):
+        with self._cond:
+            _, created_at = self._in_use.pop(id(conn), (conn, time.monotonic()))
+            # the slot stays taken while the connection is rolled back outside the lock
+            self._opening += 1
+            closed = self._closed
+        try:
+            if not broken and not conn.closed and not closed:
+                try:
+                    # never hand an open transaction to the next session
+                    if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+        finally:
+            with self._cond:
+                self._opening -= 1
+                keep = not broken and not conn.closed and not self._closed
+                if keep:
+                    self._idle.append((conn, created_at, time.monotonic()))
+                self._cond.notify()
+        if not keep:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.getconn(timeout)
+        broken = False
+        try:
+            yield conn
+        except psycopg2.extensions.QueryCanceledError:
+            # a cancelled statement (statement_timeout, conn.cancel()) leaves a usable connection
+            if not conn.closed:
+                conn.rollback()
+            raise
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn, broken=broken)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._metrics)
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = len(self._in_use)
+            stats["maxconn"] = self.maxconn
+            return stats
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for conn, _, _ in self._idle:
+                self._discard(conn)
+            self._idle.clear()
+            self._cond.notify_all()
@@ -0,0 +1,111 @@
+"""Batsman-vs-bowler head-to-head index: balls, runs and dismissals for every pair that met.
+
+Built in one pass from the delivery and dismissal arrays of the analytics engine.  Pairs are
+stored CSR-style by batsman (pairs of batsman b are ptr[b]:ptr[b + 1], bowlers ascending) with
+a transposed index by bowler, and every pair keeps its per-season breakdown, so:
+
+    h2h.pair(batsman, bowler)                  # O(1) via a dict of pair keys
+    h2h.top(batsman=b, by="outs", k=3)         # bowlers who dismissed b most often
+    h2h.top(bowler=w, by="runs", season=2019)  # batsmen who scored most off w in 2019
+
+Player arguments are the engine's integer player codes.
+"""
+import numpy as np
+
+METRICS = ("balls", "runs", "outs")
+
+
+def _ranges(starts, stops):
+    """Concatenation of arange(start, stop) for every pair, without a Python loop."""
+    lengths = stops - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.intp)
+    offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return offsets + np.arange(total)
+
+
+class HeadToHead:
+    def __init__(self, batsman, bowler, runs, season, out_batsman, out_bowler, out_season, n_players, seasons):
+        """Deliveries as parallel (batsman, bowler, runs, season index) arrays plus dismissals as
+        (batsman, bowler, season index); `seasons` maps a season index to its year."""
+        self.n_players = n_players
+        self.seasons = np.asarray(seasons)
+        n_seasons = max(len(self.seasons), 1)
+
+        # one entry per (batsman, bowler, season); keys sort by batsman, then bowler, then season
+        def key(b, w, s):
+            return (b.astype(np.int64) * n_players + w) * n_seasons + s
+
+        ball_keys = key(batsman, bowler, season)
+        out_keys = key(out_batsman, out_bowler, out_season)
+        keys, inverse = np.unique(np.concatenate([ball_keys, out_keys]), return_inverse=True)
+        inverse = inverse.reshape(-1)
+        n_balls = len(ball_keys)
+        self.entry_balls = np.bincount(inverse[:n_balls], minlength=len(keys))
+        self.entry_runs = np.bincount(inverse[:n_balls], weights=runs, minlength=len(keys)).astype(np.int64)
+        self.entry_outs = np.bincount(inverse[n_balls:], minlength=len(keys))
+        self.entry_season = (keys % n_seasons).astype(np.int16)
+
+        # pairs and their entry ranges
+        pair_keys = keys // n_seasons
+        first = np.flatnonzero(np.r_[True, pair_keys[1:] != pair_keys[:-1]])
+        self.entry_ptr = np.append(first, len(keys))
+        pairs = pair_keys[first]
+        self.pair_batsman = (pairs // n_players).astype(np.int32)
+        self.pair_bowler = (pairs % n_players).astype(np.int32)
+        self.pair_balls = np.add.reduceat(self.entry_balls, first) if len(first) else self.entry_balls
+        self.pair_runs = np.add.reduceat(self.entry_runs, first) if len(first) else self.entry_runs
+        self.pair_outs = np.add.reduceat(self.entry_outs, first) if len(first) else self.entry_outs
+        self._pair_index = dict(zip(pairs.tolist(), range(len(pairs))))
+
+        # CSR by batsman, and the transposed index by bowler
+        self.batsman_ptr = np.searchsorted(self.pair_batsman, np.arange(n_players + 1))
+        self.by_bowler = np.lexsort((self.pair_batsman, self.pair_bowler))
+        self.bowler_ptr = np.searchsorted(self.pair_bowler[self.by_bowler], np.arange(n_players + 1))
+
+    def _season_index(self, season):
+        i = np.flatnonzero(self.seasons == int(season))
+        return int(i[0]) if len(i) else None
+
+    def _totals(self, pairs, season):
+        """balls, runs and outs of `pairs`, over every season or just `season`."""
+        if season is None:
+            return {"balls": self.pair_balls[pairs], "runs": self.pair_runs[pairs], "outs": self.pair_outs[pairs]}
+        entries = _ranges(self.entry_ptr[pairs], self.entry_ptr[pairs + 1])
+        owner = np.repeat(np.arange(len(pairs)), self.entry_ptr[pairs + 1] - self.entry_ptr[pairs])
+        hit = self.entry_season[entries] == self._season_index(season)
+        entries, owner = entries[hit], owner[hit]
+        return {
+            "balls": np.bincount(owner, weights=self.entry_balls[entries], minlength=len(pairs)).astype(np.int64),
+            "runs": np.bincount(owner, weights=self.entry_runs[entries], minlength=len(pairs)).astype(np.int64),
+            "outs": np.bincount(owner, weights=self.entry_outs[entries], minlength=len(pairs)).astype(np.int64),
+        }
+
+    def pair(self, batsman, bowler, season=None):
+        """{'balls', 'runs', 'outs'} for one batsman against one bowler (zeros if they never met)."""
+        p = self._pair_index.get(int(batsman) * self.n_players + int(bowler))
+        if p is None or (season is not None and self._season_index(season) is None):
+            return {metric: 0 for metric in METRICS}
+        return {metric: int(values[0]) for metric, values in self._totals(np.array([p]), season).items()}
+
+    def top(self, batsman=None, bowler=None, by="outs", k=3, season=None):
+        """Top-k opponents of a batsman (bowlers) or of a bowler (batsmen), ranked by `by`.
+
+        Returns [(opponent code, balls, runs, outs)], highest `by` first; opponents scoring 0 are left out.
+        """
+        if (batsman is None) == (bowler is None):
+            raise ValueError("pass exactly one of batsman or bowler")
+        if batsman is not None:
+            pairs = np.arange(self.batsman_ptr[batsman], self.batsman_ptr[batsman + 1])
+            opponents = self.pair_bowler[pairs]
+        else:
+            pairs = self.by_bowler[self.bowler_ptr[bowler]:self.bowler_ptr[bowler + 1]]
+            opponents = self.pair_batsman[pairs]
+        if season is not None and self._season_index(season) is None:
+            return []
+        totals = self._totals(pairs, season)
+        keep = np.flatnonzero(totals[by] > 0)
+        order = keep[np.lexsort((opponents[keep], -totals[by][keep]))][:k]
+        return list(zip(opponents[order].tolist(), totals["balls"][order].tolist(),
+                        totals["runs"][order].tolist(), totals["outs"][order].tolist()))
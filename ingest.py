@@ -0,0 +1,331 @@
+"""Streaming loader for the IPL match and ball-by-ball CSVs.
+
+    python ingest.py --matches IPL_Matches_2008_2022.csv --deliveries IPL_Ball_by_Ball_2008_2022.csv
+
+Rows are read with csv.DictReader and written with COPY FROM STDIN.  Each batch
+commits a group of complete matches together with their line-ups, deliveries, toss and
+dismissals and the derived tables of those matches (name codes, season aggregates, player
+roles, scorecards), so an interrupted load can simply be rerun: matches already in the
+database are skipped, which also makes appending a new season a plain rerun with
+the new files.  Memory is bounded by the batch size plus one row per new match.
+
+The ball-by-ball file uses the Kaggle layout (ID, innings, overs, ballnumber, batter,
+bowler, non-striker, extra_type, batsman_run, extras_run, total_run, non_boundary,
+isWicketDelivery, player_out, kind, fielders_involved, BattingTeam) and must keep
+the deliveries of a match together.
+"""
+import argparse
+import ast
+import csv
+import io
+import sys
+from datetime import date
+
+import psycopg2
+
+import name_codes
+import player_roles
+import query_cache
+import scorecards
+import season_aggregates
+from db_pool import dsn_from_env
+
+# franchise renames, mapped to the names the dashboard shows
+TEAM_NAMES = {
+    "Kings XI Punjab": "Punjab Kings",
+    "Delhi Daredevils": "Delhi Capitals",
+    "Rising Pune Supergiants": "Rising Pune Supergiant",
+}
+
+# the same ground appears under several spellings across seasons
+VENUE_NAMES = {
+    "Feroz Shah Kotla": "Arun Jaitley Stadium",
+    "Arun Jaitley Stadium, Delhi": "Arun Jaitley Stadium",
+    "Brabourne Stadium, Mumbai": "Brabourne Stadium",
+    "Dr DY Patil Sports Academy, Mumbai": "Dr DY Patil Sports Academy",
+    "Eden Gardens, Kolkata": "Eden Gardens",
+    "M.Chinnaswamy Stadium": "M Chinnaswamy Stadium",
+    "MA Chidambaram Stadium, Chepauk, Chennai": "MA Chidambaram Stadium",
+    "MA Chidambaram Stadium, Chepauk": "MA Chidambaram Stadium",
+    "Maharashtra Cricket Association Stadium, Pune": "Maharashtra Cricket Association Stadium",
+    "Narendra Modi Stadium, Ahmedabad": "Narendra Modi Stadium(Motera)",
+    "Sardar Patel Stadium, Motera": "Narendra Modi Stadium(Motera)",
+    "Punjab Cricket Association IS Bindra Stadium, Mohali": "Punjab Cricket Association Stadium",
+    "Punjab Cricket Association Stadium, Mohali": "Punjab Cricket Association Stadium",
+    "Punjab Cricket Association IS Bindra Stadium": "Punjab Cricket Association Stadium",
+    "Rajiv Gandhi International Stadium, Uppal": "Rajiv Gandhi International Stadium",
+    "Vidarbha Cricket Association Stadium, Jamtha": "Vidarbha Cricket Association Stadium(Jamtha)",
+    "Wankhede Stadium, Mumbai": "Wankhede Stadium",
+    "Zayed Cricket Stadium, Abu Dhabi": "Zayed Cricket Stadium",
+}
+
+NO_RESULT = "Match abandoned"
+
+MATCH_COLUMNS = ("match_id", "match_date", "team1_name", "team1_eleven", "team2_name", "team2_eleven",
+                 "winning_team", "match_result", "player_of_match", "venue_name", "umpire1", "umpire2")
+TOSS_COLUMNS = ("match_id", "toss_winner", "toss_decision", "winning_team")
+# delivery_no (1, 2, ... within the match) is written to both tables and pairs a delivery's batting and bowling rows
+BATTING_COLUMNS = ("match_id", "player_id", "runs_scored", "dismissal_kind", "over_number", "ball_number",
+                   "delivery_no")
+BOWLING_COLUMNS = ("player_id", "match_id", "wicket_delivery", "dismissal_kind", "over_number", "ball_number",
+                   "delivery_no")
+MATCH_PLAYER_COLUMNS = ("match_id", "player_id", "team", "position")
+# dismissal_id comes from its sequence (migration 8)
+DISMISSAL_COLUMNS = ("match_id", "batsman_name", "bowler_name", "dismissal_kind",
+                     "fielders_involved", "dismissal_description")
+
+
+def _value(raw):
+    raw = (raw or "").strip()
+    return None if raw in ("", "NA") else raw
+
+
+def team_name(raw):
+    raw = _value(raw)
+    return TEAM_NAMES.get(raw, raw)
+
+
+def venue_name(raw):
+    raw = _value(raw)
+    return VENUE_NAMES.get(raw, raw)
+
+
+def normalize_season(raw, match_date):
+    """'2007/08' -> 2008, '2020/21' -> 2020: a split season is the year the match was played in."""
+    raw = raw.strip()
+    if "/" not in raw:
+        return int(raw)
+    start, end = raw.split("/")
+    candidates = {int(start), int(start[:-len(end)] + end)}
+    return match_date.year if match_date.year in candidates else int(start[:-len(end)] + end)
+
+
+def parse_players(raw):
+    """Team1Players/Team2Players are python list literals: "['YBK Jaiswal', 'JC Buttler', ...]"."""
+    raw = _value(raw)
+    return [name.strip() for name in ast.literal_eval(raw)] if raw else []
+
+
+def lineup_rows(records, player_ids):
+    """match_players rows (match_id, player_id, team, position) of match records' line-ups."""
+    for record in records:
+        for team in (1, 2):
+            for position, name in enumerate(record[f"team{team}_players"], start=1):
+                yield record["match_id"], player_ids[name], team, position
+
+
+def match_record(row):
+    match_date = date.fromisoformat(row["Date"].strip())
+    season = normalize_season(row["Season"], match_date)
+    if season != match_date.year:
+        # matches.season is generated from match_date, so the two must agree
+        raise ValueError(f"match {row['ID']}: season {row['Season']!r} does not match date {match_date}")
+    winner = team_name(row["WinningTeam"]) or NO_RESULT
+    margin = float(_value(row["Margin"]) or 0)
+    won_by = (_value(row["WonBy"]) or "noresults").lower()
+    return {
+        "match_id": int(row["ID"]),
+        "match_date": match_date,
+        "season": season,
+        "team1_name": team_name(row["Team1"]),
+        "team1_eleven": row["Team1Players"].strip(),
+        "team2_name": team_name(row["Team2"]),
+        "team2_eleven": row["Team2Players"].strip(),
+        "winning_team": winner,
+        "match_result": f"Won by {margin:.1f} {won_by}",
+        "player_of_match": _value(row["Player_of_Match"]) or "None",
+        "venue_name": venue_name(row["Venue"]),
+        "umpire1": _value(row["Umpire1"]),
+        "umpire2": _value(row["Umpire2"]),
+        "toss_winner": team_name(row["TossWinner"]),
+        "toss_decision": _value(row["TossDecision"]),
+        "team1_players": parse_players(row["Team1Players"]),
+        "team2_players": parse_players(row["Team2Players"]),
+    }
+
+
+def _copy_line(values):
+    out = []
+    for value in values:
+        if value is None:
+            out.append("\\N")
+        else:
+            out.append(str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r"))
+    return "\t".join(out) + "\n"
+
+
+class Loader:
+    def __init__(self, conn, batch_rows=50000):
+        self.conn = conn
+        self.batch_rows = batch_rows
+        with conn.cursor() as cur:
+            cur.execute("SELECT match_id FROM matches")
+            self.existing = {row[0] for row in cur.fetchall()}
+            cur.execute("SELECT player_name, player_id FROM players")
+            self.player_ids = dict(cur.fetchall())
+        self.pending = {}       # match_id -> match record, for matches not loaded yet
+        self.loaded = []
+        self._reset_batch()
+
+    def _reset_batch(self):
+        self.batch_matches = []
+        self.batch_names = set()
+        self.rows = {table: [] for table in ("batting", "bowling", "dismissals")}
+
+    # ---- matches file ------------------------------------------------------
+
+    def read_matches(self, path):
+        with open(path, newline="", encoding="utf-8") as fh:
+            for row in csv.DictReader(fh):
+                match_id = int(row["ID"])
+                if match_id in self.existing or match_id in self.pending:
+                    continue
+                self.pending[match_id] = match_record(row)
+        return len(self.pending)
+
+    # ---- deliveries file ---------------------------------------------------
+
+    def _add_delivery(self, match_id, row):
+        batter, bowler = row["batter"].strip(), row["bowler"].strip()
+        self.batch_names.update((batter, bowler))
+        wicket = int(row["isWicketDelivery"] or 0)
+        kind = _value(row["kind"]) if wicket else None
+        over, ball = int(row["overs"]), int(row["ballnumber"])
+        runs = int(row["batsman_run"] or 0)
+        record = self.pending[match_id]
+        record["deliveries"] = delivery_no = record.get("deliveries", 0) + 1
+        # names are swapped for player ids at flush time, once new players have been inserted
+        self.rows["batting"].append((match_id, batter, runs, kind, over, ball, delivery_no))
+        self.rows["bowling"].append((bowler, match_id, wicket, kind, over, ball, delivery_no))
+        if wicket:
+            fielders = _value(row["fielders_involved"]) or bowler
+            self.rows["dismissals"].append((
+                match_id, _value(row["player_out"]) or batter, bowler, kind, fielders, f"{kind} by {fielders}"))
+
+    def read_deliveries(self, path):
+        finished = set()
+        current = None
+        with open(path, newline="", encoding="utf-8") as fh:
+            for row in csv.DictReader(fh):
+                match_id = int(row["ID"])
+                if match_id != current:
+                    if current is not None:
+                        finished.add(current)
+                        self._close_match(current)
+                    if match_id in finished:
+                        raise ValueError(f"deliveries of match {match_id} are not contiguous in {path}")
+                    current = match_id
+                if match_id in self.pending:
+                    self._add_delivery(match_id, row)
+        if current is not None:
+            self._close_match(current)
+
+    def _close_match(self, match_id):
+        record = self.pending.pop(match_id, None)
+        if record is None:
+            return
+        self.batch_matches.append(record)
+        if len(self.rows["batting"]) >= self.batch_rows:
+            self.flush()
+
+    # ---- writing -----------------------------------------------------------
+
+    def _ensure_players(self, cur, names):
+        missing = sorted(name for name in names if name and name not in self.player_ids)
+        if not missing:
+            return
+        cur.execute("""
+            INSERT INTO players (player_name)
+            SELECT name FROM unnest(%s::varchar[]) AS name
+            RETURNING player_name, player_id
+        """, (missing,))
+        self.player_ids.update(dict(cur.fetchall()))
+
+    @staticmethod
+    def _copy(cur, table, columns, rows):
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(_copy_line(row))
+        buffer.seek(0)
+        cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+    def flush(self):
+        if not self.batch_matches:
+            return
+        names = set(self.batch_names)
+        for record in self.batch_matches:
+            names.update(record["team1_players"] + record["team2_players"])
+        ids = self.player_ids
+        loaded = [record["match_id"] for record in self.batch_matches]
+        try:
+            with self.conn.cursor() as cur:
+                self._ensure_players(cur, names)
+                self._copy(cur, "matches", MATCH_COLUMNS,
+                           (tuple(record[c] for c in MATCH_COLUMNS) for record in self.batch_matches))
+                self._copy(cur, "match_players", MATCH_PLAYER_COLUMNS, lineup_rows(self.batch_matches, ids))
+                self._copy(cur, "toss", TOSS_COLUMNS,
+                           ((r["match_id"], r["toss_winner"], r["toss_decision"], r["winning_team"])
+                            for r in self.batch_matches))
+                self._copy(cur, "batting", BATTING_COLUMNS,
+                           ((m, ids[name], *rest) for m, name, *rest in self.rows["batting"]))
+                self._copy(cur, "bowling", BOWLING_COLUMNS,
+                           ((ids[name], *rest) for name, *rest in self.rows["bowling"]))
+                self._copy(cur, "dismissals", DISMISSAL_COLUMNS, self.rows["dismissals"])
+            refresh_derived(self.conn, loaded, commit=False)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        query_cache.invalidate()
+        self.existing.update(loaded)
+        self.loaded.extend(loaded)
+        self._reset_batch()
+
+    def finish(self):
+        # matches without any deliveries (abandoned, or no ball-by-ball file given)
+        for match_id in list(self.pending):
+            self._close_match(match_id)
+        self.flush()
+        return self.loaded
+
+
+def refresh_derived(conn, match_ids, commit=True):
+    """Bring everything derived from the raw tables up to date for `match_ids`, in one transaction."""
+    if not match_ids:
+        return
+    # codes first: the derived tables below read them
+    name_codes.refresh_matches(conn, match_ids, commit=False)
+    season_aggregates.refresh_for_matches(conn, match_ids, commit=False)
+    player_roles.refresh_for_matches(conn, match_ids, commit=False)
+    scorecards.refresh_matches(conn, match_ids, commit=False)
+    if commit:
+        conn.commit()
+
+
+def load(conn, matches_path, deliveries_path=None, batch_rows=50000):
+    loader = Loader(conn, batch_rows=batch_rows)
+    loader.read_matches(matches_path)
+    if deliveries_path:
+        loader.read_deliveries(deliveries_path)
+    return loader.finish()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", required=True, help="IPL_Matches CSV")
+    parser.add_argument("--deliveries", help="ball-by-ball CSV")
+    parser.add_argument("--batch-rows", type=int, default=50000, help="deliveries per COPY transaction")
+    parser.add_argument("--dsn", default=dsn_from_env())
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        loaded = load(conn, args.matches, args.deliveries, args.batch_rows)
+    finally:
+        conn.close()
+    print(f"loaded {len(loaded)} new match(es)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
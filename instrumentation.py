@@ -0,0 +1,131 @@
+"""Hot-path timings for the dashboard: query, DataFrame build, chart build and render.
+
+Every measurement is a span tagged with the current question and session (set once per
+rerun with set_context) and the stage being timed.  Totals are kept per (question, stage)
+and per session, shown on the admin Performance view and exported in the Prometheus text
+format so an external scraper can pick them up from a file.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+DEFAULT_EXPORT_PATH = os.environ.get(
+    "IPL_METRICS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "metrics.prom"))
+
+_question = contextvars.ContextVar("question", default="none")
+_session = contextvars.ContextVar("session", default="none")
+
+
+def set_context(question=None, session=None):
+    if question is not None:
+        _question.set(question)
+    if session is not None:
+        _session.set(session)
+
+
+def _new_series():
+    return {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "bytes": 0,
+            "cache_hits": 0, "cache_misses": 0}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self, max_sessions=200):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._series = {}                 # (question, stage) -> counters
+        self._sessions = OrderedDict()    # session -> {(question, stage): counters}, most recent last
+        self._last_export = 0.0
+
+    def record(self, stage, seconds, rows=0, nbytes=0, cache_hit=None, question=None, session=None):
+        question = question or _question.get()
+        session = session or _session.get()
+        with self._lock:
+            per_session = self._sessions.pop(session, None) or {}
+            self._sessions[session] = per_session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            for series in (self._series.setdefault((question, stage), _new_series()),
+                           per_session.setdefault((question, stage), _new_series())):
+                series["calls"] += 1
+                series["seconds"] += seconds
+                series["max_seconds"] = max(series["max_seconds"], seconds)
+                series["rows"] += rows
+                series["bytes"] += nbytes
+                if cache_hit is True:
+                    series["cache_hits"] += 1
+                elif cache_hit is False:
+                    series["cache_misses"] += 1
+
+    @contextmanager
+    def span(self, stage, question=None):
+        """Time the block; the caller may fill in rows/bytes/cache_hit on the yielded dict."""
+        info = {"rows": 0, "bytes": 0, "cache_hit": None}
+        started = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.record(stage, time.perf_counter() - started, info["rows"], info["bytes"], info["cache_hit"],
+                        question=question)
+
+    def series(self):
+        with self._lock:
+            return [dict(question=q, stage=s, **counters) for (q, s), counters in sorted(self._series.items())]
+
+    def sessions(self):
+        with self._lock:
+            return [dict(session=session, question=q, stage=s, **counters)
+                    for session, per_session in self._sessions.items()
+                    for (q, s), counters in sorted(per_session.items())]
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._sessions.clear()
+
+    def prometheus_text(self, extra_gauges=None):
+        """Render the counters in the Prometheus text exposition format.
+
+        `extra_gauges` maps metric name -> value for process-wide numbers such as pool or cache stats.
+        """
+        metrics = [
+            ("ipl_stage_calls_total", "counter", "Spans recorded per question and stage.", "calls"),
+            ("ipl_stage_seconds_total", "counter", "Time spent per question and stage.", "seconds"),
+            ("ipl_stage_seconds_max", "gauge", "Slowest single span per question and stage.", "max_seconds"),
+            ("ipl_stage_rows_total", "counter", "Rows handled per question and stage.", "rows"),
+            ("ipl_stage_payload_bytes_total", "counter", "Result payload bytes per question and stage.", "bytes"),
+            ("ipl_stage_cache_hits_total", "counter", "Result cache hits per question and stage.", "cache_hits"),
+            ("ipl_stage_cache_misses_total", "counter", "Result cache misses per question and stage.",
+             "cache_misses"),
+        ]
+        series = self.series()
+        lines = []
+        for name, kind, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for s in series:
+                lines.append(f'{name}{{question="{_escape(s["question"])}",stage="{_escape(s["stage"])}"}} '
+                             f'{s[field]}')
+        for name, value in sorted((extra_gauges or {}).items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=DEFAULT_EXPORT_PATH, extra_gauges=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            fh.write(self.prometheus_text(extra_gauges))
+        os.replace(tmp, path)
+        self._last_export = time.monotonic()
+
+    def maybe_export(self, path=DEFAULT_EXPORT_PATH, interval=15.0, extra_gauges=None):
+        """Export at most every `interval` seconds; cheap enough to call on every rerun."""
+        if time.monotonic() - self._last_export >= interval:
+            self.export(path, extra_gauges() if callable(extra_gauges) else extra_gauges)
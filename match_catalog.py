@@ -0,0 +1,80 @@
+"""Match catalog behind the match selectors: id, date, season, teams, venue and result per match.
+
+Filters (season, team, venue, free-text typeahead) are boolean masks over the engine's integer
+codes, and results come back one page at a time, newest match first, so a selector only ever
+renders a few dozen options however many seasons are loaded.
+"""
+import numpy as np
+import pandas as pd
+
+
+def label(row):
+    """One-line description of a catalog row (a row of MatchCatalog.frame) for selectors."""
+    return f"{row.match_id} · {row.date} · {row.team1} vs {row.team2} · {row.venue}"
+
+
+class MatchCatalog:
+    def __init__(self, match_id, date, season, team1, team2, venue, winner, result, has_deliveries,
+                 teams, venues, results):
+        """Parallel per-match arrays; team/winner/venue/result are codes into the `teams`/`venues`/`results` lists."""
+        order = np.lexsort((-match_id, -date.astype("datetime64[D]").astype(np.int64)))
+        self.match_id = match_id[order]
+        self.season = season[order]
+        self.team1, self.team2, self.venue = team1[order], team2[order], venue[order]
+        self.has_deliveries = has_deliveries[order]
+        self.teams, self.venues = list(teams), list(venues)
+        self._row = dict(zip(self.match_id.tolist(), range(len(self.match_id))))
+
+        team_names = np.array(self.teams + [None], dtype=object)
+        venue_names = np.array(self.venues + [None], dtype=object)
+        self.frame = pd.DataFrame({
+            "match_id": self.match_id,
+            "date": pd.to_datetime(date[order]).date,
+            "season": self.season,
+            "team1": team_names[self.team1],
+            "team2": team_names[self.team2],
+            "venue": venue_names[self.venue],
+            "winner": team_names[winner[order]],
+            "result": np.array(list(results) + [None], dtype=object)[result[order]],
+        })
+        # lower-cased search text per match for typeahead
+        self._text = (self.frame["match_id"].astype(str) + " " + self.frame["team1"].fillna("") + " "
+                      + self.frame["team2"].fillna("") + " " + self.frame["venue"].fillna("")).str.lower()
+
+    def __len__(self):
+        return len(self.match_id)
+
+    def options(self, with_deliveries=True):
+        """Distinct seasons, teams and venues, for the filter widgets."""
+        rows = self.has_deliveries if with_deliveries else slice(None)
+        teams = np.unique(np.concatenate([self.team1[rows], self.team2[rows]]))
+        return {
+            "seasons": sorted(np.unique(self.season[rows]).tolist(), reverse=True),
+            "teams": sorted(self.teams[t] for t in teams.tolist() if t >= 0),
+            "venues": sorted(self.venues[v] for v in np.unique(self.venue[rows]).tolist() if v >= 0),
+        }
+
+    def _mask(self, season=None, team=None, venue=None, text=None, with_deliveries=True):
+        mask = self.has_deliveries.copy() if with_deliveries else np.ones(len(self), dtype=bool)
+        if season is not None:
+            mask &= self.season == int(season)
+        if team is not None:
+            code = self.teams.index(team) if team in self.teams else -2
+            mask &= (self.team1 == code) | (self.team2 == code)
+        if venue is not None:
+            mask &= self.venue == (self.venues.index(venue) if venue in self.venues else -2)
+        if text:
+            mask &= self._text.str.contains(text.strip().lower(), regex=False).to_numpy()
+        return mask
+
+    def search(self, season=None, team=None, venue=None, text=None, with_deliveries=True, offset=0, limit=25):
+        """(page of matching matches as a DataFrame, total number of matches)."""
+        rows = np.flatnonzero(self._mask(season, team, venue, text, with_deliveries))
+        return self.frame.iloc[rows[offset:offset + limit]].reset_index(drop=True), len(rows)
+
+    def label(self, match_id):
+        """One-line description of a match for selectors."""
+        row = self._row.get(int(match_id))
+        if row is None:
+            return str(match_id)
+        return label(self.frame.iloc[row])
@@ -0,0 +1,77 @@
+"""Win/loss cube over team x venue x season x toss x toss decision x outcome.
+
+Every match adds two cells, one from each side's point of view: the team, the venue and
+season, whether that team won the toss, what the toss winner chose, and whether the team
+won, lost or got no result.  Any roll-up (sum over some dimensions, filter on others) is
+then a NumPy reduction over ~100k counters, so toss impact or a team's best venue can be
+sliced by season without touching Postgres.
+
+Cubes are immutable: added() returns a new cube with the extra matches, so readers holding
+the old one never see a half-applied append.
+"""
+import numpy as np
+
+DIMS = ("team", "venue", "season", "toss", "decision", "outcome")
+
+TOSS = ("lost toss", "won toss")
+DECISIONS = ("bat", "field", "unknown")
+OUTCOMES = ("won", "lost", "no result")
+WON, LOST, NO_RESULT = range(3)
+
+
+class MatchCube:
+    def __init__(self, counts=None, seasons=()):
+        self.counts = np.zeros((0, 0, 0, 2, 3, 3), dtype=np.int32) if counts is None else counts
+        self.seasons = tuple(seasons)      # season value of each index along the season axis
+
+    def season_index(self, season):
+        try:
+            return self.seasons.index(int(season))
+        except ValueError:
+            return None
+
+    def added(self, matches):
+        """New cube including `matches`: dict of code arrays team1, team2, winner, toss_winner,
+        decision (0 bat, 1 field, 2 unknown), venue and season."""
+        seasons = list(self.seasons)
+        unique, inverse = np.unique(matches["season"], return_inverse=True)
+        for season in unique.tolist():
+            if season not in seasons:
+                seasons.append(season)
+        season_idx = np.array([seasons.index(s) for s in unique.tolist()], dtype=np.intp)[inverse.reshape(-1)]
+
+        team1, team2, winner = matches["team1"], matches["team2"], matches["winner"]
+        shape = list(self.counts.shape)
+        shape[0] = max(shape[0], int(max(team1.max(initial=-1), team2.max(initial=-1))) + 1)
+        shape[1] = max(shape[1], int(matches["venue"].max(initial=-1)) + 1)
+        shape[2] = len(seasons)
+        counts = np.zeros(shape, dtype=np.int32)
+        old = self.counts.shape
+        counts[:old[0], :old[1], :old[2]] = self.counts
+
+        for team, opponent in ((team1, team2), (team2, team1)):
+            outcome = np.where(winner == team, WON, np.where(winner == opponent, LOST, NO_RESULT))
+            np.add.at(counts, (team, matches["venue"], season_idx, (matches["toss_winner"] == team).astype(np.int8),
+                               matches["decision"], outcome), 1)
+        return MatchCube(counts, seasons)
+
+    def rollup(self, by=(), **filters):
+        """Counts summed over every dimension not in `by`, restricted by `filters`.
+
+        Filters take a code (team, venue, toss, decision, outcome) or a season value, or a list of
+        them; the result has one axis per name in `by`, in that order, indexed by code (season axis:
+        by position in self.seasons).
+        """
+        arr = self.counts
+        for axis, dim in enumerate(DIMS):
+            value = filters.get(dim)
+            if value is None:
+                continue
+            values = np.atleast_1d(value)
+            if dim == "season":
+                values = [i for i in (self.season_index(v) for v in values) if i is not None]
+            arr = np.take(arr, np.asarray(values, dtype=np.intp), axis=axis)
+        keep = [DIMS.index(dim) for dim in by]
+        summed = arr.sum(axis=tuple(axis for axis in range(len(DIMS)) if axis not in keep))
+        # remaining axes are in DIMS order; put them in the order asked for
+        return np.transpose(summed, [sorted(keep).index(axis) for axis in keep])
@@ -0,0 +1,76 @@
+"""Team line-ups as rows: one match_players row per (match, player) with team (1 or 2) and position.
+
+matches.team1_eleven/team2_eleven keep each line-up as a Python list literal; the loader
+writes the parsed rows alongside every new match, so "matches played" counts appearances
+(season_aggregates.py) and the analytics engine builds its participation bitsets from them
+(participation.py) without parsing strings.  refresh_matches() rebuilds rows from those
+columns, for databases restored from a dump taken before the table existed.  Line-ups name
+players with no players row yet, which get one from players_player_id_seq: on a restored dump
+that needs migration 9 (schema_migrations.py), which moves the sequence past the dump's ids.
+
+    python match_players.py refresh                  # rebuild every match
+    python match_players.py refresh 1312199 1312200  # rebuild the given matches
+"""
+import argparse
+import sys
+
+import psycopg2
+
+import query_cache
+import season_aggregates
+from db_pool import dsn_from_env
+from schema_migrations import stale_sequences
+from ingest import MATCH_PLAYER_COLUMNS, Loader, lineup_rows, parse_players
+from scorecards import all_matches
+
+
+def refresh_matches(conn, match_ids=None, commit=True):
+    """Rebuild the line-up rows of `match_ids` (every match when None) in one transaction."""
+    match_ids = all_matches(conn) if match_ids is None else sorted({int(m) for m in match_ids})
+    if not match_ids:
+        return []
+    with conn.cursor() as cur:
+        cur.execute("SELECT match_id, team1_eleven, team2_eleven FROM matches WHERE match_id = ANY(%s)",
+                    (match_ids,))
+        records = [{"match_id": match_id, "team1_players": parse_players(team1), "team2_players": parse_players(team2)}
+                   for match_id, team1, team2 in cur.fetchall()]
+        names = sorted({name for r in records for name in r["team1_players"] + r["team2_players"]})
+        # a line-up can name someone who never batted or bowled, and so has no players row yet
+        cur.execute("""
+            INSERT INTO players (player_name)
+            SELECT name FROM unnest(%s::varchar[]) AS name
+            WHERE NOT EXISTS (SELECT 1 FROM players WHERE player_name = name)
+        """, (names,))
+        cur.execute("SELECT player_name, player_id FROM players WHERE player_name = ANY(%s)", (names,))
+        player_ids = dict(cur.fetchall())
+        cur.execute("DELETE FROM match_players WHERE match_id = ANY(%s)", (match_ids,))
+        Loader._copy(cur, "match_players", MATCH_PLAYER_COLUMNS, lineup_rows(records, player_ids))
+    if commit:
+        conn.commit()
+    return match_ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("match_ids", nargs="*", type=int)
+    parser.add_argument("--dsn", default=dsn_from_env())
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        if "players.player_id" in stale_sequences(conn):
+            print("players_player_id_seq is behind the players table; run 'python schema_migrations.py migrate' first")
+            return 1
+        match_ids = refresh_matches(conn, args.match_ids or None)
+        # matches played in the season aggregates counts these rows
+        season_aggregates.refresh_for_matches(conn, match_ids)
+        query_cache.invalidate()
+        print(f"refreshed the line-ups of {len(match_ids)} match(es)")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Integer codes for the names repeated on every matches, toss and dismissals row.
+
+teams, venues, umpires and dismissal_kinds map each distinct name to a smallint, and the
+fact rows carry those codes (players keep their player_id) next to the original text
+columns, which the loader still writes and the dump still has.  Queries filter, group and
+join on the codes and look names up only for the rows they return; the analytics engine
+pulls codes instead of strings and decodes at display time.  Loads call refresh_matches()
+with the new match ids.
+
+    python name_codes.py refresh                  # encode every match
+    python name_codes.py refresh 1312199 1312200  # encode the given matches
+"""
+import argparse
+import sys
+
+import psycopg2
+
+import query_cache
+from db_pool import dsn_from_env
+from scorecards import all_matches
+
+# new names first, so the updates below find a code for every one of them
+ADD_NAMES = [
+    """INSERT INTO teams (team_name)
+    SELECT DISTINCT name FROM matches, LATERAL (VALUES (team1_name), (team2_name)) AS t (name)
+    WHERE match_id = ANY(%(match_ids)s) AND name IS NOT NULL
+    ON CONFLICT (team_name) DO NOTHING""",
+    """INSERT INTO venues (venue_name)
+    SELECT DISTINCT venue_name FROM matches WHERE match_id = ANY(%(match_ids)s) AND venue_name IS NOT NULL
+    ON CONFLICT (venue_name) DO NOTHING""",
+    """INSERT INTO umpires (umpire_name)
+    SELECT DISTINCT name FROM matches, LATERAL (VALUES (umpire1), (umpire2)) AS u (name)
+    WHERE match_id = ANY(%(match_ids)s) AND name IS NOT NULL
+    ON CONFLICT (umpire_name) DO NOTHING""",
+    """INSERT INTO dismissal_kinds (kind_name)
+    SELECT DISTINCT dismissal_kind FROM dismissals WHERE match_id = ANY(%(match_ids)s) AND dismissal_kind IS NOT NULL
+    ON CONFLICT (kind_name) DO NOTHING""",
+]
+
+# a winner that is neither team ("Match abandoned") and a fielder who is not in players
+# (a substitute) are left NULL
+ENCODE_MATCHES = """
+UPDATE matches m SET
+    team1_id = (SELECT team_id FROM teams WHERE team_name = m.team1_name),
+    team2_id = (SELECT team_id FROM teams WHERE team_name = m.team2_name),
+    winner_id = (SELECT team_id FROM teams WHERE team_name = m.winning_team),
+    venue_id = (SELECT venue_id FROM venues WHERE venue_name = m.venue_name),
+    umpire1_id = (SELECT umpire_id FROM umpires WHERE umpire_name = m.umpire1),
+    umpire2_id = (SELECT umpire_id FROM umpires WHERE umpire_name = m.umpire2)
+WHERE m.match_id = ANY(%(match_ids)s)
+"""
+
+ENCODE_TOSS = """
+UPDATE toss t SET toss_winner_id = (SELECT team_id FROM teams WHERE team_name = t.toss_winner)
+WHERE t.match_id = ANY(%(match_ids)s)
+"""
+
+ENCODE_DISMISSALS = """
+UPDATE dismissals d SET
+    batsman_id = (SELECT player_id FROM players WHERE player_name = d.batsman_name),
+    bowler_id = (SELECT player_id FROM players WHERE player_name = d.bowler_name),
+    fielder_id = (SELECT player_id FROM players WHERE player_name = d.fielders_involved),
+    kind_id = (SELECT kind_id FROM dismissal_kinds WHERE kind_name = d.dismissal_kind)
+WHERE d.match_id = ANY(%(match_ids)s)
+"""
+
+
+def refresh_matches(conn, match_ids=None, commit=True):
+    """Encode the rows of `match_ids` (every match when None) in one transaction."""
+    match_ids = all_matches(conn) if match_ids is None else sorted({int(m) for m in match_ids})
+    if not match_ids:
+        return []
+    params = {"match_ids": match_ids}
+    with conn.cursor() as cur:
+        for statement in ADD_NAMES + [ENCODE_MATCHES, ENCODE_TOSS, ENCODE_DISMISSALS]:
+            cur.execute(statement, params)
+    if commit:
+        conn.commit()
+    return match_ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("match_ids", nargs="*", type=int)
+    parser.add_argument("--dsn", default=dsn_from_env())
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        match_ids = refresh_matches(conn, args.match_ids or None)
+        query_cache.invalidate()
+        print(f"encoded {len(match_ids)} match(es)")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Per-player participation bitsets over the sides of every match, built from the line-ups.
+
+Bit 2 * r + s of a player's row is set when they were in side s (0 = team1, 1 = team2) of
+match row r of the analytics engine snapshot.  A season or venue filter is a mask over the
+same bits, so every question is an AND plus a popcount over a few hundred bytes per player:
+
+    part.matches_played(mask)          # appearances of every player
+    part.together(a, b, mask)          # matches a and b played on the same side
+    part.against(a, b, mask)           # matches they played on opposite sides
+    part.teammates(a, mask)            # matches a shared with every other player, same side
+
+Player arguments are the engine's integer player codes; masks come from mask().
+"""
+import numpy as np
+
+# set bits of every byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(bits):
+    """Set bits per row of a packed uint8 matrix (a single int for one packed row)."""
+    return _POPCOUNT[bits].sum(axis=-1, dtype=np.int64)
+
+
+class Participation:
+    def __init__(self, match, side, player, n_players, n_matches):
+        """Line-up entries as parallel (match row, side 0/1, player code) arrays."""
+        self.n_players = n_players
+        self.n_matches = n_matches
+        # set the bits straight into the packed rows (np.packbits layout: bit j is 0x80 >> j % 8 of
+        # byte j // 8), never holding the players x sides bool matrix
+        self.bits = np.zeros((n_players, (2 * n_matches + 7) // 8), dtype=np.uint8)
+        known = player >= 0
+        j = 2 * match[known].astype(np.intp) + side[known]
+        np.bitwise_or.at(self.bits, (player[known], j >> 3), (0x80 >> (j & 7)).astype(np.uint8))
+
+    def mask(self, rows=None):
+        """Packed mask over match sides from a boolean mask over match rows (every match when None)."""
+        if rows is None:
+            rows = np.ones(self.n_matches, dtype=bool)
+        return np.packbits(np.repeat(rows, 2))
+
+    def _opposite(self, player):
+        # the player's bits with the two sides of every match swapped
+        sides = np.unpackbits(self.bits[player], count=2 * self.n_matches).reshape(-1, 2)[:, ::-1]
+        return np.packbits(sides.reshape(-1))
+
+    def matches_played(self, mask=None):
+        """Appearances per player code."""
+        return _popcount(self.bits if mask is None else self.bits & mask)
+
+    def together(self, a, b, mask=None):
+        bits = self.bits[a] & self.bits[b]
+        return int(_popcount(bits if mask is None else bits & mask))
+
+    def against(self, a, b, mask=None):
+        bits = self.bits[a] & self._opposite(b)
+        return int(_popcount(bits if mask is None else bits & mask))
+
+    def teammates(self, player, mask=None, opponents=False):
+        """Matches `player` shared with every player code, on the same side (or the other side)."""
+        bits = self._opposite(player) if opponents else self.bits[player]
+        if mask is not None:
+            bits = bits & mask
+        counts = _popcount(self.bits & bits)
+        if not opponents:
+            counts[player] = 0
+        return counts
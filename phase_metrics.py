@@ -0,0 +1,136 @@
+"""Per-phase batting and bowling metrics: strike rate, economy, dot-ball and boundary rates.
+
+Built in one pass over the delivery arrays of the analytics engine: every delivery falls in a
+(season, phase, player) cell and each measure (balls, runs, dots, fours, sixes, wickets) is
+one bincount over those cells, for the batsman and, through the paired batting row, for the
+bowler.  Rates are derived from the counts at query time, so every phase of every season is
+available once the counts exist, and ranked leaderboards are memoised per (season, phase, ...):
+
+    pm.totals("batting", season=2019, phase="death")        # {measure: per-player array}
+    pm.leaderboard("bowling", "economy", season=2019, phase="powerplay", min_balls=60, k=10)
+
+Overs are the 0-based over_number: the powerplay is overs 1-6, the middle overs 7-15 and the
+death overs 16-20.  Runs are the batsman's runs (extras are not stored), so economy counts
+runs off the bat only.  Player arguments and results use the engine's integer player codes.
+"""
+import threading
+import time
+
+import numpy as np
+
+# phase -> first and last over_number (0-based)
+PHASES = {"powerplay": (0, 5), "middle": (6, 14), "death": (15, 19)}
+
+BATTING = ("balls", "runs", "dots", "fours", "sixes")
+BOWLING = ("balls", "runs", "dots", "fours", "sixes", "wickets")
+
+# leaderboard metrics of each side, and the ones ranked ascending
+METRICS = {
+    "batting": ("runs", "strike_rate", "dot_pct", "boundary_pct"),
+    "bowling": ("wickets", "economy", "dot_pct", "boundary_pct"),
+}
+LOWER_IS_BETTER = {("batting", "dot_pct"), ("bowling", "economy"), ("bowling", "boundary_pct")}
+
+# what a leaderboard row reports for each side, after the player
+COLUMNS = {
+    "batting": BATTING + ("strike_rate", "dot_pct", "boundary_pct"),
+    "bowling": BOWLING + ("economy", "dot_pct", "boundary_pct"),
+}
+
+
+def phase_of(over):
+    """Phase index (into PHASES) of every over_number; -1 outside the 20 overs."""
+    phase = np.full(len(over), -1, dtype=np.int8)
+    for i, (first, last) in enumerate(PHASES.values()):
+        phase[(over >= first) & (over <= last)] = i
+    return phase
+
+
+def rates(counts):
+    """Derived metrics from a {measure: array} dict of counts; rates of 0 balls are NaN."""
+    balls = counts["balls"].astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_ball = {
+            "strike_rate": 100 * counts["runs"] / balls,
+            "economy": 6 * counts["runs"] / balls,
+            "dot_pct": 100 * counts["dots"] / balls,
+            "boundary_pct": 100 * (counts["fours"] + counts["sixes"]) / balls,
+        }
+    return dict(counts, **per_ball)
+
+
+class PhaseMetrics:
+    def __init__(self, bat, bowl, n_players, seasons, unpaired_bowling=0):
+        """`bat` and `bowl` are dicts of parallel per-delivery arrays: season (index into
+        `seasons`), over, player and runs, plus wicket for `bowl` (bowler-credited, 0/1).
+
+        `unpaired_bowling` is how many bowling deliveries were left out of `bowl` for want of a
+        batting row to take the runs from; bowling figures are short by that many balls.
+        """
+        started = time.perf_counter()
+        self.unpaired_bowling = unpaired_bowling
+        self.n_players = n_players
+        self.seasons = np.asarray(seasons)
+        self.shape = (max(len(self.seasons), 1), len(PHASES), n_players)
+        self.batting = self._count(bat, BATTING)
+        self.bowling = self._count(bowl, BOWLING)
+        self._leaderboards = {}
+        self._lock = threading.Lock()
+        self.build_seconds = time.perf_counter() - started
+
+    def _count(self, d, measures):
+        # {measure: int32 array of shape (seasons, phases, players)}
+        phase = phase_of(d["over"])
+        keep = (phase >= 0) & (d["player"] >= 0)
+        cell = np.ravel_multi_index((d["season"][keep], phase[keep], d["player"][keep]), self.shape)
+        runs = d["runs"][keep]
+        weights = {
+            "balls": None,
+            "runs": runs,
+            "dots": runs == 0,
+            "fours": runs == 4,
+            "sixes": runs == 6,
+            "wickets": d["wicket"][keep] if "wicket" in d else None,
+        }
+        size = int(np.prod(self.shape))
+        return {m: np.bincount(cell, weights=weights[m], minlength=size).astype(np.int32).reshape(self.shape)
+                for m in measures}
+
+    def _season_index(self, season):
+        i = int(np.searchsorted(self.seasons, int(season)))
+        return i if i < len(self.seasons) and self.seasons[i] == int(season) else None
+
+    def totals(self, side, season=None, phase=None):
+        """{measure: per-player counts} for one season (all when None) and one phase (all when None)."""
+        table = self.batting if side == "batting" else self.bowling
+        seasons = slice(None)
+        if season is not None:
+            i = self._season_index(season)
+            if i is None:
+                return {m: np.zeros(self.n_players, dtype=np.int64) for m in table}
+            seasons = slice(i, i + 1)
+        phases = slice(None)
+        if phase is not None:
+            i = list(PHASES).index(phase)
+            phases = slice(i, i + 1)
+        return {m: counts[seasons, phases].sum(axis=(0, 1), dtype=np.int64) for m, counts in table.items()}
+
+    def leaderboard(self, side, metric, season=None, phase=None, min_balls=30, k=10, names=None):
+        """Top-k player codes by `metric` among players with at least `min_balls` in the cell:
+        (codes, {column: values of those players} for COLUMNS[side]); ties go to the name (or code)."""
+        key = (side, metric, season, phase, min_balls, k)
+        with self._lock:
+            cached = self._leaderboards.get(key)
+        if cached is not None:
+            return cached
+        values = rates(self.totals(side, season, phase))
+        score = values[metric]
+        lower_better = (side, metric) in LOWER_IS_BETTER
+        eligible = np.flatnonzero(values["balls"] >= max(min_balls, 1))
+        order = np.lexsort((names[eligible] if names is not None else eligible,
+                            score[eligible] if lower_better else -score[eligible]))
+        codes = eligible[order[:k]]
+        result = (codes, {column: values[column][codes] for column in COLUMNS[side]})
+        with self._lock:
+            self._leaderboards[key] = result
+        return result
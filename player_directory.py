@@ -0,0 +1,93 @@
+"""In-memory player directory with prefix and initials-aware fuzzy search for the player pickers.
+
+Names are split into lower-cased tokens kept in one sorted list, so every token that starts
+with a typed prefix is a bisect range.  Scorecard names are mostly initials plus surname
+("YBK Jaiswal", "HH Pandya"), so a typed word also matches an initials token holding its first
+letter ("hardik pandya" finds HH Pandya), and a word that matches nothing falls back to close
+spellings of the surnames.  Every typed word must match and at least one must match more than
+an initial; results rank by how well the words matched, then by how much the player has played.
+"""
+import bisect
+import difflib
+from collections import defaultdict
+
+# score of one typed word against a name token
+EXACT, PREFIX, CLOSE, INITIAL = 4, 3, 2, 1
+
+
+def _is_initials(token):
+    return token.isupper() and token.isalpha() and len(token) <= 4
+
+
+class PlayerDirectory:
+    def __init__(self, names, weights=None, roles=None):
+        """`names[code]` is the player with that code; `weights[code]` (e.g. balls involved in) breaks
+        ties; `roles` maps a role name such as "batting" to the set of codes that qualify."""
+        self.names = list(names)
+        self.weights = list(weights) if weights is not None else [0] * len(self.names)
+        self.roles = {role: set(codes) for role, codes in (roles or {}).items()}
+
+        tokens = []
+        self._initials = defaultdict(set)    # letter -> players with an initials token containing it
+        for code, name in enumerate(self.names):
+            if not name:
+                continue
+            for token in name.split():
+                tokens.append((token.lower(), code))
+                if _is_initials(token):
+                    for letter in set(token.lower()):
+                        self._initials[letter].add(code)
+        tokens.sort()
+        self._tokens = [token for token, _ in tokens]
+        self._codes = [code for _, code in tokens]
+        # close-spelling candidates are only looked for among tokens with the same first letter
+        self._vocabulary = defaultdict(list)
+        for token in sorted(set(self._tokens)):
+            self._vocabulary[token[0]].append(token)
+        self._popular = sorted((code for code, name in enumerate(self.names) if name),
+                               key=lambda code: (-self.weights[code], self.names[code]))
+
+    def __len__(self):
+        return len(self._popular)
+
+    def _word_scores(self, word):
+        """{player code: best score} for one typed word."""
+        scores = {}
+        lo = bisect.bisect_left(self._tokens, word)
+        hi = bisect.bisect_left(self._tokens, word + "\uffff")
+        for i in range(lo, hi):
+            code = self._codes[i]
+            score = EXACT if self._tokens[i] == word else PREFIX
+            if scores.get(code, 0) < score:
+                scores[code] = score
+        for code in self._initials.get(word[0], ()):
+            scores.setdefault(code, INITIAL)
+        if all(score == INITIAL for score in scores.values()):
+            for close in difflib.get_close_matches(word, self._vocabulary.get(word[0], ()), n=5, cutoff=0.75):
+                lo = bisect.bisect_left(self._tokens, close)
+                hi = bisect.bisect_right(self._tokens, close)
+                for i in range(lo, hi):
+                    scores.setdefault(self._codes[i], CLOSE)
+        return scores
+
+    def search(self, query, limit=20, role=None):
+        """Up to `limit` player names matching `query`, best first; an empty query lists the most capped players."""
+        allowed = self.roles.get(role) if role is not None else None
+        words = query.lower().replace(".", " ").split() if query else []
+        if not words:
+            codes = (code for code in self._popular if allowed is None or code in allowed)
+            return [self.names[code] for _, code in zip(range(limit), codes)]
+
+        total, strong = None, set()
+        for word in words:
+            scores = self._word_scores(word)
+            strong.update(code for code, score in scores.items() if score > INITIAL)
+            if total is None:
+                total = scores
+            else:
+                total = {code: total[code] + score for code, score in scores.items() if code in total}
+            if not total:
+                return []
+        ranked = sorted((code for code in total if code in strong and (allowed is None or code in allowed)),
+                        key=lambda code: (-total[code], -self.weights[code], self.names[code]))
+        return [self.names[code] for code in ranked[:limit]]
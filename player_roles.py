@@ -0,0 +1,99 @@
+"""Per-season player roles: batter, bowler, all-rounder or keeper.
+
+player_season_role holds one row per (season, player) with the role and the totals it was
+decided from, so "bowlers as batsmen" and the role-filtered leaderboards are an indexed read
+of a few hundred rows instead of re-deriving who bowled how much from every delivery.
+Roles are built from the season aggregates (season_aggregates.py, refreshed first) plus the
+season's stumpings; loads call refresh_for_matches() and only the touched seasons are rebuilt.
+
+    python player_roles.py refresh            # rebuild every season
+    python player_roles.py refresh 2021 2022  # rebuild the given seasons
+"""
+import argparse
+import sys
+
+import psycopg2
+
+import query_cache
+from db_pool import dsn_from_env
+from season_aggregates import all_seasons, seasons_for_matches
+
+# role thresholds, per season
+BOWLER_MIN_BALLS = 101       # balls bowled to count as a bowler
+BATTER_MIN_BALLS = 100       # balls faced for a bowler to count as an all-rounder
+KEEPER_MIN_STUMPINGS = 1     # stumpings to count as a keeper; checked first
+
+ROLES = ("batter", "bowler", "all-rounder", "keeper")
+
+REFRESH_ROLES = f"""
+INSERT INTO player_season_role (season, player_id, role, balls_faced, runs, balls_bowled, wickets, stumpings)
+SELECT
+    season,
+    player_id,
+    CASE
+        WHEN stumpings >= {KEEPER_MIN_STUMPINGS} THEN 'keeper'
+        WHEN balls_bowled >= {BOWLER_MIN_BALLS} AND balls_faced >= {BATTER_MIN_BALLS} THEN 'all-rounder'
+        WHEN balls_bowled >= {BOWLER_MIN_BALLS} THEN 'bowler'
+        ELSE 'batter'
+    END,
+    balls_faced, runs, balls_bowled, wickets, stumpings
+FROM (
+    SELECT season, player_id, SUM(balls_faced) AS balls_faced, SUM(runs) AS runs,
+           SUM(balls_bowled) AS balls_bowled, SUM(wickets) AS wickets, SUM(stumpings) AS stumpings
+    FROM (
+        SELECT season, player_id, balls AS balls_faced, runs, 0 AS balls_bowled, 0 AS wickets, 0 AS stumpings
+        FROM player_season_batting WHERE season = ANY(%(seasons)s)
+        UNION ALL
+        SELECT season, player_id, 0, 0, balls, wickets, 0
+        FROM player_season_bowling WHERE season = ANY(%(seasons)s)
+        UNION ALL
+        SELECT m.season, d.fielder_id, 0, 0, 0, 0, COUNT(*)
+        FROM dismissals d
+        JOIN matches m ON d.match_id = m.match_id
+        WHERE d.kind_id = (SELECT kind_id FROM dismissal_kinds WHERE kind_name = 'stumped')
+          AND d.fielder_id IS NOT NULL AND m.season = ANY(%(seasons)s)
+        GROUP BY m.season, d.fielder_id
+    ) AS totals
+    GROUP BY season, player_id
+) AS players_in_season
+"""
+
+
+def refresh_seasons(conn, seasons=None, commit=True):
+    """Rebuild the role rows of `seasons` (every season when None) in one transaction."""
+    seasons = all_seasons(conn) if seasons is None else sorted({int(s) for s in seasons})
+    if not seasons:
+        return []
+    params = {"seasons": seasons}
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM player_season_role WHERE season = ANY(%(seasons)s)", params)
+        cur.execute(REFRESH_ROLES, params)
+    if commit:
+        conn.commit()
+    return seasons
+
+
+def refresh_for_matches(conn, match_ids, commit=True):
+    """Refresh only the seasons touched by newly loaded matches; run after season_aggregates."""
+    return refresh_seasons(conn, seasons_for_matches(conn, match_ids), commit=commit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("seasons", nargs="*", type=int)
+    parser.add_argument("--dsn", default=dsn_from_env())
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        seasons = refresh_seasons(conn, args.seasons or None)
+        query_cache.invalidate()
+        print(f"refreshed roles for {len(seasons)} season(s): {', '.join(map(str, seasons))}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+# SQL behind the dashboard pages.
+# Placeholders are psycopg2 named parameters (%(season)s, %(match_id)s, ...); run_query executes
+# each query by its registered name (see REGISTRY at the bottom) as a prepared statement.
+# Every season filter goes through the stored matches.season column so it can use an index,
+# and the leaderboards read the per-season summary tables maintained by season_aggregates.py
+# (and the role filters the per-season roles maintained by player_roles.py);
+# the per-match questions read the batting/bowling cards maintained by scorecards.py.
+# Teams, venues, players and dismissal kinds are matched by their integer codes (name_codes.py);
+# names are joined in only for the rows a query returns.
+import itertools
+import re
+import threading
+
+# dismissal kinds that are not credited to the bowler
+NON_BOWLER_DISMISSALS = "('retired hurt', 'retired out', 'run out', 'obstructing the field')"
+
+YEARS = "SELECT DISTINCT season FROM matches ORDER BY season;"
+
+BATTING_RECORDS_ALL = """
+SELECT player_name, SUM(runs)
+FROM player_season_batting psb
+JOIN players ON players.player_id = psb.player_id
+GROUP BY player_name
+ORDER BY SUM(runs) DESC, player_name;
+"""
+
+BATTING_RECORDS_SEASON = """
+SELECT player_name, runs
+FROM player_season_batting psb
+JOIN players ON players.player_id = psb.player_id
+WHERE psb.season = %(season)s
+ORDER BY runs DESC, player_name;
+"""
+
+BOWLING_RECORDS_ALL = """
+SELECT player_name, SUM(wickets)
+FROM player_season_bowling psb
+JOIN players ON players.player_id = psb.player_id
+WHERE psb.wickets > 0
+GROUP BY player_name
+ORDER BY SUM(wickets) DESC, player_name;
+"""
+
+BOWLING_RECORDS_SEASON = """
+SELECT player_name, wickets
+FROM player_season_bowling psb
+JOIN players ON players.player_id = psb.player_id
+WHERE psb.season = %(season)s AND psb.wickets > 0
+ORDER BY wickets DESC, player_name;
+"""
+
+# the leaderboards restricted to one role (see player_roles.py) over a range of seasons;
+# a player counts for the seasons in which they had that role
+BATTING_RECORDS_ROLE = """
+SELECT p.player_name, SUM(r.runs)
+FROM player_season_role r
+JOIN players p ON p.player_id = r.player_id
+WHERE r.role = %(role)s AND r.season BETWEEN %(from_season)s AND %(to_season)s AND r.balls_faced > 0
+GROUP BY p.player_name
+ORDER BY SUM(r.runs) DESC, p.player_name;
+"""
+
+BOWLING_RECORDS_ROLE = """
+SELECT p.player_name, SUM(r.wickets)
+FROM player_season_role r
+JOIN players p ON p.player_id = r.player_id
+WHERE r.role = %(role)s AND r.season BETWEEN %(from_season)s AND %(to_season)s AND r.wickets > 0
+GROUP BY p.player_name
+ORDER BY SUM(r.wickets) DESC, p.player_name;
+"""
+
+##question 1
+TEAM_WINNING_VENUES = """
+WITH TeamVenueWins AS (
+    SELECT winner_id, venue_id, COUNT(*) AS match_count
+    FROM matches
+    WHERE winner_id IS NOT NULL
+    GROUP BY winner_id, venue_id
+)
+SELECT
+    DISTINCT ON (t.team_name)
+    t.team_name AS "Team Name",
+    v.venue_name AS "Stadium Name",
+    w.match_count AS "Matches Won"
+FROM TeamVenueWins w
+JOIN teams t ON t.team_id = w.winner_id
+JOIN venues v ON v.venue_id = w.venue_id
+ORDER BY t.team_name, w.match_count DESC, v.venue_name;
+"""
+
+TEAM_WINNING_VENUES_SEASON = """
+WITH TeamVenueWins AS (
+    SELECT winner_id, venue_id, COUNT(*) AS match_count
+    FROM matches
+    WHERE winner_id IS NOT NULL AND season = %(season)s
+    GROUP BY winner_id, venue_id
+)
+SELECT
+    DISTINCT ON (t.team_name)
+    t.team_name AS "Team Name",
+    v.venue_name AS "Stadium Name",
+    w.match_count AS "Matches Won"
+FROM TeamVenueWins w
+JOIN teams t ON t.team_id = w.winner_id
+JOIN venues v ON v.venue_id = w.venue_id
+ORDER BY t.team_name, w.match_count DESC, v.venue_name;
+"""
+
+##question 2 (matches are picked from the engine's match catalog)
+RUNS_BY_BATSMEN = """
+SELECT
+    p.player_name AS "Batsman",
+    c.runs AS "Total Runs",
+    c.dismissal_kind AS "Dismissal Type"
+FROM match_batting_card c
+JOIN players p ON p.player_id = c.player_id
+WHERE c.match_id = %(match_id)s AND c.dismissal_kind IS NOT NULL
+ORDER BY c.position;
+"""
+
+##question 3
+WICKETS_BY_BOWLER = """
+select players.player_name, c.wickets
+from match_bowling_card c
+join players on players.player_id = c.player_id
+where c.match_id = %(match_id)s and c.wickets > 0
+order by c.position;
+"""
+
+##question 4
+TOP_BATSMEN_SEASON = """
+select player_name, runs, matches AS total_matches_played
+from player_season_batting psb
+join players on players.player_id = psb.player_id
+where psb.season = %(season)s
+order by runs desc limit 10;
+"""
+
+##question 5
+TOP_BOWLERS_SEASON = """
+select player_name, wickets as total_wickets
+from player_season_bowling psb
+join players on players.player_id = psb.player_id
+where psb.season = %(season)s and psb.wickets > 0
+order by wickets desc limit 10;
+"""
+
+##question 6
+# a no result (winner_id NULL) counts as a toss loss, as with the name comparison it replaced
+TOSS_WINS = """
+SELECT COUNT(*) FROM toss JOIN matches ON matches.match_id = toss.match_id
+WHERE matches.winner_id = toss.toss_winner_id;
+"""
+TOSS_LOSSES = """
+SELECT COUNT(*) FROM toss JOIN matches ON matches.match_id = toss.match_id
+WHERE matches.winner_id IS DISTINCT FROM toss.toss_winner_id AND toss.toss_winner_id IS NOT NULL;
+"""
+
+TOSS_WINS_SEASON = """
+SELECT COUNT(*) FROM toss JOIN matches ON matches.match_id = toss.match_id
+WHERE matches.season = %(season)s AND matches.winner_id = toss.toss_winner_id;
+"""
+TOSS_LOSSES_SEASON = """
+SELECT COUNT(*) FROM toss JOIN matches ON matches.match_id = toss.match_id
+WHERE matches.season = %(season)s
+  AND matches.winner_id IS DISTINCT FROM toss.toss_winner_id AND toss.toss_winner_id IS NOT NULL;
+"""
+
+##question 7 (players are picked from the engine's player directory)
+BATSMAN_DISMISSALS = """
+SELECT bowler.player_name, COUNT(*) AS num_dismissals
+FROM dismissals d
+JOIN players bowler ON bowler.player_id = d.bowler_id
+WHERE d.batsman_id = (SELECT player_id FROM players WHERE player_name = %(batsman_name)s)
+GROUP BY d.bowler_id, bowler.player_name
+ORDER BY COUNT(*) DESC
+LIMIT 3;
+"""
+
+BATSMAN_DISMISSALS_SEASON = """
+SELECT bowler.player_name, COUNT(*) AS num_dismissals
+FROM dismissals d
+JOIN players bowler ON bowler.player_id = d.bowler_id
+JOIN matches m ON m.match_id = d.match_id
+WHERE d.batsman_id = (SELECT player_id FROM players WHERE player_name = %(batsman_name)s) AND m.season = %(season)s
+GROUP BY d.bowler_id, bowler.player_name
+ORDER BY COUNT(*) DESC
+LIMIT 3;
+"""
+
+##question 8
+BEST_BATSMAN_PER_MATCH = """
+SELECT
+    c.match_id,
+    p.player_name,
+    c.runs AS total_runs_scored
+FROM match_batting_card c
+JOIN players p ON p.player_id = c.player_id
+WHERE c.season = %(season)s AND c.top_scorer
+ORDER BY c.match_id, p.player_name;
+"""
+
+##question 9
+BOWLERS_AS_BATSMEN = """
+SELECT p.player_name, r.runs AS total_runs, r.balls_faced
+FROM player_season_role r
+JOIN players p ON r.player_id = p.player_id
+WHERE r.season = %(season)s AND r.role = 'bowler' AND r.balls_faced > 0
+ORDER BY total_runs DESC, p.player_name
+LIMIT 5;
+"""
+
+##admin dashboard
+ALL_USERS = "SELECT user_id,username,password FROM users ORDER BY user_id;"
+
+##named-query registry
+# Each dashboard query is declared once with typed parameters and runs as a server-side
+# prepared statement: PREPARE once per pooled connection, then EXECUTE with bound values.
+# Pageable queries (ORDER BY, no LIMIT of their own) also get a `<name>_page` variant with
+# LIMIT/OFFSET pushed into the SQL and a `<name>_count` variant for the page count; their
+# full results are streamed through a named server-side cursor instead of one big fetchall().
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+# SQL parameter type -> python type the bound value is coerced to
+PARAM_TYPES = {"smallint": int, "integer": int, "bigint": int, "text": str,
+               "integer[]": lambda values: [int(v) for v in values]}
+
+# rows per round trip when streaming through a server-side cursor
+STREAM_BATCH_SIZE = 2000
+
+_counter_lock = threading.Lock()
+_cursor_ids = itertools.count(1)
+
+
+class NamedQuery:
+    def __init__(self, name, sql, cacheable=True, pageable=False, **param_types):
+        self.name = name
+        self.cacheable = cacheable
+        self.sql = sql.strip().rstrip(";")
+        if pageable and re.search(r"\blimit\b", self.sql, re.IGNORECASE):
+            raise ValueError(f"{name}: a pageable query must not have a LIMIT of its own")
+        self.param_names = list(dict.fromkeys(_PLACEHOLDER.findall(self.sql)))
+        if set(self.param_names) != set(param_types):
+            raise ValueError(f"{name}: declared parameters {sorted(param_types)} "
+                             f"do not match placeholders {self.param_names}")
+        unknown = set(param_types.values()) - set(PARAM_TYPES)
+        if unknown:
+            raise ValueError(f"{name}: unsupported parameter types {sorted(unknown)}")
+        self.param_types = param_types
+        self.statement = "ipl_" + name
+        self.prepared_sql = _PLACEHOLDER.sub(lambda m: f"${self.param_names.index(m.group(1)) + 1}", self.sql)
+        self.prepares = 0
+        self.executions = 0
+
+        # full reads of a pageable query can be large, so they go through a server-side cursor
+        self.server_cursor = pageable
+        self.page = self.count = None
+        if pageable:
+            self.page = NamedQuery(f"{name}_page", f"{self.sql}\nLIMIT %(page_limit)s OFFSET %(page_offset)s",
+                                   cacheable, page_limit="bigint", page_offset="bigint", **param_types)
+            self.count = NamedQuery(f"{name}_count", f"SELECT COUNT(*) FROM ({self.sql}) AS paged",
+                                    cacheable, **param_types)
+
+    def bind(self, params=None):
+        """Validate `params` against the declaration and return them in $1..$n order."""
+        params = params or {}
+        missing = [name for name in self.param_names if params.get(name) is None]
+        if missing:
+            raise ValueError(f"{self.name}: missing parameters {missing}")
+        return tuple(PARAM_TYPES[self.param_types[name]](params[name]) for name in self.param_names)
+
+    def execute(self, cur, params=None):
+        values = self.bind(params)
+        prepared = getattr(cur.connection, "prepared_statements", None)
+        if prepared is None:
+            # plain psycopg2 connection (no pool): fall back to client-side binding
+            cur.execute(self.sql, dict(zip(self.param_names, values)))
+            return
+        if self.statement not in prepared:
+            types = ", ".join(self.param_types[name] for name in self.param_names)
+            cur.execute(f"PREPARE {self.statement}{f'({types})' if types else ''} AS {self.prepared_sql}")
+            prepared.add(self.statement)
+            with _counter_lock:
+                self.prepares += 1
+        placeholders = ", ".join(["%s"] * len(values))
+        cur.execute(f"EXECUTE {self.statement}{f'({placeholders})' if values else ''}", values)
+        with _counter_lock:
+            self.executions += 1
+
+    def stream(self, conn, params=None, batch_size=STREAM_BATCH_SIZE):
+        """Yield the result through a named server-side cursor, `batch_size` rows per round trip.
+
+        DECLARE cannot take an EXECUTE, so this binds client-side instead of using the prepared statement.
+        The cursor lives in the current transaction; the pool rolls it back when the connection is returned.
+        """
+        values = self.bind(params)
+        with conn.cursor(name=f"{self.statement}_{next(_cursor_ids)}") as cur:
+            cur.itersize = batch_size
+            cur.execute(self.sql, dict(zip(self.param_names, values)))
+            with _counter_lock:
+                self.executions += 1
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+
+
+REGISTRY = {}
+
+
+def register(name, sql, cacheable=True, pageable=False, **param_types):
+    query = NamedQuery(name, sql, cacheable=cacheable, pageable=pageable, **param_types)
+    for q in (query, query.page, query.count):
+        if q is None:
+            continue
+        if q.name in REGISTRY:
+            raise ValueError(f"query {q.name!r} is already registered")
+        REGISTRY[q.name] = q
+    return query
+
+
+register("years", YEARS)
+register("batting_records_all", BATTING_RECORDS_ALL, pageable=True)
+register("batting_records_season", BATTING_RECORDS_SEASON, pageable=True, season="smallint")
+register("bowling_records_all", BOWLING_RECORDS_ALL, pageable=True)
+register("bowling_records_season", BOWLING_RECORDS_SEASON, pageable=True, season="smallint")
+register("batting_records_role", BATTING_RECORDS_ROLE, pageable=True,
+         role="text", from_season="smallint", to_season="smallint")
+register("bowling_records_role", BOWLING_RECORDS_ROLE, pageable=True,
+         role="text", from_season="smallint", to_season="smallint")
+register("team_winning_venues", TEAM_WINNING_VENUES)
+register("team_winning_venues_season", TEAM_WINNING_VENUES_SEASON, season="smallint")
+register("runs_by_batsmen", RUNS_BY_BATSMEN, match_id="integer")
+register("wickets_by_bowler", WICKETS_BY_BOWLER, match_id="integer")
+register("top_batsmen_season", TOP_BATSMEN_SEASON, season="smallint")
+register("top_bowlers_season", TOP_BOWLERS_SEASON, season="smallint")
+register("toss_wins", TOSS_WINS)
+register("toss_losses", TOSS_LOSSES)
+register("toss_wins_season", TOSS_WINS_SEASON, season="smallint")
+register("toss_losses_season", TOSS_LOSSES_SEASON, season="smallint")
+register("batsman_dismissals", BATSMAN_DISMISSALS, batsman_name="text")
+register("batsman_dismissals_season", BATSMAN_DISMISSALS_SEASON, batsman_name="text", season="smallint")
+register("best_batsman_per_match", BEST_BATSMAN_PER_MATCH, season="smallint")
+register("bowlers_as_batsmen", BOWLERS_AS_BATSMEN, season="smallint")
+register("all_users", ALL_USERS, cacheable=False, pageable=True)
+
+
+def plan_reuse():
+    """Client-side plan reuse per query: executions served by an already prepared statement."""
+    with _counter_lock:
+        return {
+            name: {"prepares": q.prepares, "executions": q.executions,
+                   "reused": q.executions - q.prepares if q.executions else 0}
+            for name, q in REGISTRY.items()
+        }
+
+
+def server_plan_stats(cur):
+    """Generic vs custom plan counts Postgres keeps for this connection's prepared statements (PG 14+)."""
+    cur.execute("""
+        SELECT name, generic_plans, custom_plans
+        FROM pg_prepared_statements
+        WHERE name LIKE 'ipl\\_%'
+        ORDER BY name
+    """)
+    return {name: {"generic_plans": generic, "custom_plans": custom} for name, generic, custom in cur.fetchall()}
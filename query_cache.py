@@ -0,0 +1,355 @@
+"""Two-tier result cache for run_query.
+
+Tier 1 is an in-process LRU bounded by bytes, tier 2 is a directory of JSON-encoded results
+shared by every Streamlit process on the host.  Entries never expire on a timer; a data
+load calls invalidate(), which bumps the shared data version so every process drops
+its stale entries on the next lookup.
+"""
+import datetime
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "IPL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "query_results"))
+
+VERSION_FILE = "DATA_VERSION"
+
+
+def normalize_query(query):
+    return " ".join(query.split()).rstrip(";").strip()
+
+
+def cache_key(query, params=None):
+    if isinstance(params, dict):
+        params = sorted(params.items())
+    elif params is not None:
+        params = list(params)
+    raw = repr((normalize_query(query), params))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# results are plain data (lists of row tuples or DataFrames), so they are stored as JSON rather
+# than pickled: a file planted in the cache directory can at worst be a wrong answer
+def _default(value):
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    if isinstance(value, datetime.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    if hasattr(value, "item"):
+        return value.item()     # NumPy scalar
+    raise TypeError(f"cannot encode {type(value).__name__} as JSON")
+
+
+def _object_hook(obj):
+    if len(obj) == 1:
+        (tag, value), = obj.items()
+        if tag == "$decimal":
+            return Decimal(value)
+        if tag == "$datetime":
+            return datetime.datetime.fromisoformat(value)
+        if tag == "$date":
+            return datetime.date.fromisoformat(value)
+        if tag == "$tuple":
+            return tuple(value)
+        if tag == "$frame":
+            import pandas as pd
+            frame = pd.DataFrame({i: pd.Series(values, dtype=dtype)
+                                  for i, (values, dtype) in enumerate(zip(value["data"], value["dtypes"]))})
+            frame.columns = value["columns"]
+            return frame
+    return obj
+
+
+def _is_frame(value):
+    pandas = sys.modules.get("pandas")
+    return pandas is not None and isinstance(value, pandas.DataFrame)
+
+
+def _frame(frame):
+    # column by column, with the dtypes, so typed columns come back typed
+    return {"$frame": {"columns": list(frame.columns), "dtypes": [str(dtype) for dtype in frame.dtypes],
+                       "data": [frame.iloc[:, i].tolist() for i in range(frame.shape[1])]}}
+
+
+def _plain(value):
+    if isinstance(value, tuple):
+        return {"$tuple": [_plain(v) for v in value]}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {key: _plain(v) for key, v in value.items()}
+    if _is_frame(value):
+        return _frame(value)
+    return value
+
+
+def _dumps(doc):
+    return json.dumps(doc, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def encode_rows(rows):
+    """JSON bytes for a result: a list of row tuples or a DataFrame."""
+    return _dumps(_frame(rows) if _is_frame(rows) else {"rows": [list(row) for row in rows]})
+
+
+def decode_rows(payload):
+    """Inverse of encode_rows; ValueError when the payload is not a result."""
+    doc = json.loads(payload, object_hook=_object_hook)
+    if isinstance(doc, dict) and "rows" in doc:
+        return [tuple(row) for row in doc["rows"]]
+    if not _is_frame(doc):
+        raise ValueError("not an encoded result")
+    return doc
+
+
+def encode_value(value):
+    """JSON bytes for any nesting of lists, tuples, dicts with str keys, DataFrames and scalars."""
+    return _dumps(_plain(value))
+
+
+def decode_value(payload):
+    """Inverse of encode_value."""
+    return json.loads(payload, object_hook=_object_hook)
+
+
+def read_data_version(cache_dir=DEFAULT_CACHE_DIR):
+    try:
+        with open(os.path.join(cache_dir, VERSION_FILE)) as fh:
+            return int(fh.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def invalidate(cache_dir=DEFAULT_CACHE_DIR):
+    """Mark every cached result stale in all processes; call after loading data."""
+    os.makedirs(cache_dir, exist_ok=True)
+    version = read_data_version(cache_dir) + 1
+    tmp = os.path.join(cache_dir, f".{VERSION_FILE}.{os.getpid()}")
+    with open(tmp, "w") as fh:
+        fh.write(str(version))
+    os.replace(tmp, os.path.join(cache_dir, VERSION_FILE))
+    return version
+
+
+class QueryCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, cache_dir=DEFAULT_CACHE_DIR, disk_max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (rows, size) in LRU order
+        self._bytes = 0
+        self._inflight = {}             # key -> lock held by the thread computing it
+        self._stats = {}                # key -> per-entry counters, for the entries in memory
+        self._totals = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._evictions = 0
+        self._version = read_data_version(cache_dir) if cache_dir else 0
+        self._version_checked = 0.0
+        self._local = threading.local()  # where this thread's last lookup was answered from
+
+    # ---- data version ------------------------------------------------------
+
+    def _check_version(self, force=False):
+        # a stat per lookup is cheap, but once a second is plenty
+        now = time.monotonic()
+        if not self.cache_dir or (not force and now - self._version_checked < 1.0):
+            return
+        self._version_checked = now
+        version = read_data_version(self.cache_dir)
+        if version != self._version:
+            with self._lock:
+                self._version = version
+                self._entries.clear()
+                self._stats.clear()
+                self._bytes = 0
+
+    def invalidate(self):
+        version = invalidate(self.cache_dir) if self.cache_dir else self._version + 1
+        with self._lock:
+            self._version = version
+            self._entries.clear()
+            self._stats.clear()
+            self._bytes = 0
+
+    # ---- memory tier -------------------------------------------------------
+
+    def _count(self, key, query, outcome, size=None, seconds=0.0):
+        # caller holds self._lock; an entry that did not fit (or was already evicted) only adds to the totals
+        self._totals[outcome] += 1
+        if key not in self._entries:
+            return
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = {"query": normalize_query(query)[:120], "hits": 0, "disk_hits": 0,
+                                        "misses": 0, "bytes": 0, "compute_seconds": 0.0}
+        stats[outcome] += 1
+        if size is not None:
+            stats["bytes"] = size
+        stats["compute_seconds"] += seconds
+
+    def _memory_get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _memory_put(self, key, rows, size, version=None):
+        # with `version`, a result of an older data version than the current one is not stored
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (rows, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                evicted, (_, evicted_size) = self._entries.popitem(last=False)
+                self._stats.pop(evicted, None)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    # ---- disk tier ---------------------------------------------------------
+
+    def _disk_path(self, key, version=None):
+        version = self._version if version is None else version
+        return os.path.join(self.cache_dir, f"v{version}", key[:2], key + ".json")
+
+    def _disk_get(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as fh:
+                payload = fh.read()
+        except FileNotFoundError:
+            return None
+        try:
+            return decode_rows(payload), len(payload)
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _disk_put(self, key, payload, version):
+        if not self.cache_dir or len(payload) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp, path)
+
+    def prune_disk(self):
+        """Drop result files of old data versions and the least recently written ones over budget."""
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return 0
+        removed = 0
+        files = []
+        current = f"v{self._version}"
+        for root, _, names in os.walk(self.cache_dir):
+            stale = os.path.relpath(root, self.cache_dir).split(os.sep)[0] != current
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                if stale:
+                    os.remove(path)
+                    removed += 1
+                else:
+                    st = os.stat(path)
+                    files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    # ---- public API --------------------------------------------------------
+
+    def get_or_compute(self, query, params, compute):
+        """Return cached rows for (query, params), running compute() once on a miss."""
+        self._check_version()
+        key = cache_key(query, params)
+
+        entry = self._memory_get(key)
+        if entry is not None:
+            with self._lock:
+                self._count(key, query, "hits")
+            self._set_last("memory", entry[1])
+            return entry[0]
+
+        # single flight: concurrent sessions asking for the same result wait for one query
+        with self._lock:
+            flight = self._inflight.setdefault(key, threading.Lock())
+        with flight:
+            entry = self._memory_get(key)
+            if entry is not None:
+                with self._lock:
+                    self._count(key, query, "hits")
+                self._set_last("memory", entry[1])
+                return entry[0]
+
+            cached = self._disk_get(key)
+            if cached is not None:
+                rows, size = cached
+                self._memory_put(key, rows, size)
+                with self._lock:
+                    self._count(key, query, "disk_hits", size)
+                self._set_last("disk", size)
+                return rows
+
+            try:
+                version = self._version
+                started = time.perf_counter()
+                rows = compute()
+                elapsed = time.perf_counter() - started
+                payload = encode_rows(rows)
+                # a load that landed while compute() ran makes this a pre-load answer: hand it to this
+                # caller but don't keep it (the waiters, released below, compute their own)
+                self._check_version(force=True)
+                if version == self._version:
+                    self._memory_put(key, rows, len(payload), version)
+                    self._disk_put(key, payload, version)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+            with self._lock:
+                self._count(key, query, "misses", len(payload), elapsed)
+            self._set_last("query", len(payload))
+            return rows
+
+    def _set_last(self, source, size):
+        self._local.source = source
+        self._local.size = size
+
+    def last_lookup(self):
+        """(source, payload bytes) of this thread's last get_or_compute; source is memory, disk or query."""
+        return getattr(self._local, "source", None), getattr(self._local, "size", 0)
+
+    def stats(self):
+        with self._lock:
+            entries = {key: dict(stats) for key, stats in self._stats.items()}
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+                "data_version": self._version,
+                **self._totals,
+                "per_entry": entries,
+            }
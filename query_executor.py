@@ -0,0 +1,183 @@
+"""Runs the independent queries of a dashboard page side by side on pooled connections.
+
+A page submits its panels as one batch and then waits for them, so it takes about as long
+as its slowest query instead of the sum of all of them:
+
+    batch = executor.submit({"top": (run_query, "top_batsmen_season", params),
+                             "venues": (run_query, "team_winning_venues_season", params)},
+                            key=(session_id, "season_overview"), timeout=20)
+    top = batch.result("top")
+
+Every batch has a deadline; a panel still running when it passes is cancelled and raises
+QueryTimeout.  Batches submitted under the same key replace each other: when the user changes
+the selection mid-flight, the next rerun's batch cancels the old one, which aborts its queued
+panels and sends a cancel request to Postgres for the queries already running (fetch helpers
+register their connection with cancellable()).  A rerun with an unchanged selection picks the
+running batch back up instead of starting the queries again.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import CancelledError
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+
+_batch = contextvars.ContextVar("query_batch", default=None)
+
+
+class QueryCancelled(Exception):
+    """Raised for a panel whose batch was cancelled before it finished."""
+
+
+class QueryTimeout(Exception):
+    """Raised for a panel still running when its batch's deadline passed."""
+
+
+@contextmanager
+def cancellable(conn):
+    """Register `conn` with the batch running this task, so cancelling the batch cancels its query."""
+    batch = _batch.get()
+    if batch is None:
+        yield conn
+        return
+    with batch._track(conn):
+        yield conn
+
+
+class Batch:
+    def __init__(self, executor, signature, timeout):
+        self.signature = signature          # {name: args}, to recognise a rerun of the same selection
+        self.deadline = time.monotonic() + timeout
+        self.futures = {}
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._cancelled = False
+        self._timed_out = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @contextmanager
+    def _track(self, conn):
+        with self._lock:
+            if self._cancelled:
+                raise QueryCancelled("batch cancelled")
+            self._connections.add(conn)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._connections.discard(conn)
+
+    def _run(self, fn, args):
+        if self._cancelled:
+            raise QueryCancelled("batch cancelled")
+        _batch.set(self)
+        return fn(*args)
+
+    def cancel(self, timed_out=False):
+        """Drop queued panels and ask Postgres to cancel the running ones."""
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            self._timed_out = timed_out
+            # under the lock: _track only lets go of a connection (before it goes back to the pool)
+            # once it holds the lock, so this never cancels a statement of whoever checks it out next
+            for conn in self._connections:
+                try:
+                    conn.cancel()
+                except psycopg2.Error:
+                    pass
+        for future in self.futures.values():
+            future.cancel()
+        self._executor._count("timeouts" if timed_out else "cancelled")
+
+    def done(self):
+        return all(future.done() for future in self.futures.values())
+
+    def result(self, name):
+        """Value of panel `name`, waiting until the batch deadline at most."""
+        future = self.futures[name]
+        try:
+            if self._cancelled and not future.done():
+                raise QueryCancelled("batch cancelled")
+            return future.result(max(0.0, self.deadline - time.monotonic()))
+        except FutureTimeout:
+            self.cancel(timed_out=True)
+            raise QueryTimeout(f"{name!r} did not finish before the deadline") from None
+        except (CancelledError, QueryCancelled, psycopg2.extensions.QueryCanceledError):
+            if self._timed_out:
+                raise QueryTimeout(f"{name!r} did not finish before the deadline") from None
+            raise QueryCancelled(f"{name!r} was cancelled") from None
+
+    def results(self):
+        """{name: value} of every panel; raises the first panel error."""
+        return {name: self.result(name) for name in self.futures}
+
+
+class QueryExecutor:
+    def __init__(self, max_workers=8, timeout=30.0):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._threads = ThreadPoolExecutor(max_workers, thread_name_prefix="query")
+        self._lock = threading.Lock()
+        self._current = {}          # key -> latest batch submitted under it
+        self._metrics = {"batches": 0, "reused": 0, "tasks": 0, "cancelled": 0, "timeouts": 0}
+
+    def _count(self, counter, n=1):
+        with self._lock:
+            self._metrics[counter] += n
+
+    def submit(self, tasks, key=None, timeout=None):
+        """Start `tasks` ({name: (fn, *args)}) on the worker threads and return their Batch.
+
+        With a `key`, a still-running batch of the same key is cancelled, unless it was given the
+        same tasks, in which case it is returned as is.  A finished batch is never handed back: its
+        errors (a timeout, a dropped connection) or pre-load results would be replayed on every rerun,
+        while resubmitting answers from the result cache.
+        """
+        signature = {name: task[1:] for name, task in tasks.items()}
+        with self._lock:
+            previous = self._current.get(key) if key is not None else None
+            if (previous is not None and not previous.cancelled and not previous.done()
+                    and previous.signature == signature):
+                self._metrics["reused"] += 1
+                return previous
+        batch = Batch(self, signature, self.timeout if timeout is None else timeout)
+        for name, (fn, *args) in tasks.items():
+            # each task runs in a copy of the caller's context (metrics question/session tags)
+            context = contextvars.copy_context()
+            batch.futures[name] = self._threads.submit(context.run, batch._run, fn, args)
+        with self._lock:
+            # finished batches have nothing left to cancel or share
+            for done in [k for k, old in self._current.items() if old.done()]:
+                del self._current[done]
+            if key is not None:
+                self._current[key] = batch
+            self._metrics["batches"] += 1
+            self._metrics["tasks"] += len(tasks)
+        if previous is not None:
+            previous.cancel()
+        return batch
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["running_batches"] = sum(not batch.done() for batch in self._current.values())
+            stats["max_workers"] = self.max_workers
+            return stats
+
+    def shutdown(self):
+        with self._lock:
+            batches = list(self._current.values())
+            self._current.clear()
+        for batch in batches:
+            batch.cancel()
+        self._threads.shutdown(wait=False)
@@ -0,0 +1,473 @@
+"""Shared query service: one process owns the connection pool, result cache and analytics engine.
+
+Every Streamlit server process normally keeps its own pool, in-memory cache tier and engine,
+so running several of them across cores multiplies connections, memory and warm-up.  With
+$IPL_QUERY_SERVICE set, the dashboard sends run_query() calls to this process instead, over a
+Unix socket or localhost HTTP, and identical requests that arrive while one is still running
+(from any session of any dashboard process) share its result (single flight).  Its direct
+analytics engine calls (match and player pickers, scorecards, head-to-heads, roll-ups) go
+through RemoteEngine to this process's engine, so a dashboard process keeps no pool, result
+cache or engine of its own.
+
+    python query_service.py serve --socket /tmp/ipl-query.sock      # or --port 8765
+    IPL_QUERY_SERVICE=unix:/tmp/ipl-query.sock streamlit run pg_connect.py
+    python query_service.py call --service unix:/tmp/ipl-query.sock years
+    python query_service.py stats --service http://127.0.0.1:8765
+
+QueryService is also what the dashboard uses in-process when no service is configured, so
+both paths answer a query the same way.  Requests and results travel as JSON (results in
+query_cache's encoding, so rows come back as tuples and DataFrames with their dtypes), and
+the service only binds to a Unix socket or a loopback address: it has no authentication.
+"""
+import argparse
+import http.client
+import http.server
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+import psycopg2.extensions
+
+import columnar
+import queries
+from analytics_engine import Engine
+from db_pool import ConnectionPool, dsn_from_env
+import match_catalog
+from query_cache import QueryCache, decode_rows, decode_value, encode_rows, encode_value
+from query_executor import QueryCancelled, cancellable
+from warmup import Warmer
+
+ENV_VAR = "IPL_QUERY_SERVICE"
+
+# fields of a /query request body and the JSON types they may have
+REQUEST_FIELDS = {"name": (str,), "params": (dict, type(None)), "limit": (int, type(None)), "offset": (int,),
+                  "columnar": (bool,)}
+
+# analytics engine methods an /engine request may call; "catalog.search" is engine.catalog().search
+ENGINE_CALLS = {"scorecard", "head_to_head", "matches_played", "played_together", "teammates", "phase_leaders",
+                "rollup", "stats", "catalog.options", "catalog.search", "player_directory.search"}
+
+
+class QueryServiceError(Exception):
+    """Raised by QueryClient when the service could not answer a request."""
+
+
+class QueryService:
+    """Answers registered queries from the analytics engine, the result cache or Postgres."""
+
+    def __init__(self, pool, cache, engine=None):
+        self.pool = pool
+        self.cache = cache
+        self.engine = engine
+        self.warmer = None          # warmup.Warmer started by `serve`
+        self._lock = threading.Lock()
+        self._flights = {}          # request key -> Future of the request being computed
+        self._local = threading.local()
+        self._metrics = {"requests": 0, "shared": 0, "errors": 0}
+
+    def fetch_rows(self, name, params=None):
+        query = queries.REGISTRY[name]
+        with self.pool.connection() as conn, cancellable(conn):
+            if query.server_cursor:
+                return list(query.stream(conn, params))
+            with conn.cursor() as cur:
+                query.execute(cur, params)
+                return cur.fetchall()
+
+    def fetch_frame(self, name, params=None):
+        with self.pool.connection() as conn, cancellable(conn):
+            return columnar.fetch_frame(conn, queries.REGISTRY[name], params)
+
+    def answer(self, name, params=None, columnar=False):
+        """Uncached result: the engine for the queries it knows, Postgres for the rest."""
+        if self.engine is not None and self.engine.supports(name):
+            rows = self.engine.run(name, params)
+            return pd.DataFrame(rows) if columnar else rows
+        return self.fetch_frame(name, params) if columnar else self.fetch_rows(name, params)
+
+    def run_query(self, name, params=None, limit=None, offset=0, columnar=False):
+        """Rows of query `name` (a DataFrame with columnar=True); `limit` fetches one page."""
+        if limit is not None:
+            page = queries.REGISTRY[name].page
+            if page is None:
+                raise ValueError(f"query {name!r} is not pageable")
+            name, params = page.name, {**(params or {}), "page_limit": limit, "page_offset": offset}
+        query = queries.REGISTRY[name]
+        key = (name + ":columnar" if columnar else name, repr(sorted((params or {}).items())))
+
+        # single flight over every query, cached or not
+        with self._lock:
+            self._metrics["requests"] += 1
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = Future()
+                else:
+                    self._metrics["shared"] += 1
+            if leader:
+                break
+            try:
+                rows, size = flight.result()
+            except (QueryCancelled, psycopg2.extensions.QueryCanceledError):
+                # the leader's page moved on and cancelled it; that says nothing about this request
+                continue
+            self._set_last("shared", size)
+            return rows
+
+        try:
+            if query.cacheable:
+                rows = self.cache.get_or_compute(key[0], params, lambda: self.answer(name, params, columnar))
+                source, size = self.cache.last_lookup()
+            else:
+                rows = self.answer(name, params, columnar)
+                source, size = "query", 0
+        except BaseException as exc:
+            with self._lock:
+                self._metrics["errors"] += 1
+                del self._flights[key]
+            flight.set_exception(exc)
+            raise
+        with self._lock:
+            del self._flights[key]
+        flight.set_result((rows, size))
+        self._set_last(source, size)
+        return rows
+
+    def call_engine(self, method, kwargs=None):
+        """Result of one of ENGINE_CALLS on the engine, e.g. call_engine("catalog.search", {"season": 2019})."""
+        if method not in ENGINE_CALLS:
+            raise KeyError(method)
+        if self.engine is None:
+            raise ValueError("this service has no analytics engine")
+        owner, _, attr = method.rpartition(".")
+        target = getattr(self.engine, owner)() if owner else self.engine
+        return getattr(target, attr)(**(kwargs or {}))
+
+    def _set_last(self, source, size):
+        self._local.source = source
+        self._local.size = size
+
+    def last_lookup(self):
+        """(source, payload bytes) of this thread's last run_query; source is memory, disk, query or shared."""
+        return getattr(self._local, "source", None), getattr(self._local, "size", 0)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics, in_flight=len(self._flights))
+        stats["pool"] = self.pool.stats()
+        stats["cache"] = {key: value for key, value in self.cache.stats().items() if key != "per_entry"}
+        if self.engine is not None:
+            stats["engine"] = self.engine.stats()
+        if self.warmer is not None:
+            stats["warmup"] = self.warmer.stats()
+        return stats
+
+
+# ---- server ---------------------------------------------------------------------
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive, so a client reuses one socket per thread
+
+    def address_string(self):
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, content_type="application/octet-stream", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._reply(200, json.dumps(self.server.service.stats(), default=str).encode(), "application/json")
+        else:
+            self._reply(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        if self.path == "/engine":
+            self._engine_call()
+            return
+        if self.path != "/query":
+            self._reply(404, b"not found", "text/plain")
+            return
+        service = self.server.service
+        try:
+            request = _parse_request(self.rfile.read(int(self.headers["Content-Length"])))
+            rows = service.run_query(**request)
+        except (KeyError, ValueError) as exc:
+            self._reply(400, f"{type(exc).__name__}: {exc}".encode(), "text/plain")
+            return
+        except Exception as exc:
+            self._reply(500, f"{type(exc).__name__}: {exc}".encode(), "text/plain")
+            return
+        source, size = service.last_lookup()
+        self._reply(200, encode_rows(rows), "application/json",
+                    headers=[("X-Cache-Source", source), ("X-Payload-Bytes", str(size))])
+
+    def _engine_call(self):
+        try:
+            request = decode_value(self.rfile.read(int(self.headers["Content-Length"])))
+            if not isinstance(request, dict) or not isinstance(request.get("kwargs"), dict):
+                raise ValueError("request must be an object with 'method' and 'kwargs'")
+            result = self.server.service.call_engine(request.get("method"), request["kwargs"])
+        except (KeyError, ValueError, TypeError) as exc:
+            self._reply(400, f"{type(exc).__name__}: {exc}".encode(), "text/plain")
+            return
+        except Exception as exc:
+            self._reply(500, f"{type(exc).__name__}: {exc}".encode(), "text/plain")
+            return
+        self._reply(200, encode_value(result), "application/json")
+
+
+def _parse_request(body):
+    """Keyword arguments for run_query from a JSON request body; ValueError when it is not one."""
+    request = json.loads(body)
+    if not isinstance(request, dict) or "name" not in request or not set(request) <= set(REQUEST_FIELDS):
+        raise ValueError(f"request must be an object with fields among {sorted(REQUEST_FIELDS)}")
+    for field, value in request.items():
+        types = REQUEST_FIELDS[field]
+        # bool is an int, so a limit of true would otherwise get through
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise ValueError(f"bad value for {field!r}: {value!r}")
+    return request
+
+
+def is_loopback(host):
+    """True when every address `host` resolves to is a loopback address."""
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP) if host else []
+    except socket.gaierror:
+        return False
+    return bool(infos) and all(ipaddress.ip_address(info[4][0].split("%")[0]).is_loopback for info in infos)
+
+
+class _TCPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, socket_path=None, host="127.0.0.1", port=8765):
+    """HTTP server for `service` on a Unix socket (when socket_path is given) or on a loopback host:port."""
+    if not socket_path and not is_loopback(host):
+        raise ValueError(f"refusing to serve on {host!r}: the service has no authentication, "
+                         f"bind to a loopback address or a Unix socket")
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixServer(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+    else:
+        server = _TCPServer((host, port), _Handler)
+    server.service = service
+    return server
+
+
+# ---- client ---------------------------------------------------------------------
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class QueryClient:
+    """run_query() against a query service; `address` is unix:/path/to.sock or http://host:port."""
+
+    def __init__(self, address, timeout=60.0):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()     # one keep-alive connection per thread
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.address.startswith("unix:"):
+                conn = _UnixHTTPConnection(self.address[len("unix:"):], self.timeout)
+            else:
+                host, _, port = self.address.split("://")[-1].rstrip("/").partition(":")
+                conn = http.client.HTTPConnection(host, int(port or 8765), timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method, path, body=None):
+        for attempt in (1, 2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body)
+                response = conn.getresponse()
+                return response, response.read()
+            except (ConnectionError, http.client.HTTPException, OSError):
+                # the service restarted or dropped the idle socket: reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt == 2:
+                    raise
+
+    def run_query(self, name, params=None, limit=None, offset=0, columnar=False):
+        request = {"name": name, "params": params, "limit": limit, "offset": offset, "columnar": columnar}
+        response, body = self._request("POST", "/query", json.dumps(request).encode("utf-8"))
+        if response.status == 400:
+            raise ValueError(body.decode())
+        if response.status != 200:
+            raise QueryServiceError(body.decode())
+        self._local.source = response.getheader("X-Cache-Source")
+        self._local.size = int(response.getheader("X-Payload-Bytes", 0))
+        return decode_rows(body)
+
+    def call_engine(self, method, **kwargs):
+        """QueryService.call_engine on the service."""
+        response, body = self._request("POST", "/engine", encode_value({"method": method, "kwargs": kwargs}))
+        if response.status == 400:
+            raise ValueError(body.decode())
+        if response.status != 200:
+            raise QueryServiceError(body.decode())
+        return decode_value(body)
+
+    def last_lookup(self):
+        """(source, payload bytes) as reported by the service for this thread's last run_query."""
+        return getattr(self._local, "source", None), getattr(self._local, "size", 0)
+
+    def stats(self):
+        response, body = self._request("GET", "/stats")
+        if response.status != 200:
+            raise QueryServiceError(body.decode())
+        return json.loads(body)
+
+
+class RemoteEngine:
+    """The analytics engine calls of the dashboard pages, answered by a query service's engine."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def catalog(self):
+        return _RemoteCatalog(self.client)
+
+    def player_directory(self):
+        return _RemoteDirectory(self.client)
+
+    def scorecard(self, match_id):
+        return self.client.call_engine("scorecard", match_id=match_id)
+
+    def head_to_head(self, batsman=None, bowler=None, by="outs", k=10, season=None):
+        return self.client.call_engine("head_to_head", batsman=batsman, bowler=bowler, by=by, k=k, season=season)
+
+    def matches_played(self, player, season=None, venue=None):
+        return self.client.call_engine("matches_played", player=player, season=season, venue=venue)
+
+    def played_together(self, a, b, season=None, venue=None):
+        return self.client.call_engine("played_together", a=a, b=b, season=season, venue=venue)
+
+    def teammates(self, player, k=10, season=None, venue=None, opponents=False):
+        return self.client.call_engine("teammates", player=player, k=k, season=season, venue=venue,
+                                       opponents=opponents)
+
+    def phase_leaders(self, side, metric, season=None, phase=None, min_balls=30, k=10):
+        return self.client.call_engine("phase_leaders", side=side, metric=metric, season=season, phase=phase,
+                                       min_balls=min_balls, k=k)
+
+    def rollup(self, by, **filters):
+        return self.client.call_engine("rollup", by=by, **filters)
+
+    def stats(self):
+        return self.client.call_engine("stats")
+
+
+class _RemoteCatalog:
+    # the selector calls of match_catalog.MatchCatalog; labels come from the rows of earlier searches
+    def __init__(self, client):
+        self.client = client
+        self._labels = {}
+
+    def options(self, with_deliveries=True):
+        return self.client.call_engine("catalog.options", with_deliveries=with_deliveries)
+
+    def search(self, **filters):
+        frame, total = self.client.call_engine("catalog.search", **filters)
+        self._labels.update((row.match_id, match_catalog.label(row)) for row in frame.itertuples(index=False))
+        return frame, total
+
+    def label(self, match_id):
+        return self._labels.get(int(match_id), str(match_id))
+
+
+class _RemoteDirectory:
+    def __init__(self, client):
+        self.client = client
+
+    def search(self, query, limit=20, role=None):
+        return self.client.call_engine("player_directory.search", query=query, limit=limit, role=role)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run the service")
+    serve.add_argument("--socket", help="Unix socket path (default: localhost HTTP)")
+    serve.add_argument("--host", default="127.0.0.1", help="loopback address to listen on")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--dsn", default=dsn_from_env())
+    serve.add_argument("--maxconn", type=int, default=20)
+    call = sub.add_parser("call", help="run one registered query through a running service")
+    call.add_argument("name")
+    call.add_argument("--params", default="{}", help="JSON object of query parameters")
+    call.add_argument("--service", default=os.environ.get(ENV_VAR))
+    stats = sub.add_parser("stats", help="print a running service's counters")
+    stats.add_argument("--service", default=os.environ.get(ENV_VAR))
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        if not args.socket and not is_loopback(args.host):
+            parser.error(f"--host {args.host} is not a loopback address; the service has no authentication")
+        pool = ConnectionPool(minconn=1, maxconn=args.maxconn, dsn=args.dsn)
+        cache = QueryCache()
+        service = QueryService(pool, cache, Engine(pool.connection, cache_dir=cache.cache_dir))
+        service.warmer = Warmer(service.run_query, cache_dir=cache.cache_dir).start()
+        server = make_server(service, args.socket, args.host, args.port)
+        print(f"query service listening on {args.socket or f'http://{args.host}:{args.port}'}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            pool.close()
+            if args.socket and os.path.exists(args.socket):
+                os.unlink(args.socket)
+        return 0
+
+    if not args.service:
+        parser.error(f"no service address: pass --service or set ${ENV_VAR}")
+    client = QueryClient(args.service)
+    if args.command == "call":
+        for row in client.run_query(args.name, json.loads(args.params)):
+            print(row)
+    else:
+        print(json.dumps(client.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""Dashboard question pages, one module per question, imported the first time it is picked.
+
+Every module has a render() that draws the page; the records page's render() takes "batting"
+or "bowling".  load() imports a page module and records the import as a startup stage, so a
+session that never opens question 2 never loads Matplotlib or Seaborn.
+"""
+import importlib
+
+import startup
+
+# sidebar label -> page module
+QUESTIONS = {
+    "1.Team's Winning Venues": "team_venues",
+    "2.Batsmen's Performance in a Match": "match_batting",
+    "3.Bowlers' Performance in a Match": "match_bowling",
+    "4.Top 10 Batsmen in a Year.": "top_batsmen",
+    "5.Top 10 Bowlers in a Year": "top_bowlers",
+    "6.Toss Impact on Match Results": "toss_impact",
+    "7.Batsman vs. Bowler: Key Dismissals": "dismissals",
+    "8.Best Batsman per Match in a Year": "best_batsman",
+    "9.Top 5 Bowlers as Batsmen in a Year": "bowlers_as_batsmen",
+    "10.Season Overview": "season_overview",
+    "11.Batting and Bowling by Phase": "phase_leaders",
+}
+
+# sidebar label -> records page kind
+RECORDS = {
+    "Batting Records": "batting",
+    "Bowling Records": "bowling",
+}
+
+
+def load(module):
+    with startup.stage(f"page {module}"):
+        return importlib.import_module(f"{__name__}.{module}")
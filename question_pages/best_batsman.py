@@ -0,0 +1,22 @@
+"""Question 8: the top scorer of every match in a season."""
+import streamlit as st
+
+from dashboard import get_years1, run_query
+
+
+# Function to fetch data based on selected year
+def get_best_batsman(year):
+    data = run_query("best_batsman_per_match", {"season": int(year)}, columnar=True)
+    columns = ['Match ID', 'Player Name','Total Runs Scored']
+    return data.set_axis(columns, axis=1)
+
+
+def render():
+    st.title("Best Batsman per Match in a Year")
+    sele_year = st.selectbox("Select Year :", get_years1())
+    if sele_year:
+        st.write(f"### IN Year: {sele_year}")
+        bat_data = get_best_batsman(sele_year)
+        st.write(bat_data)
+    else:
+        st.write("No data available for the selected match ID.")
@@ -0,0 +1,27 @@
+"""Question 9: the season's five most productive batsmen among its bowlers."""
+import pandas as pd
+import streamlit as st
+
+from dashboard import get_years1, run_query
+
+
+def bow_as_bat(selected_year):
+    if selected_year != "Select":
+        selected_year_int = int(selected_year)  # Convert selected_year to integer
+        # Execute the query
+        results = run_query("bowlers_as_batsmen", {"season": selected_year_int})
+        columns = ["Bowler Names", "Total runs", "Balls faced"]
+        return pd.DataFrame(results, columns=columns)
+
+
+def render():
+    st.title("Top 5 Bowlers as Batsmen in a Year")
+    years = ["Select"] + get_years1()
+    selected_year = st.selectbox("Select Year:", years)
+
+    if selected_year:
+        bowlers_data = bow_as_bat(selected_year)
+        if bowlers_data is not None:
+            st.write(bowlers_data)
+        else:
+            st.write("No data available for the selected year.")
@@ -0,0 +1,52 @@
+"""Question 7: the bowlers who dismissed a batsman most often, the head-to-head index and team-mates."""
+import pandas as pd
+import streamlit as st
+
+from dashboard import build_chart, engine, get_years1, run_query, select_player, show_chart
+
+
+def render():
+    st.title("Top Bowler vs. Batsman Dismissals")
+    selected_player = select_player("Select Player", "dismissals", role="batting")
+    h2h_year = st.selectbox("Select Year", ["All Years"] + get_years1())
+    h2h_season = None if h2h_year == "All Years" else int(h2h_year)
+    if selected_player:
+        st.write(f"### Against which bowler did {selected_player} get out most often?")
+        # Execute query for specific player
+        if h2h_season is None:
+            data = run_query("batsman_dismissals", {"batsman_name": selected_player})
+        else:
+            data = run_query("batsman_dismissals_season", {"batsman_name": selected_player, "season": h2h_season})
+
+        if data:
+            columns = ['Bowler Name', 'Number of times wicket taken']
+            df = pd.DataFrame(data, columns=columns)
+
+            def chart():
+                import plotly.express as px
+                return px.bar(df, x='Bowler Name', y='Number of times wicket taken', color='Bowler Name',
+                              title=f"Most Frequent Dismissals of {selected_player} by {', '.join(df['Bowler Name'].tolist()) if not df.empty else 'Bowler'}")
+            show_chart(build_chart(("batsman_dismissals", selected_player, h2h_season), chart))
+        else:
+            st.write(f"No data found for '{selected_player}'.")
+
+        # head-to-head from the in-memory batsman x bowler index, either way round
+        with st.expander("Head to Head"):
+            direction = st.radio("Show", ["Bowlers faced by this batsman", "Batsmen who faced this player as bowler"])
+            ranking = st.selectbox("Rank by", ["balls", "runs", "outs"])
+            if direction.startswith("Bowlers"):
+                rows = engine.head_to_head(batsman=selected_player, by=ranking, k=10, season=h2h_season)
+                opponent = "Bowler"
+            else:
+                rows = engine.head_to_head(bowler=selected_player, by=ranking, k=10, season=h2h_season)
+                opponent = "Batsman"
+            st.dataframe(pd.DataFrame(rows, columns=[opponent, "Balls", "Runs", "Dismissals"]),
+                         use_container_width=True)
+
+        # appearances from the line-up bitsets: who they played alongside or against most
+        with st.expander("Team-mates and Opponents"):
+            side = st.radio("Played", ["With", "Against"])
+            st.caption(f"{selected_player} played {engine.matches_played(selected_player, season=h2h_season)} "
+                       f"match(es) in {h2h_year}")
+            rows = engine.teammates(selected_player, k=10, season=h2h_season, opponents=side == "Against")
+            st.dataframe(pd.DataFrame(rows, columns=["Player", "Matches"]), use_container_width=True)
@@ -0,0 +1,56 @@
+"""Question 2: runs and dismissals of every batsman in a match, with the full scorecard.
+
+The only page drawn with Seaborn/Matplotlib; both are imported when its chart is first built.
+"""
+import pandas as pd
+import streamlit as st
+
+from dashboard import build_chart, engine, run_query, select_match, show_chart
+
+
+# Function to fetch data based on selected match ID
+def get_runs_by_batsmen(match_id):
+    data = run_query("runs_by_batsmen", {"match_id": match_id})
+    columns = ['Player Name', 'Total Runs', 'Dismissal']
+    return pd.DataFrame(data, columns=columns)
+
+
+def render():
+    st.title("Batsmen Performance in a Match")
+
+    # Pick a match from the catalog
+    selected_match_id = select_match("batting_match")
+
+    if selected_match_id:
+        st.write(f"### In Match: {selected_match_id}")
+        st.write("---")
+        batsmen_data = get_runs_by_batsmen(selected_match_id)
+
+        if not batsmen_data.empty:
+            # drawn on its own figure instead of the global plt state; one bar per batsman
+            def batting_chart():
+                import matplotlib
+                matplotlib.use("Agg")
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+                fig, ax = plt.subplots(figsize=(11, 7))
+                sns.barplot(data=batsmen_data, x='Player Name', y='Total Runs', hue='Dismissal', dodge=False, ax=ax)
+                ax.set_xlabel('Player Name', fontsize=15)
+                ax.set_ylabel('Total Runs', fontsize=15)
+                ax.set_title('Batsmen Performance in a Match"', fontsize=14)
+                ax.tick_params(axis='x', labelrotation=90, labelsize=15)
+                ax.legend(title='Dismissal', fontsize='large', title_fontsize='15')
+                # Show total runs on each bar: one label array per dismissal group, not a text per row
+                for bars in ax.containers:
+                    ax.bar_label(bars, fmt='%d', color='black', fontsize=15)
+                return fig
+            show_chart(build_chart(("runs_by_batsmen", selected_match_id), batting_chart, "pyplot"), "pyplot")
+            #st.write(batsmen_data)
+            with st.expander("Full Scorecard"):
+                card = engine.scorecard(selected_match_id)
+                st.dataframe(pd.DataFrame(card["batting"], columns=['Batsman', 'Runs', 'Balls', '4s', '6s', 'Dismissal']),
+                             use_container_width=True)
+                st.dataframe(pd.DataFrame(card["bowling"], columns=['Bowler', 'Balls', 'Wickets']),
+                             use_container_width=True)
+        else:
+            st.write("No data available for the selected match ID.")
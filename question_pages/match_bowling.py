@@ -0,0 +1,53 @@
+"""Question 3: wickets of every bowler in a match, as a bar or pie chart."""
+import pandas as pd
+import streamlit as st
+
+from dashboard import build_chart, run_query, select_match, show_chart
+
+
+# Function to fetch data based on selected match ID
+def get_wickets_by_bowler(match_id):
+    data = run_query("wickets_by_bowler", {"match_id": match_id})
+    columns = ['Player Name', 'Total Wickets']
+    return pd.DataFrame(data, columns=columns)
+
+
+def render():
+    st.title("Bowler Performance in a Match")
+
+    # Pick a match from the catalog
+    selected_match_id = select_match("bowling_match")
+
+    if selected_match_id:
+        st.write(f"### Showing data for Match ID: {selected_match_id}")
+        bowler_data = get_wickets_by_bowler(selected_match_id)
+
+        if not bowler_data.empty:
+            # Choose the type of plot using a selectbox
+            plot_type = st.selectbox('Select Plot Type:', ['Select one','Bar Chart', 'Pie Chart'])
+
+            if plot_type == 'Bar Chart':
+                st.write(f"### In Match {selected_match_id}")
+                st.write("Bar Chart:")
+
+                def bar_chart():
+                    import plotly.express as px
+                    fig = px.bar(bowler_data, x='Player Name', y='Total Wickets', title='Total Wickets Taken by Players')
+                    fig.update_xaxes(title='Player Name')
+                    fig.update_yaxes(title='Total Wickets')
+                    return fig
+                show_chart(build_chart(("wickets_by_bowler_bar", selected_match_id), bar_chart))
+
+            # Plotting pie chart in the second column
+            elif plot_type == 'Pie Chart':
+                st.write(f"### In Match {selected_match_id}")
+                st.write("Pie Chart:")
+
+                def pie_chart():
+                    import plotly.express as px
+                    fig = px.pie(bowler_data, values='Total Wickets', names='Player Name', title='Wickets Distribution by Players')
+                    fig.update_traces(textinfo='percent+label')
+                    return fig
+                show_chart(build_chart(("wickets_by_bowler_pie", selected_match_id), pie_chart))
+        else:
+            st.write("No data available for the selected match ID.")
@@ -0,0 +1,44 @@
+"""Question 11: batting and bowling leaderboards by phase of the innings (powerplay, middle, death)."""
+import pandas as pd
+import streamlit as st
+
+from dashboard import build_chart, engine, get_years, show_chart
+from phase_metrics import COLUMNS, METRICS
+
+PHASE_LABELS = {"All Overs": None, "Powerplay (overs 1-6)": "powerplay", "Middle (overs 7-15)": "middle",
+                "Death (overs 16-20)": "death"}
+
+TITLES = {"balls": "Balls", "runs": "Runs", "dots": "Dot Balls", "fours": "Fours", "sixes": "Sixes",
+          "wickets": "Wickets", "strike_rate": "Strike Rate", "economy": "Economy", "dot_pct": "Dot Ball %",
+          "boundary_pct": "Boundary %"}
+
+
+def render():
+    st.title("Batting and Bowling by Phase")
+    side = st.radio("Leaderboard", ["Batting", "Bowling"]).lower()
+    selected_year = st.selectbox("Select Year", get_years())
+    selected_phase = st.selectbox("Phase", list(PHASE_LABELS))
+    metric = st.selectbox("Rank by", METRICS[side], format_func=TITLES.get)
+    # rates over a handful of balls say little, so a player needs this many balls in the phase
+    min_balls = st.slider("Minimum balls", min_value=1, max_value=300, value=30, step=1)
+    season = None if selected_year == "All Years" else int(selected_year)
+    phase = PHASE_LABELS[selected_phase]
+
+    rows = engine.phase_leaders(side, metric, season=season, phase=phase, min_balls=min_balls, k=10)
+    if side == "bowling":
+        unpaired = engine.stats().get("unpaired_bowling_rows")
+        if unpaired:
+            st.warning(f"{unpaired:,} bowling deliveries have no matching batting row and are left out, "
+                       "so these bowling figures are incomplete.")
+    if not rows:
+        st.write("No player has that many balls in this phase.")
+        return
+    df = pd.DataFrame(rows, columns=["Player"] + [TITLES[c] for c in COLUMNS[side]])
+    st.write(f"### {side.title()} by {TITLES[metric]}: {selected_phase}, {selected_year}")
+    st.dataframe(df, use_container_width=True)
+
+    def chart():
+        import plotly.express as px
+        return px.bar(df, x="Player", y=TITLES[metric], color="Player",
+                      title=f"{TITLES[metric]} ({selected_phase}, {selected_year})")
+    show_chart(build_chart(("phase_leaders", side, metric, season, phase, min_balls), chart))
@@ -0,0 +1,34 @@
+"""Batting and bowling records: every player's season or career total, one page at a time."""
+import streamlit as st
+
+from dashboard import display_data, get_years
+from warmup import PAGE_SIZES
+
+COLUMNS = {"batting": ["Player Name", "Total Runs"], "bowling": ["Player Name", "Total Wickets"]}
+
+# role filter -> player_season_role.role (see player_roles.py)
+ROLE_FILTERS = {"All Players": None, "Batters": "batter", "Bowlers": "bowler", "All-rounders": "all-rounder",
+                "Keepers": "keeper"}
+
+
+def render(kind):
+    # Select year
+    years = get_years()
+    selected_year = st.selectbox("Select Year", years)
+    selected_role = st.selectbox("Player Role", list(ROLE_FILTERS))
+    # Select number of entries to display
+    selected_limit = st.select_slider("Entries per Page", options=list(PAGE_SIZES))
+    role = ROLE_FILTERS[selected_role]
+    if role is not None:
+        # a player counts for the seasons in which they had the role
+        seasons = [int(year) for year in years[1:]] if selected_year == 'All Years' else [int(selected_year)]
+        query_records = f"{kind}_records_role"
+        params = {"role": role, "from_season": seasons[0], "to_season": seasons[-1]}
+    elif selected_year == 'All Years':
+        query_records, params = f"{kind}_records_all", None
+    else:
+        query_records, params = f"{kind}_records_season", {"season": int(selected_year)}
+    subheading = f"All {kind.title()} Records ({selected_year})"
+    if role is not None:
+        subheading = f"{kind.title()} Records of {selected_role} ({selected_year})"
+    display_data(query_records, COLUMNS[kind], subheading, selected_limit, params)
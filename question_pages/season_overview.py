@@ -0,0 +1,56 @@
+"""Question 10: one season at a glance; every panel's query runs at the same time."""
+import pandas as pd
+import streamlit as st
+
+from dashboard import draw_plot, get_years1, run_parallel
+from query_executor import QueryCancelled, QueryTimeout
+
+
+def render():
+    st.title("Season Overview")
+    overview_year = st.selectbox("Select Year :", get_years1())
+    season = {"season": int(overview_year)}
+    # every panel is fetched at once, so the page takes about as long as its slowest query
+    overview = run_parallel("season_overview", {
+        "batsmen": ("top_batsmen_season", season),
+        "bowlers": ("top_bowlers_season", season),
+        "toss_won": ("toss_wins_season", season),
+        "toss_lost": ("toss_losses_season", season),
+        "venues": ("team_winning_venues_season", season),
+    })
+
+    def panel(label):
+        try:
+            return overview.result(label)
+        except QueryTimeout:
+            st.warning("This panel took too long to load. Please try again.")
+        except QueryCancelled:
+            st.info("Selection changed, reloading...")
+        return None
+
+    st.write(f"### IN {overview_year}")
+    st.write("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Top Batsmen")
+        batsmen = panel("batsmen")
+        if batsmen is not None:
+            st.dataframe(pd.DataFrame(batsmen, columns=["Player Name", "Total Runs", "Matches"]),
+                         use_container_width=True)
+    with col2:
+        st.subheader("Top Bowlers")
+        bowlers = panel("bowlers")
+        if bowlers is not None:
+            st.dataframe(pd.DataFrame(bowlers, columns=["Player Name", "Total Wickets"]),
+                         use_container_width=True)
+
+    st.subheader("Toss Impact")
+    toss_won, toss_lost = panel("toss_won"), panel("toss_lost")
+    if toss_won is not None and toss_lost is not None:
+        col1, col2 = st.columns(2)
+        col1.metric("Matches Won by Winning Toss", toss_won[0][0])
+        col2.metric("Matches Lost by Winning Toss", toss_lost[0][0])
+
+    venues = panel("venues")
+    if venues:
+        draw_plot(pd.DataFrame(venues, columns=["Team Name", "Stadium Name", "Matches Won"]), overview_year)
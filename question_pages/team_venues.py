@@ -0,0 +1,20 @@
+"""Question 1: the stadiums where each team has won the most matches."""
+import pandas as pd
+import streamlit as st
+
+from dashboard import draw_plot, get_years1, run_query
+
+
+def render():
+    venue_year = st.selectbox("Select Year", ["All Years"] + get_years1())
+    if venue_year == "All Years":
+        result = run_query("team_winning_venues")
+    else:
+        result = run_query("team_winning_venues_season", {"season": int(venue_year)})
+    if result:
+        st.write("### Team Winning Venues")
+        st.write("---")
+        df = pd.DataFrame(result, columns=["Team Name", "Stadium Name", "Matches Won"])
+        draw_plot(df, venue_year)
+    else:
+        st.write("No data found")
@@ -0,0 +1,29 @@
+"""Question 4: the season's ten highest run scorers."""
+import pandas as pd
+import streamlit as st
+
+from dashboard import build_chart, get_years1, run_query, show_chart
+
+
+def render():
+    st.title("Top 10 Scoring Batsman in a Year")
+    yea = st.selectbox("Select Year :", get_years1())
+    result = run_query("top_batsmen_season", {"season": int(yea)})
+    if result:
+        st.write(f"### IN {yea}")
+        st.write("---")
+        df = pd.DataFrame(result, columns=["player_name", "totalruns","total_matches_played"])
+
+        def chart():
+            import plotly.express as px
+            fig = px.bar(df, x='player_name', y='totalruns',
+                         labels={'player_name': 'Player Name', 'totalruns': 'Total Runs'},
+                         title='Total Runs by Player')
+            # Customize layout (optional)
+            fig.update_layout(xaxis_title='Player Name', yaxis_title='Total Runs')
+            return fig
+
+        # Display the bar plot in Streamlit
+        show_chart(build_chart(("top_batsmen", yea), chart))
+    else:
+        st.write("No data found")
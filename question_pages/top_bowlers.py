@@ -0,0 +1,32 @@
+"""Question 5: the season's ten leading wicket takers."""
+import pandas as pd
+import streamlit as st
+
+from dashboard import build_chart, get_years1, run_query, show_chart
+
+
+def render():
+    st.title("Top 10 Most Wicket Taker(Bowler) in a Year")
+    year_input = st.selectbox("Select Year :", get_years1())
+    result = run_query("top_bowlers_season", {"season": int(year_input)})
+    if result:
+        st.write(f"### IN {year_input}")
+        st.write("---")
+        df = pd.DataFrame(result, columns=["player_name", "total_wickets"])
+        bubble_sizes = df['total_wickets']  # You can change this to another column if needed
+
+        # Create a bubble plot using Plotly Express
+        def chart():
+            import plotly.express as px
+            fig = px.scatter(df, x='player_name', y='total_wickets', size=bubble_sizes, color='player_name',
+                             labels={'player_name': 'Player Name', 'total_wickets': 'Total Wickets'},
+                             title='Bubble Plot: Total Wickets Taken by Players',
+                             hover_data={'total_wickets': True})
+            # Customize layout
+            fig.update_layout(xaxis_title='Player Name', yaxis_title='Total Wickets')
+            return fig
+
+        # Display the bubble plot in Streamlit
+        show_chart(build_chart(("top_bowlers", year_input), chart))
+    else:
+        st.write("No data found")
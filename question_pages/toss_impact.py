@@ -0,0 +1,48 @@
+"""Question 6: how often the toss winner goes on to win, with a breakdown by toss decision."""
+import streamlit as st
+
+from dashboard import build_chart, engine, get_years1, run_parallel, show_chart
+from query_executor import QueryCancelled, QueryTimeout
+
+
+def render():
+    toss_year = st.selectbox("Select Year", ["All Years"] + get_years1())
+    if toss_year == "All Years":
+        toss = run_parallel("toss", {"won": ("toss_wins", None), "lost": ("toss_losses", None)})
+    else:
+        season = {"season": int(toss_year)}
+        toss = run_parallel("toss", {"won": ("toss_wins_season", season), "lost": ("toss_losses_season", season)})
+    try:
+        matches_won = toss.result("won")[0][0]
+        matches_lost = toss.result("lost")[0][0]
+    except QueryTimeout:
+        st.warning("The toss counts took too long to load. Please try again.")
+        return
+    except QueryCancelled:
+        st.info("Selection changed, reloading...")
+        return
+
+    # Create a DataFrame with the counts
+    data = {'Result': ['Matches Won by Winning Toss', 'Matches Lost by Winning Toss'],
+            'Count': [matches_won, matches_lost]}
+
+    # Create a Streamlit app
+    st.title('Relationship between Winning Toss and Winning Match')
+    st.write("---")
+
+    # Create a pie chart using Plotly
+    def chart():
+        import plotly.express as px
+        fig = px.pie(data, values='Count', names='Result', title='Winning Toss vs. Winning Match')
+        fig.update_traces(hovertemplate='<b>%{label}</b><br>%{percent}<br><br><i>Count</i>: %{value}',
+                          textfont=dict(size=20))
+        return fig
+    show_chart(build_chart(("toss_impact", toss_year), chart))
+
+    # drill down: toss winner's results by what they chose to do (from the win/loss cube)
+    breakdown = engine.rollup(("decision", "outcome"), toss=1,
+                              season=None if toss_year == "All Years" else int(toss_year))
+    if not breakdown.empty:
+        st.write("### Toss Winner's Results by Decision")
+        st.dataframe(breakdown.pivot(index="decision", columns="outcome", values="matches").fillna(0).astype(int),
+                     use_container_width=True)
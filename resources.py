@@ -0,0 +1,118 @@
+"""Process-wide dashboard resources, created on first use.
+
+Every init_* function is an st.cache_resource, so all sessions of a server process share one
+instance, and imports its libraries inside the function: the login page imports this module
+without paying for psycopg2, pandas/NumPy or the analytics engine, and the pool only opens
+its first connection when someone logs in or registers.  Creation times are recorded as
+startup stages (see startup.py).
+"""
+import os
+from contextlib import contextmanager
+
+import streamlit as st
+
+import startup
+
+# Worker threads that run the independent queries of a page side by side (see query_executor.py).
+QUERY_TIMEOUT = 20.0
+
+# query_service.ENV_VAR, read here so the login page doesn't import query_service (and pandas)
+SERVICE_ENV_VAR = "IPL_QUERY_SERVICE"
+
+
+def service_address():
+    """Address of the shared query service, or None when this process answers its own queries."""
+    return os.environ.get(SERVICE_ENV_VAR) or None
+
+
+# Connection pool shared by every session of this server process.
+@st.cache_resource
+def init_pool():
+    with startup.stage("connection pool"):
+        from db_pool import ConnectionPool
+        return ConnectionPool(minconn=1, maxconn=10, **st.secrets["postgres"])
+
+
+# Connection for the login and registration queries. Against a query service this process keeps
+# no pool, so each login opens (and closes) a connection of its own.
+@contextmanager
+def db_connection():
+    if service_address() is None:
+        with init_pool().connection() as conn:
+            yield conn
+        return
+    import psycopg2
+    conn = psycopg2.connect(**st.secrets["postgres"])
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+# Result cache: bounded in-process LRU backed by an on-disk tier shared with the other server processes.
+# Entries live until a data load invalidates them (see query_cache.invalidate), not on a timer.
+@st.cache_resource
+def init_cache():
+    with startup.stage("result cache"):
+        from query_cache import QueryCache
+        return QueryCache()
+
+
+# Timings of queries, DataFrame builds and charts, shown on the admin Performance view.
+@st.cache_resource
+def init_metrics():
+    from instrumentation import Metrics
+    return Metrics()
+
+
+# In-memory columnar copy of the ball-by-ball tables; answers the leaderboard and per-match
+# aggregates without a round trip and catches up with new matches when the data version moves.
+# Its arrays are loaded on first use, not here. Against a query service, a stand-in that forwards
+# the pages' engine calls to the service's engine.
+@st.cache_resource
+def init_engine():
+    if service_address():
+        from query_service import RemoteEngine
+        return RemoteEngine(init_service())
+    with startup.stage("analytics engine import"):
+        from analytics_engine import Engine
+    return Engine(init_pool().connection, cache_dir=init_cache().cache_dir)
+
+
+# Each executor worker holds a pooled connection only while its query runs.
+@st.cache_resource
+def init_executor():
+    from query_executor import QueryExecutor
+    return QueryExecutor(max_workers=8, timeout=QUERY_TIMEOUT)
+
+
+# Where run_query gets its answers: a shared query service process when $IPL_QUERY_SERVICE is set
+# (unix:/path/to.sock or http://127.0.0.1:8765, see query_service.py), otherwise this process's
+# own engine, cache and pool.
+@st.cache_resource
+def init_service():
+    from query_service import QueryClient, QueryService
+    address = service_address()
+    if address:
+        return QueryClient(address)
+    return QueryService(init_pool(), init_cache(), init_engine())
+
+
+# Precompute every season x question result in the background, at startup and after each data load,
+# so no user pays for a cold query. A shared query service runs its own warmer instead.
+@st.cache_resource
+def init_warmer():
+    from query_service import QueryClient
+    from warmup import Warmer
+    service = init_service()
+    if isinstance(service, QueryClient):
+        return None
+    return Warmer(service.run_query, cache_dir=init_cache().cache_dir).start()
+
+
+# Built charts, keyed by (chart, selection, data version): Plotly figures as JSON specs and
+# Matplotlib figures as PNGs (see chart_cache.py), so a rerun doesn't rebuild an unchanged chart.
+@st.cache_resource
+def init_figures():
+    from chart_cache import FigureCache
+    return FigureCache()
@@ -0,0 +1,342 @@
+"""Versioned schema migrations for the IPLdata database.
+
+    python schema_migrations.py migrate   # apply pending migrations
+    python schema_migrations.py status    # list applied / pending migrations
+    python schema_migrations.py check     # EXPLAIN every dashboard query, fail on fact-table seq scans
+                                          # or on an id sequence that an append would collide with
+"""
+import argparse
+import json
+import sys
+
+import psycopg2
+
+import queries
+from db_pool import dsn_from_env
+
+# (version, name, statements) - append only, never edit a migration that has shipped
+MIGRATIONS = [
+    (1, "matches_season_column", [
+        # a stored season lets "WHERE season = 2019" use an index instead of EXTRACT(YEAR ...) on every row
+        "ALTER TABLE matches ADD COLUMN IF NOT EXISTS season smallint "
+        "GENERATED ALWAYS AS (EXTRACT(YEAR FROM match_date)::smallint) STORED",
+        "CREATE INDEX IF NOT EXISTS matches_season_idx ON matches (season, match_id)",
+    ]),
+    (2, "fact_table_indexes", [
+        "CREATE INDEX IF NOT EXISTS batting_match_player_idx ON batting (match_id, player_id) "
+        "INCLUDE (runs_scored, dismissal_kind)",
+        "CREATE INDEX IF NOT EXISTS batting_player_idx ON batting (player_id)",
+        "CREATE INDEX IF NOT EXISTS bowling_match_player_idx ON bowling (match_id, player_id) "
+        "INCLUDE (wicket_delivery, dismissal_kind)",
+        "CREATE INDEX IF NOT EXISTS dismissals_batsman_idx ON dismissals (batsman_name, bowler_name)",
+        "CREATE INDEX IF NOT EXISTS toss_match_idx ON toss (match_id)",
+        "ANALYZE matches",
+        "ANALYZE batting",
+        "ANALYZE bowling",
+        "ANALYZE dismissals",
+    ]),
+    (3, "player_season_aggregates", [
+        # filled by `python season_aggregates.py refresh`, kept current by the loaders
+        """CREATE TABLE IF NOT EXISTS player_season_batting (
+            season smallint NOT NULL,
+            player_id integer NOT NULL REFERENCES players (player_id),
+            runs integer NOT NULL,
+            balls integer NOT NULL,
+            matches integer NOT NULL,
+            PRIMARY KEY (season, player_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS player_season_batting_runs_idx ON player_season_batting (season, runs DESC)",
+        """CREATE TABLE IF NOT EXISTS player_season_bowling (
+            season smallint NOT NULL,
+            player_id integer NOT NULL REFERENCES players (player_id),
+            wickets integer NOT NULL,
+            balls integer NOT NULL,
+            matches integer NOT NULL,
+            PRIMARY KEY (season, player_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS player_season_bowling_wickets_idx ON player_season_bowling (season, wickets DESC)",
+    ]),
+    (4, "match_scorecards", [
+        # filled by `python scorecards.py refresh`, kept current by the loaders
+        """CREATE TABLE IF NOT EXISTS match_batting_card (
+            match_id integer NOT NULL,
+            player_id integer NOT NULL REFERENCES players (player_id),
+            season smallint NOT NULL,
+            position smallint NOT NULL,
+            runs integer NOT NULL,
+            balls integer NOT NULL,
+            fours integer NOT NULL,
+            sixes integer NOT NULL,
+            dismissal_kind text,
+            top_scorer boolean NOT NULL,
+            PRIMARY KEY (match_id, player_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS match_batting_card_top_idx ON match_batting_card (season, match_id) "
+        "WHERE top_scorer",
+        """CREATE TABLE IF NOT EXISTS match_bowling_card (
+            match_id integer NOT NULL,
+            player_id integer NOT NULL REFERENCES players (player_id),
+            season smallint NOT NULL,
+            position smallint NOT NULL,
+            balls integer NOT NULL,
+            wickets integer NOT NULL,
+            PRIMARY KEY (match_id, player_id)
+        )""",
+    ]),
+    (5, "player_season_roles", [
+        # filled by `python player_roles.py refresh`, kept current by the loaders
+        """CREATE TABLE IF NOT EXISTS player_season_role (
+            season smallint NOT NULL,
+            player_id integer NOT NULL REFERENCES players (player_id),
+            role text NOT NULL CHECK (role IN ('batter', 'bowler', 'all-rounder', 'keeper')),
+            balls_faced integer NOT NULL,
+            runs integer NOT NULL,
+            balls_bowled integer NOT NULL,
+            wickets integer NOT NULL,
+            stumpings integer NOT NULL,
+            PRIMARY KEY (season, player_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS player_season_role_idx ON player_season_role (role, season) "
+        "INCLUDE (player_id, runs, balls_faced, wickets)",
+    ]),
+    (6, "match_players", [
+        # the team1_eleven/team2_eleven line-ups as rows; written by the loader,
+        # backfilled for restored dumps by `python match_players.py refresh`
+        """CREATE TABLE IF NOT EXISTS match_players (
+            match_id integer NOT NULL,
+            player_id integer NOT NULL REFERENCES players (player_id),
+            team smallint NOT NULL CHECK (team IN (1, 2)),
+            position smallint NOT NULL,
+            PRIMARY KEY (match_id, player_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS match_players_player_idx ON match_players (player_id, match_id) INCLUDE (team)",
+    ]),
+    (7, "name_codes", [
+        # integer codes next to the repeated names; filled by `python name_codes.py refresh`,
+        # kept current by the loaders
+        """CREATE TABLE IF NOT EXISTS teams (
+            team_id smallint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            team_name varchar(255) NOT NULL UNIQUE
+        )""",
+        """CREATE TABLE IF NOT EXISTS venues (
+            venue_id smallint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            venue_name varchar(255) NOT NULL UNIQUE
+        )""",
+        """CREATE TABLE IF NOT EXISTS umpires (
+            umpire_id smallint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            umpire_name varchar(255) NOT NULL UNIQUE
+        )""",
+        """CREATE TABLE IF NOT EXISTS dismissal_kinds (
+            kind_id smallint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            kind_name varchar(255) NOT NULL UNIQUE
+        )""",
+        "ALTER TABLE matches "
+        "ADD COLUMN IF NOT EXISTS team1_id smallint REFERENCES teams (team_id), "
+        "ADD COLUMN IF NOT EXISTS team2_id smallint REFERENCES teams (team_id), "
+        "ADD COLUMN IF NOT EXISTS winner_id smallint REFERENCES teams (team_id), "
+        "ADD COLUMN IF NOT EXISTS venue_id smallint REFERENCES venues (venue_id), "
+        "ADD COLUMN IF NOT EXISTS umpire1_id smallint REFERENCES umpires (umpire_id), "
+        "ADD COLUMN IF NOT EXISTS umpire2_id smallint REFERENCES umpires (umpire_id)",
+        "ALTER TABLE toss ADD COLUMN IF NOT EXISTS toss_winner_id smallint REFERENCES teams (team_id)",
+        "ALTER TABLE dismissals "
+        "ADD COLUMN IF NOT EXISTS batsman_id integer REFERENCES players (player_id), "
+        "ADD COLUMN IF NOT EXISTS bowler_id integer REFERENCES players (player_id), "
+        "ADD COLUMN IF NOT EXISTS fielder_id integer REFERENCES players (player_id), "
+        "ADD COLUMN IF NOT EXISTS kind_id smallint REFERENCES dismissal_kinds (kind_id)",
+        "CREATE INDEX IF NOT EXISTS dismissals_batsman_id_idx ON dismissals (batsman_id, bowler_id) INCLUDE (match_id)",
+        # replaced by the index on codes above
+        "DROP INDEX IF EXISTS dismissals_batsman_idx",
+        "CREATE INDEX IF NOT EXISTS matches_winner_venue_idx ON matches (season, winner_id, venue_id)",
+    ]),
+    (8, "dismissal_id_sequence", [
+        # the dump's dismissal_id is a plain integer; a sequence lets every writer take ids without colliding
+        "CREATE SEQUENCE IF NOT EXISTS dismissals_dismissal_id_seq OWNED BY dismissals.dismissal_id",
+        "SELECT setval('dismissals_dismissal_id_seq', COALESCE(MAX(dismissal_id), 0) + 1, false) FROM dismissals",
+        "ALTER TABLE dismissals ALTER COLUMN dismissal_id SET DEFAULT nextval('dismissals_dismissal_id_seq')",
+    ]),
+    (9, "serial_sequences_past_rows", [
+        # the dump restores these sequences at 1 under rows that already start at 1, so the first
+        # loader (or line-up refresh) INSERT/COPY would collide on the primary key
+        "SELECT setval(pg_get_serial_sequence('players', 'player_id'), COALESCE(MAX(player_id), 0) + 1, false) "
+        "FROM players",
+        "SELECT setval(pg_get_serial_sequence('toss', 'toss_id'), COALESCE(MAX(toss_id), 0) + 1, false) FROM toss",
+        "SELECT setval(pg_get_serial_sequence('batting', 'batting_id'), COALESCE(MAX(batting_id), 0) + 1, false) "
+        "FROM batting",
+        "SELECT setval(pg_get_serial_sequence('bowling', 'bowling_id'), COALESCE(MAX(bowling_id), 0) + 1, false) "
+        "FROM bowling",
+    ]),
+    (10, "delivery_key", [
+        # (match_id, delivery_no) names a delivery in both batting and bowling, so the batsman and
+        # bowler of a ball pair up without relying on two independent sequences staying in step.
+        # Rows of a match were written in file order, one of each per delivery, so existing rows are
+        # numbered by id within their match.
+        "ALTER TABLE batting ADD COLUMN IF NOT EXISTS delivery_no smallint",
+        "ALTER TABLE bowling ADD COLUMN IF NOT EXISTS delivery_no smallint",
+        """UPDATE batting b SET delivery_no = n.delivery_no
+        FROM (SELECT batting_id, row_number() OVER (PARTITION BY match_id ORDER BY batting_id) AS delivery_no
+              FROM batting) n
+        WHERE b.batting_id = n.batting_id""",
+        """UPDATE bowling b SET delivery_no = n.delivery_no
+        FROM (SELECT bowling_id, row_number() OVER (PARTITION BY match_id ORDER BY bowling_id) AS delivery_no
+              FROM bowling) n
+        WHERE b.bowling_id = n.bowling_id""",
+        "ALTER TABLE batting ALTER COLUMN delivery_no SET NOT NULL",
+        "ALTER TABLE bowling ALTER COLUMN delivery_no SET NOT NULL",
+        "CREATE UNIQUE INDEX IF NOT EXISTS batting_delivery_idx ON batting (match_id, delivery_no)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS bowling_delivery_idx ON bowling (match_id, delivery_no)",
+        "ANALYZE batting",
+        "ANALYZE bowling",
+    ]),
+]
+
+FACT_TABLES = {"batting", "bowling", "dismissals"}
+
+# (table, id column) of every key the loader leaves to its sequence
+SERIAL_KEYS = [("players", "player_id"), ("toss", "toss_id"), ("batting", "batting_id"),
+               ("bowling", "bowling_id"), ("dismissals", "dismissal_id")]
+
+# queries allowed to read a fact table end to end (none since the leaderboards moved to season aggregates)
+FULL_SCAN_QUERIES = set()
+
+
+def ensure_migrations_table(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version integer PRIMARY KEY,
+                name varchar(255) NOT NULL,
+                applied_at timestamptz NOT NULL DEFAULT now()
+            )
+        """)
+    conn.commit()
+
+
+def applied_versions(conn):
+    ensure_migrations_table(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cur.fetchall()}
+
+
+def migrate(conn, target=None):
+    """Apply every pending migration up to `target`, one transaction per migration."""
+    done = applied_versions(conn)
+    applied = []
+    for version, name, statements in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        try:
+            with conn.cursor() as cur:
+                for statement in statements:
+                    cur.execute(statement)
+                cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append((version, name))
+    return applied
+
+
+def sample_params(conn):
+    # representative values for every placeholder used in queries.REGISTRY
+    with conn.cursor() as cur:
+        cur.execute("SELECT MIN(season), MAX(season), MAX(match_id) FROM matches")
+        first_season, season, match_id = cur.fetchone()
+        cur.execute("SELECT batsman_name FROM dismissals GROUP BY batsman_name ORDER BY COUNT(*) DESC LIMIT 1")
+        row = cur.fetchone()
+    return {"season": season, "match_id": match_id, "batsman_name": row[0] if row else "",
+            "from_season": first_season, "to_season": season, "role": "bowler",
+            "page_limit": 20, "page_offset": 0}
+
+
+def _seq_scans(plan):
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in FACT_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def check(conn, registry=None):
+    """Return {query name: [fact tables read by seq scan]} for every offending dashboard query."""
+    registry = queries.REGISTRY if registry is None else registry
+    params = sample_params(conn)
+    failures = {}
+    with conn.cursor() as cur:
+        for name, query in registry.items():
+            if name in FULL_SCAN_QUERIES:
+                continue
+            cur.execute("EXPLAIN (FORMAT JSON) " + query.sql, params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            tables = _seq_scans(plan[0]["Plan"])
+            if tables:
+                failures[name] = tables
+    conn.rollback()
+    return failures
+
+
+def stale_sequences(conn):
+    """{table.column: (next id, largest id)} for SERIAL_KEYS whose sequence would hand out an id in use."""
+    stale = {}
+    with conn.cursor() as cur:
+        for table, column in SERIAL_KEYS:
+            cur.execute("SELECT pg_get_serial_sequence(%s, %s)", (table, column))
+            sequence = cur.fetchone()[0]
+            if sequence is None:
+                stale[f"{table}.{column}"] = (None, None)
+                continue
+            # names come from the catalog and SERIAL_KEYS, not from input
+            cur.execute(f"SELECT last_value + is_called::int FROM {sequence}")
+            next_id = cur.fetchone()[0]
+            cur.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+            largest = cur.fetchone()[0]
+            if next_id <= largest:
+                stale[f"{table}.{column}"] = (next_id, largest)
+    conn.rollback()
+    return stale
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["migrate", "status", "check"])
+    parser.add_argument("--dsn", default=dsn_from_env(), help="libpq connection string (default: $IPL_DSN)")
+    parser.add_argument("--target", type=int, help="migrate up to this version only")
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        if args.command == "migrate":
+            applied = migrate(conn, args.target)
+            for version, name in applied:
+                print(f"applied {version:04d} {name}")
+            if not applied:
+                print("schema is up to date")
+        elif args.command == "status":
+            done = applied_versions(conn)
+            for version, name, _ in MIGRATIONS:
+                print(f"{'applied' if version in done else 'pending'} {version:04d} {name}")
+        else:
+            failures = check(conn)
+            for name, tables in failures.items():
+                print(f"FAIL {name}: sequential scan on {', '.join(sorted(set(tables)))}")
+            stale = stale_sequences(conn)
+            for key, (next_id, largest) in stale.items():
+                if next_id is None:
+                    print(f"FAIL {key}: no sequence (run migrate)")
+                else:
+                    print(f"FAIL {key}: next id {next_id} but ids go up to {largest}; an append would collide")
+            if failures or stale:
+                return 1
+            print("all dashboard queries avoid sequential scans on the fact tables")
+            print("every id sequence is past its table's largest id, so appends won't collide")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
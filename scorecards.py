@@ -0,0 +1,119 @@
+"""Per-match batting and bowling cards, materialised at load time.
+
+match_batting_card holds one row per (match, batsman): batting position, runs, balls,
+fours, sixes, how out and whether it was the match's top score; match_bowling_card one
+row per (match, bowler) with balls and bowler-credited wickets.  The per-match questions
+and the season-wide best batsman list read these rows by key instead of aggregating
+batting/bowling.  Loads call refresh_matches() with the new match ids.
+
+    python scorecards.py refresh                  # rebuild every match
+    python scorecards.py refresh 1312199 1312200  # rebuild the given matches
+"""
+import argparse
+import sys
+
+import psycopg2
+
+import query_cache
+from db_pool import dsn_from_env
+from queries import NON_BOWLER_DISMISSALS
+
+REFRESH_BATTING_CARD = """
+INSERT INTO match_batting_card
+    (match_id, player_id, season, position, runs, balls, fours, sixes, dismissal_kind, top_scorer)
+SELECT
+    match_id,
+    player_id,
+    season,
+    ROW_NUMBER() OVER (PARTITION BY match_id ORDER BY first_ball),
+    runs,
+    balls,
+    fours,
+    sixes,
+    dismissal_kind,
+    runs = MAX(runs) OVER (PARTITION BY match_id)
+FROM (
+    SELECT
+        b.match_id,
+        b.player_id,
+        m.season,
+        MIN(b.batting_id) AS first_ball,
+        SUM(b.runs_scored) AS runs,
+        COUNT(*) AS balls,
+        COUNT(*) FILTER (WHERE b.runs_scored = 4) AS fours,
+        COUNT(*) FILTER (WHERE b.runs_scored = 6) AS sixes,
+        (ARRAY_AGG(b.dismissal_kind ORDER BY b.batting_id DESC)
+            FILTER (WHERE b.dismissal_kind IS NOT NULL))[1] AS dismissal_kind
+    FROM batting b
+    JOIN matches m ON b.match_id = m.match_id
+    WHERE b.match_id = ANY(%(match_ids)s)
+    GROUP BY b.match_id, b.player_id, m.season
+) AS per_batsman
+"""
+
+REFRESH_BOWLING_CARD = f"""
+INSERT INTO match_bowling_card (match_id, player_id, season, position, balls, wickets)
+SELECT
+    match_id,
+    player_id,
+    season,
+    ROW_NUMBER() OVER (PARTITION BY match_id ORDER BY first_ball),
+    balls,
+    wickets
+FROM (
+    SELECT
+        b.match_id,
+        b.player_id,
+        m.season,
+        MIN(b.bowling_id) AS first_ball,
+        COUNT(*) AS balls,
+        COALESCE(SUM(b.wicket_delivery) FILTER (WHERE b.dismissal_kind NOT IN {NON_BOWLER_DISMISSALS}), 0) AS wickets
+    FROM bowling b
+    JOIN matches m ON b.match_id = m.match_id
+    WHERE b.match_id = ANY(%(match_ids)s)
+    GROUP BY b.match_id, b.player_id, m.season
+) AS per_bowler
+"""
+
+
+def all_matches(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT match_id FROM matches ORDER BY match_id")
+        return [row[0] for row in cur.fetchall()]
+
+
+def refresh_matches(conn, match_ids=None, commit=True):
+    """Rebuild the cards of `match_ids` (every match when None) in one transaction."""
+    match_ids = all_matches(conn) if match_ids is None else sorted({int(m) for m in match_ids})
+    if not match_ids:
+        return []
+    params = {"match_ids": match_ids}
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM match_batting_card WHERE match_id = ANY(%(match_ids)s)", params)
+        cur.execute("DELETE FROM match_bowling_card WHERE match_id = ANY(%(match_ids)s)", params)
+        cur.execute(REFRESH_BATTING_CARD, params)
+        cur.execute(REFRESH_BOWLING_CARD, params)
+    if commit:
+        conn.commit()
+    return match_ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("match_ids", nargs="*", type=int)
+    parser.add_argument("--dsn", default=dsn_from_env())
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        match_ids = refresh_matches(conn, args.match_ids or None)
+        query_cache.invalidate()
+        print(f"refreshed the cards of {len(match_ids)} match(es)")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Per-season player totals behind the batting/bowling leaderboards.
+
+player_season_batting and player_season_bowling hold one row per (season, player),
+so the leaderboards read a few hundred rows per season instead of every delivery.
+Loads call refresh_for_matches() with the new match ids and only those seasons are rebuilt;
+callers invalidate the query cache once the refresh has committed.
+
+    python season_aggregates.py refresh            # rebuild every season
+    python season_aggregates.py refresh 2021 2022  # rebuild the given seasons
+"""
+import argparse
+import sys
+
+import psycopg2
+
+import query_cache
+from db_pool import dsn_from_env
+from queries import NON_BOWLER_DISMISSALS
+
+# matches counts line-up appearances (match_players), not only the matches a player batted in;
+# the batted count covers matches without a line-up
+REFRESH_BATTING = """
+INSERT INTO player_season_batting (season, player_id, runs, balls, matches)
+SELECT t.season, t.player_id, t.runs, t.balls, GREATEST(t.batted, COALESCE(a.appearances, 0))
+FROM (
+    SELECT m.season, b.player_id, SUM(b.runs_scored) AS runs, COUNT(*) AS balls, COUNT(DISTINCT b.match_id) AS batted
+    FROM batting b
+    JOIN matches m ON b.match_id = m.match_id
+    WHERE m.season = ANY(%(seasons)s)
+    GROUP BY m.season, b.player_id
+) AS t
+LEFT JOIN (
+    SELECT m.season, mp.player_id, COUNT(*) AS appearances
+    FROM match_players mp
+    JOIN matches m ON mp.match_id = m.match_id
+    WHERE m.season = ANY(%(seasons)s)
+    GROUP BY m.season, mp.player_id
+) AS a ON a.season = t.season AND a.player_id = t.player_id
+"""
+
+REFRESH_BOWLING = f"""
+INSERT INTO player_season_bowling (season, player_id, wickets, balls, matches)
+SELECT
+    m.season,
+    b.player_id,
+    COALESCE(SUM(b.wicket_delivery) FILTER (WHERE b.dismissal_kind NOT IN {NON_BOWLER_DISMISSALS}), 0),
+    COUNT(*),
+    COUNT(DISTINCT b.match_id)
+FROM bowling b
+JOIN matches m ON b.match_id = m.match_id
+WHERE m.season = ANY(%(seasons)s)
+GROUP BY m.season, b.player_id
+"""
+
+
+def all_seasons(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT DISTINCT season FROM matches ORDER BY season")
+        return [row[0] for row in cur.fetchall()]
+
+
+def seasons_for_matches(conn, match_ids):
+    with conn.cursor() as cur:
+        cur.execute("SELECT DISTINCT season FROM matches WHERE match_id = ANY(%s) ORDER BY season",
+                    (list(match_ids),))
+        return [row[0] for row in cur.fetchall()]
+
+
+def refresh_seasons(conn, seasons=None, commit=True):
+    """Rebuild the summary rows of `seasons` (every season when None) in one transaction."""
+    seasons = all_seasons(conn) if seasons is None else sorted({int(s) for s in seasons})
+    if not seasons:
+        return []
+    params = {"seasons": seasons}
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM player_season_batting WHERE season = ANY(%(seasons)s)", params)
+        cur.execute("DELETE FROM player_season_bowling WHERE season = ANY(%(seasons)s)", params)
+        cur.execute(REFRESH_BATTING, params)
+        cur.execute(REFRESH_BOWLING, params)
+    if commit:
+        conn.commit()
+    return seasons
+
+
+def refresh_for_matches(conn, match_ids, commit=True):
+    """Refresh only the seasons touched by newly loaded matches."""
+    return refresh_seasons(conn, seasons_for_matches(conn, match_ids), commit=commit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("seasons", nargs="*", type=int)
+    parser.add_argument("--dsn", default=dsn_from_env())
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        seasons = refresh_seasons(conn, args.seasons or None)
+        query_cache.invalidate()
+        print(f"refreshed {len(seasons)} season(s): {', '.join(map(str, seasons))}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
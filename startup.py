@@ -0,0 +1,112 @@
+"""Startup timings of a dashboard process, and an import-time budget check for the login path.
+
+The login page only needs Streamlit: plotting libraries, pandas/NumPy, the analytics engine
+and the database pool are loaded after login (the pool on the first login attempt), and each
+question's page module when it is first picked.  The dashboard wraps those steps in stage()
+so the admin Performance view can show where a process's first render went:
+
+    with startup.stage("connection pool"):
+        pool = ConnectionPool(...)
+
+Each stage is recorded the first time it runs in the process.  From the shell,
+
+    python startup.py check --budget-ms 1500
+
+imports the login path in a fresh interpreter under -X importtime, prints the slowest imports
+and exits non-zero when the total is over budget or when a heavy library has crept into it.
+Streamlit is imported first and reported on its own line: the budget is for the app's own
+imports, which Streamlit's import time would otherwise swamp.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROCESS_STARTED = time.perf_counter()
+
+# modules the login page imports on top of Streamlit, and libraries that must stay out of them
+LOGIN_IMPORTS = ["startup", "resources", "instrumentation", "question_pages"]
+HEAVY = ["plotly", "matplotlib", "seaborn", "psycopg2", "analytics_engine"]
+
+_lock = threading.Lock()
+_stages = {}     # stage -> {"at_ms": started after process start, "ms": duration}
+
+
+@contextmanager
+def stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _stages.setdefault(name, {"at_ms": round((started - PROCESS_STARTED) * 1000, 1),
+                                      "ms": round(elapsed * 1000, 1)})
+
+
+def breakdown():
+    """[{'stage', 'at_ms', 'ms'}] in the order the stages started."""
+    with _lock:
+        return sorted(({"stage": name, **timing} for name, timing in _stages.items()), key=lambda s: s["at_ms"])
+
+
+# written to stderr between the Streamlit import and the modules being timed
+_MARKER = "-- after streamlit --"
+
+
+def import_times(modules, python=sys.executable):
+    """({top-level module: cumulative import microseconds}, heavy libraries loaded, Streamlit's own
+    import microseconds) for importing `modules` in a fresh interpreter that has already imported
+    Streamlit; neither its import time nor the libraries it loads are counted against `modules`."""
+    code = ("import sys, streamlit; base = set(sys.modules)\n"
+            f"sys.stderr.write({_MARKER!r} + '\\n'); sys.stderr.flush()\n"
+            f"for name in {modules!r}: __import__(name)\n"
+            f"print(json.dumps(sorted({{m.split('.')[0] for m in set(sys.modules) - base}} & set({HEAVY!r}))))")
+    result = subprocess.run([python, "-X", "importtime", "-c", "import json\n" + code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times, streamlit_us, after = {}, 0, False
+    for line in result.stderr.splitlines():
+        after = after or line == _MARKER
+        # "import time: self [us] | cumulative | imported package"; top-level imports are not indented
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, package = line.split("|")
+        if package.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        if after:
+            times[package.strip()] = int(cumulative)
+        elif package.strip() == "streamlit":
+            streamlit_us = int(cumulative)
+    return times, json.loads(result.stdout.splitlines()[-1]), streamlit_us
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["check"])
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="import-time budget of the login path")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    try:
+        times, heavy, streamlit_us = import_times(LOGIN_IMPORTS)
+    except RuntimeError as exc:
+        print(f"could not import the login path: {exc}")
+        return 2
+    total_ms = sum(times.values()) / 1000
+    for package, us in sorted(times.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{us / 1000:9.1f} ms  {package}")
+    print(f"{total_ms:9.1f} ms  total (budget {args.budget_ms:.0f} ms)")
+    print(f"{streamlit_us / 1000:9.1f} ms  streamlit itself, not counted")
+    if heavy:
+        print(f"heavy libraries imported by the login path: {', '.join(heavy)}")
+    return 1 if heavy or total_ms > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
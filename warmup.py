@@ -0,0 +1,122 @@
+"""Background warm-up of every season x question result the dashboard can ask for.
+
+The selectable parameter space is small (a few questions times ~15 seasons, plus the first
+page of the record tables at each page size), so instead of letting the first user of each
+combination pay for a cold query, a daemon thread runs all of them through run_query at
+startup and again whenever a data load moves the shared data version (query_cache.invalidate),
+which is the only thing that empties the result cache.  Progress is kept in stats() for the
+admin Performance view.
+
+    warmer = Warmer(service.run_query)
+    warmer.start()
+"""
+import threading
+import time
+
+import query_cache
+from player_roles import ROLES
+
+# page sizes offered by the record tables' "Entries per Page" slider
+PAGE_SIZES = (20, 40, 60, 80, 100)
+
+# questions answered per season; (query name, run_query keyword arguments)
+SEASON_QUERIES = [
+    ("top_batsmen_season", {}),
+    ("top_bowlers_season", {}),
+    ("best_batsman_per_match", {"columnar": True}),
+    ("bowlers_as_batsmen", {}),
+    ("team_winning_venues_season", {}),
+    ("toss_wins_season", {}),
+    ("toss_losses_season", {}),
+]
+
+ALL_SEASON_QUERIES = ["team_winning_venues", "toss_wins", "toss_losses"]
+
+RECORD_QUERIES = ["batting_records", "bowling_records"]
+
+
+def plan(seasons):
+    """Every (query name, params, run_query kwargs) the dashboard's selectors can produce."""
+    jobs = [(name, None, {}) for name in ALL_SEASON_QUERIES]
+    for season in seasons:
+        params = {"season": season}
+        jobs.extend((name, params, kwargs) for name, kwargs in SEASON_QUERIES)
+    for season in [None] + list(seasons):
+        for records in RECORD_QUERIES:
+            name, params = (f"{records}_all", None) if season is None else (f"{records}_season", {"season": season})
+            jobs.append((f"{name}_count", params, {}))
+            jobs.extend((name, params, {"limit": limit, "offset": 0}) for limit in PAGE_SIZES)
+            # the role filters of the record tables: first page at the default size only
+            for role in ROLES if seasons else ():
+                first, last = (seasons[0], seasons[-1]) if season is None else (season, season)
+                params = {"role": role, "from_season": first, "to_season": last}
+                jobs.append((f"{records}_role_count", params, {}))
+                jobs.append((f"{records}_role", params, {"limit": PAGE_SIZES[0], "offset": 0}))
+    return jobs
+
+
+class Warmer:
+    def __init__(self, run_query, cache_dir=query_cache.DEFAULT_CACHE_DIR, interval=5.0):
+        """`run_query(name, params, **kwargs)` is the cached query path to warm."""
+        self.run_query = run_query
+        self.cache_dir = cache_dir
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._warmed_version = None
+        self._progress = {"state": "not started", "data_version": None, "done": 0, "total": 0, "errors": 0,
+                          "last_error": None, "runs": 0, "last_seconds": None, "last_finished": None}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="cache-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _update(self, **values):
+        with self._lock:
+            self._progress.update(values)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            version = query_cache.read_data_version(self.cache_dir)
+            if version != self._warmed_version:
+                self.warm(version)
+            self._stop.wait(self.interval)
+
+    def warm(self, version=None):
+        """Run every planned query once; entries already cached cost a lookup."""
+        started = time.monotonic()
+        self._update(state="warming", data_version=version, done=0, total=0, errors=0, last_error=None)
+        try:
+            seasons = [int(row[0]) for row in self.run_query("years")]
+        except Exception as exc:
+            # database not reachable yet; the loop tries again after `interval`
+            self._update(state="failed", errors=1, last_error=f"years: {exc}")
+            return
+        jobs = plan(seasons)
+        self._update(total=len(jobs))
+        for name, params, kwargs in jobs:
+            if self._stop.is_set():
+                return
+            try:
+                self.run_query(name, params, **kwargs)
+            except Exception as exc:
+                with self._lock:
+                    self._progress["errors"] += 1
+                    self._progress["last_error"] = f"{name}: {exc}"
+            with self._lock:
+                self._progress["done"] += 1
+        # a load that landed mid-run leaves the version moved, so the loop warms again
+        self._warmed_version = version
+        with self._lock:
+            self._progress["runs"] += 1
+        self._update(state="idle", last_seconds=round(time.monotonic() - started, 3), last_finished=time.time())
+
+    def stats(self):
+        with self._lock:
+            return dict(self._progress)